@@ -102,6 +102,11 @@ def init_postgres_db() -> None:
             CREATE INDEX IF NOT EXISTS idx_ref_supplier_master_name
             ON ref.supplier_master (normalized_supplier_name)
         """)
+        # Case-insensitive name lookup of the enrichment store (etl/enrichment_store.py)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_ref_supplier_master_name_lower
+            ON ref.supplier_master (lower(normalized_supplier_name))
+        """)
 
         # --- ref.global_supplier_data_master ---
         cur.execute("""
@@ -118,9 +123,17 @@ def init_postgres_db() -> None:
                 product_service_tags TEXT,
                 ship_to_countries TEXT,
                 country_codes TEXT,
+                enrichment_confidence REAL,
+                enriched_at TIMESTAMP,
                 date_added TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         """)
+        # Enrichment store columns (etl/enrichment_store.py) on databases created before them
+        cur.execute("""
+            ALTER TABLE ref.global_supplier_data_master
+            ADD COLUMN IF NOT EXISTS enrichment_confidence REAL,
+            ADD COLUMN IF NOT EXISTS enriched_at TIMESTAMP
+        """)
 
         # --- Seed ref.client_master (acme, beta) ---
         cur.execute("""
@@ -0,0 +1,181 @@
+"""
+Chunked single-column CSV reading and an on-disk row index.
+
+SupplierNormalizer.normalize_csv() loads the whole supplier column into a list
+and then builds the unique-name map from it, so on a 20M-row PO file both sit
+in memory for the whole run. In streaming mode it instead reads the column in
+chunks (ColumnChunkReader), folds each chunk into the unique map as it goes,
+and writes each row's unique-name ordinal to a RowIndexSpill: 4 bytes per row
+in a temporary file. Memory then follows the number of distinct suppliers, not
+the number of rows.
+
+ColumnChunkReader uses pyarrow's streaming CSV reader with column projection
+(only the supplier column is converted to Python strings) when pyarrow is
+installed, else csv.reader. Both backends yield one value per data row, as
+the in-memory path of normalize_csv() reads it: "" for a row too short to
+have the column (including blank lines), the column's field for a row with
+extra fields. pyarrow cannot read such ragged rows (it can only skip them),
+so the pyarrow backend raises RaggedRowsError at the first one and the
+caller re-reads the file with the csv backend.
+"""
+import codecs
+import csv
+import tempfile
+from array import array
+from typing import Iterator, List, Optional
+
+try:
+    import pyarrow
+    from pyarrow import csv as pa_csv
+except ImportError:
+    pyarrow = None
+    pa_csv = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+DEFAULT_CHUNK_ROWS = 200_000
+# pyarrow reads by bytes; its streaming reader keeps a few dozen blocks in
+# flight, so blocks stay small and rows are regrouped into chunk_rows lists
+PYARROW_BLOCK_SIZE = 1 << 20
+# Ordinal written for rows whose name cleans to nothing
+NO_ENTRY = 0xFFFFFFFF
+
+
+def read_header(path: str, encoding: str = "utf-8") -> List[str]:
+    with open(path, "r", encoding=encoding, newline="") as f:
+        return next(csv.reader(f), None) or []
+
+
+class RaggedRowsError(ValueError):
+    """The pyarrow backend met a row whose field count differs from the header."""
+
+
+class ColumnChunkReader:
+    """Iterates one CSV column (header row skipped) as lists of about chunk_rows strings."""
+
+    def __init__(self, path: str, column_index: int, encoding: str = "utf-8",
+                 chunk_rows: int = DEFAULT_CHUNK_ROWS, use_pyarrow: bool = True):
+        self.path = path
+        self.column_index = column_index
+        self.encoding = encoding
+        self.chunk_rows = max(1, int(chunk_rows))
+        self.header = read_header(path, encoding)
+        self.backend = "pyarrow" if use_pyarrow and pa_csv is not None and column_index < len(self.header) else "csv"
+        self.skipped_rows = 0
+
+    def __iter__(self) -> Iterator[List[str]]:
+        return self._iter_pyarrow() if self.backend == "pyarrow" else self._iter_csv()
+
+    def _iter_csv(self) -> Iterator[List[str]]:
+        col = self.column_index
+        with open(self.path, "r", encoding=self.encoding, newline="") as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            chunk: List[str] = []
+            for row in reader:
+                chunk.append(row[col] if col < len(row) else "")
+                if len(chunk) >= self.chunk_rows:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+
+    def _skip_invalid_row(self, _row) -> str:
+        self.skipped_rows += 1
+        return "skip"
+
+    def _iter_pyarrow(self) -> Iterator[List[str]]:
+        # Positional names, so duplicate or blank headers cannot break the projection
+        names = [f"c{i}" for i in range(len(self.header))]
+        target = names[self.column_index]
+        encoding = codecs.lookup(self.encoding).name
+        reader = pa_csv.open_csv(
+            self.path,
+            read_options=pa_csv.ReadOptions(
+                column_names=names,
+                skip_rows=1,
+                block_size=PYARROW_BLOCK_SIZE,
+                encoding="utf8" if encoding == "utf-8" else self.encoding,
+            ),
+            # Blank lines are kept (as invalid rows, or "" in a one-column file) like csv.reader does
+            parse_options=pa_csv.ParseOptions(
+                newlines_in_values=True, ignore_empty_lines=False, invalid_row_handler=self._skip_invalid_row,
+            ),
+            convert_options=pa_csv.ConvertOptions(
+                include_columns=[target],
+                column_types={target: pyarrow.string()},
+                strings_can_be_null=False,
+                quoted_strings_can_be_null=False,
+            ),
+        )
+        chunk: List[str] = []
+        for batch in reader:
+            if self.skipped_rows:
+                raise RaggedRowsError(f"{self.path}: rows with a field count unlike the header")
+            chunk.extend(batch.column(0).to_pylist())
+            if len(chunk) >= self.chunk_rows:
+                yield chunk
+                chunk = []
+        if self.skipped_rows:
+            raise RaggedRowsError(f"{self.path}: rows with a field count unlike the header")
+        if chunk:
+            yield chunk
+
+
+class RowIndexSpill:
+    """
+    Row -> unique-name ordinal, appended a chunk at a time to a temporary file
+    (4 bytes per row, NO_ENTRY for blank names). The file is deleted on close().
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        if array("I").itemsize != 4:
+            raise RuntimeError("RowIndexSpill needs a 4-byte array('I')")
+        self._file = tempfile.TemporaryFile(prefix="row_index_", suffix=".u32", dir=directory)
+        self.rows = 0
+
+    def extend(self, ordinals: array):
+        ordinals.tofile(self._file)
+        self.rows += len(ordinals)
+
+    def iter_chunks(self, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Iterator[array]:
+        """The spilled ordinals in row order, chunk_rows at a time."""
+        self._file.flush()
+        self._file.seek(0)
+        try:
+            while True:
+                data = self._file.read(chunk_rows * 4)
+                if not data:
+                    break
+                chunk = array("I")
+                chunk.frombytes(data)
+                yield chunk
+        finally:
+            self._file.seek(0, 2)
+
+    def rows_for(self, ordinal: int) -> array:
+        """Row numbers (0-based, header excluded) of one unique name."""
+        rows = array("I")
+        offset = 0
+        for chunk in self.iter_chunks():
+            if np is not None:
+                rows.extend((np.flatnonzero(np.frombuffer(chunk, dtype=np.uint32) == ordinal) + offset).tolist())
+            else:
+                rows.extend(offset + i for i, value in enumerate(chunk) if value == ordinal)
+            offset += len(chunk)
+        return rows
+
+    def close(self):
+        self._file.close()
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
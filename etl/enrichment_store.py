@@ -0,0 +1,242 @@
+"""
+Persistent supplier enrichment store shared across clients and runs.
+
+enrich_supplier() makes a grounded Gemini call (Google Search) for every new
+supplier, and the same large suppliers show up in almost every client's PO
+file. The store keeps description, employee count, revenue, year established
+and confidence per supplier, keyed by the canonical name (lower-cased,
+whitespace-collapsed, as matched against ref.supplier_master) or the Genpact
+supplier ID, and is consulted before any API call. Entries older than the
+freshness window (max_age_days, default 180, env ENRICHMENT_MAX_AGE_DAYS) are
+treated as missing and refreshed by the next run that needs them.
+
+Backends:
+  * Local SQLite, <project root>/cache/supplier_enrichment.sqlite (override
+    with ENRICHMENT_STORE_PATH). Always available.
+  * ref.global_supplier_data_master in Postgres when DB_USERNAME is set and
+    psycopg2 is installed (same env as etl/supplier_master_etl.py). Rows there
+    need a Genpact ID from ref.supplier_master, so enrichments for suppliers
+    without one are kept in the local store.
+
+Only real model answers are stored; the 'Not available' fallbacks written
+after an API error never are.
+"""
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from etl.llm_cache import DEFAULT_CACHE_PATH
+from etl.supplier_normalize import name_key_for_match
+
+try:
+    import psycopg2
+except ImportError:
+    psycopg2 = None
+
+DEFAULT_ENRICHMENT_PATH = DEFAULT_CACHE_PATH.parent / "supplier_enrichment.sqlite"
+DEFAULT_MAX_AGE_DAYS = 180
+ENRICHMENT_FIELDS = ("description", "employee_count", "revenue", "year_established", "confidence")
+# ref.global_supplier_data_master column for each enrichment field
+PG_COLUMNS = {
+    "description": "supplier_description",
+    "employee_count": "employee_count",
+    "revenue": "revenue",
+    "year_established": "year_established",
+    "confidence": "enrichment_confidence",
+}
+
+
+def enrichment_key(name: Any) -> str:
+    """Store key for a canonical supplier name."""
+    return name_key_for_match(str(name)) if name is not None else ""
+
+
+def default_max_age_days() -> float:
+    try:
+        return float(os.environ.get("ENRICHMENT_MAX_AGE_DAYS", DEFAULT_MAX_AGE_DAYS))
+    except ValueError:
+        return float(DEFAULT_MAX_AGE_DAYS)
+
+
+def _as_enrichment(values) -> Dict[str, Any]:
+    enrichment = dict(zip(ENRICHMENT_FIELDS, values))
+    enrichment["confidence"] = float(enrichment.get("confidence") or 0.0)
+    for name in ENRICHMENT_FIELDS[:-1]:
+        enrichment[name] = "" if enrichment[name] is None else str(enrichment[name])
+    return enrichment
+
+
+class LocalEnrichmentStore:
+    """SQLite enrichment store; safe to share between threads."""
+
+    def __init__(self, path: Optional[str] = None, max_age_days: Optional[float] = None):
+        self.path = Path(path or os.environ.get("ENRICHMENT_STORE_PATH") or DEFAULT_ENRICHMENT_PATH)
+        self.max_age_days = default_max_age_days() if max_age_days is None else max_age_days
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS supplier_enrichment (
+                name_key TEXT PRIMARY KEY,
+                genpact_supplier_id TEXT,
+                description TEXT,
+                employee_count TEXT,
+                revenue TEXT,
+                year_established TEXT,
+                confidence REAL,
+                fetched_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_supplier_enrichment_gid ON supplier_enrichment (genpact_supplier_id)"
+        )
+        self._conn.commit()
+
+    def _min_fetched_at(self) -> float:
+        if not self.max_age_days or self.max_age_days <= 0:
+            return 0.0
+        return time.time() - self.max_age_days * 86400
+
+    def get(self, name: str, genpact_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Fresh enrichment for a supplier (by Genpact ID first, then canonical name), or None."""
+        columns = ", ".join(ENRICHMENT_FIELDS)
+        row = None
+        with self._lock:
+            if genpact_id:
+                row = self._conn.execute(
+                    f"SELECT {columns} FROM supplier_enrichment WHERE genpact_supplier_id = ? AND fetched_at >= ? "
+                    "ORDER BY fetched_at DESC LIMIT 1",
+                    (genpact_id, self._min_fetched_at()),
+                ).fetchone()
+            if row is None and enrichment_key(name):
+                row = self._conn.execute(
+                    f"SELECT {columns} FROM supplier_enrichment WHERE name_key = ? AND fetched_at >= ?",
+                    (enrichment_key(name), self._min_fetched_at()),
+                ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return _as_enrichment(row)
+
+    def put(self, name: str, enrichment: Dict[str, Any], genpact_id: Optional[str] = None):
+        key = enrichment_key(name)
+        if not key:
+            return
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO supplier_enrichment "
+                    "(name_key, genpact_supplier_id, description, employee_count, revenue, year_established, "
+                    "confidence, fetched_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, genpact_id, *[enrichment.get(f) for f in ENRICHMENT_FIELDS], time.time()),
+                )
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM supplier_enrichment").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class PostgresEnrichmentStore:
+    """
+    ref.global_supplier_data_master as the enrichment store. Names are resolved
+    to Genpact IDs through ref.supplier_master; suppliers without one fall
+    back to the local store. Needs the enrichment_confidence / enriched_at
+    columns and the lower(normalized_supplier_name) expression index (for the
+    name lookup) that ensure_ref_tables() and db/init_postgres_db.py create.
+    """
+
+    def __init__(self, conn, local: LocalEnrichmentStore):
+        self._conn = conn
+        self._conn.autocommit = True
+        self.local = local
+        self.max_age_days = local.max_age_days
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _genpact_id(self, cur, name: str) -> Optional[str]:
+        cur.execute(
+            "SELECT genpact_supplier_id FROM ref.supplier_master WHERE lower(normalized_supplier_name) = %s "
+            "ORDER BY genpact_supplier_id LIMIT 1",
+            (enrichment_key(name),),
+        )
+        row = cur.fetchone()
+        return row[0] if row else None
+
+    def get(self, name: str, genpact_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        columns = ", ".join(PG_COLUMNS[f] for f in ENRICHMENT_FIELDS)
+        row = None
+        with self._lock, self._conn.cursor() as cur:
+            genpact_id = genpact_id or self._genpact_id(cur, name)
+            if genpact_id:
+                query = (f"SELECT {columns} FROM ref.global_supplier_data_master "
+                         "WHERE genpact_supplier_id = %s AND enriched_at IS NOT NULL")
+                params = [genpact_id]
+                if self.max_age_days and self.max_age_days > 0:
+                    query += " AND enriched_at >= now() - %s * interval '1 day'"
+                    params.append(self.max_age_days)
+                cur.execute(query, params)
+                row = cur.fetchone()
+        found = _as_enrichment(row) if row is not None else self.local.get(name, genpact_id)
+        with self._lock:
+            if found is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return found
+
+    def put(self, name: str, enrichment: Dict[str, Any], genpact_id: Optional[str] = None):
+        with self._lock, self._conn.cursor() as cur:
+            genpact_id = genpact_id or self._genpact_id(cur, name)
+            if genpact_id:
+                values = [enrichment.get(f) for f in ENRICHMENT_FIELDS]
+                cur.execute("""
+                    INSERT INTO ref.global_supplier_data_master
+                        (genpact_supplier_id, supplier_description, employee_count, revenue, year_established,
+                         enrichment_confidence, enriched_at)
+                    VALUES (%s, %s, %s, %s, %s, %s, now())
+                    ON CONFLICT (genpact_supplier_id) DO UPDATE SET
+                        supplier_description = EXCLUDED.supplier_description,
+                        employee_count = EXCLUDED.employee_count,
+                        revenue = EXCLUDED.revenue,
+                        year_established = EXCLUDED.year_established,
+                        enrichment_confidence = EXCLUDED.enrichment_confidence,
+                        enriched_at = EXCLUDED.enriched_at
+                """, [genpact_id, *values])
+                return
+        self.local.put(name, enrichment)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+        self.local.close()
+
+
+def open_enrichment_store(path: Optional[str] = None, max_age_days: Optional[float] = None, use_db: bool = True):
+    """
+    Postgres-backed store when the DB env is configured (and reachable), else
+    the local SQLite store.
+    """
+    local = LocalEnrichmentStore(path, max_age_days)
+    if not use_db or psycopg2 is None or not os.environ.get("DB_USERNAME"):
+        return local
+    from etl.supplier_master_etl import ensure_ref_tables, get_pg_conn
+    try:
+        conn = get_pg_conn()
+        with conn.cursor() as cur:
+            ensure_ref_tables(cur)
+        conn.commit()
+        return PostgresEnrichmentStore(conn, local)
+    except Exception:
+        return local
@@ -0,0 +1,127 @@
+"""
+Pooled keep-alive HTTP transport for Gemini calls.
+
+Every call_gemini_sync() and call_gemini() request used a bare requests.post,
+which opens (and TLS-handshakes) a new connection each time. post_json() goes
+through one process-wide requests.Session whose HTTPAdapter keeps up to
+GEMINI_HTTP_POOL_SIZE connections per host alive, so worker threads reuse
+warm connections. Responses are already gzip-negotiated by requests.
+
+Request-body compression (Content-Encoding: gzip) is opt-in: set
+GEMINI_GZIP_MIN_BYTES to compress bodies at least that large. It has not
+been verified that the generateContent endpoint accepts gzip request bodies,
+and if it does not, every large prompt would fail, so it is off by default.
+
+Settings (environment):
+  GEMINI_HTTP_POOL_SIZE     connections kept per host (default 32)
+  GEMINI_CONNECT_TIMEOUT    seconds to establish a connection (default 10)
+  GEMINI_READ_TIMEOUT       seconds to wait for a response; overrides the caller's timeout
+  GEMINI_GZIP_MIN_BYTES     gzip request bodies at least this large; 0 disables (default 0, off)
+
+The API key goes in the x-goog-api-key header (post_json(api_key=...)), not
+in a ?key= query parameter, so it never appears in the exception messages
+requests raises (which quote the URL) or in telemetry and logs built from them.
+
+Retries are not done here (urllib3 max_retries=0); etl/llm_retry.py owns them.
+"""
+import gzip
+import json
+import os
+import threading
+from typing import Any, Dict, Optional
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:
+    requests = None
+    HTTPAdapter = None
+
+DEFAULT_POOL_SIZE = 32
+DEFAULT_CONNECT_TIMEOUT = 10.0
+# Off until gzip request bodies are verified against generateContent
+DEFAULT_GZIP_MIN_BYTES = 0
+GEMINI_API_BASE = "https://generativelanguage.googleapis.com/v1beta/models"
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def _env_float(name: str, default: Optional[float]) -> Optional[float]:
+    try:
+        return float(os.environ[name]) if os.environ.get(name) else default
+    except ValueError:
+        return default
+
+
+def get_session():
+    """The shared requests.Session (created on first use)."""
+    global _session
+    if requests is None:
+        raise RuntimeError("The requests package is required for Gemini calls (pip install requests)")
+    with _session_lock:
+        if _session is None:
+            pool_size = int(_env_float("GEMINI_HTTP_POOL_SIZE", DEFAULT_POOL_SIZE))
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(1, pool_size), max_retries=0)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+def close_session():
+    """Drop pooled connections (the next call opens a new session)."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def request_timeout(read_timeout: Optional[float]):
+    """(connect, read) timeout tuple with the GEMINI_* environment overrides applied."""
+    return (
+        _env_float("GEMINI_CONNECT_TIMEOUT", DEFAULT_CONNECT_TIMEOUT),
+        _env_float("GEMINI_READ_TIMEOUT", read_timeout),
+    )
+
+
+def generate_content_url(model: str) -> str:
+    """generateContent endpoint of a model (no key; pass it to post_json)."""
+    return f"{GEMINI_API_BASE}/{model}:generateContent"
+
+
+def post_json(url: str, payload: Dict[str, Any], timeout: Optional[float] = 60,
+              headers: Optional[Dict[str, str]] = None, api_key: Optional[str] = None):
+    """POST a JSON body over the pooled session (gzip-compressed only if enabled); returns the requests.Response."""
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    request_headers = {"Content-Type": "application/json"}
+    if api_key:
+        request_headers["x-goog-api-key"] = api_key
+    gzip_min = int(_env_float("GEMINI_GZIP_MIN_BYTES", DEFAULT_GZIP_MIN_BYTES))
+    if gzip_min > 0 and len(body) >= gzip_min:
+        body = gzip.compress(body, compresslevel=5)
+        request_headers["Content-Encoding"] = "gzip"
+    if headers:
+        request_headers.update(headers)
+    return get_session().post(url, data=body, headers=request_headers, timeout=request_timeout(timeout))
+
+
+class PooledRequests:
+    """
+    Drop-in for the requests module in third-party generator scripts: post()
+    and get() go through the shared session, everything else (exceptions,
+    codes, ...) is the real requests module.
+    """
+
+    def post(self, url, **kwargs):
+        kwargs.setdefault("timeout", request_timeout(60))
+        return get_session().post(url, **kwargs)
+
+    def get(self, url, **kwargs):
+        kwargs.setdefault("timeout", request_timeout(60))
+        return get_session().get(url, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(requests, name)
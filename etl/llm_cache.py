@@ -0,0 +1,311 @@
+"""
+Persistent, content-addressed cache for Gemini responses.
+
+Responses are stored in SQLite under <project root>/cache/ (override with
+LLM_CACHE_PATH) and keyed by a SHA-256 of model, prompt text, temperature and
+grounding flag, so rerunning a file after a crash or a column-mapping fix does
+not pay again for identical calls. Entries expire after a TTL and the table is
+capped at max_entries (least recently used rows are evicted first).
+
+The same database holds ClassificationMemo, which remembers PO-line
+classifications by normalized description and taxonomy version so repeated
+lines ("Freight charges") are classified once across suppliers and runs.
+
+Set LLM_CACHE_DISABLE=1 to bypass the cache everywhere.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_CACHE_PATH = ROOT / "cache" / "llm_responses.sqlite"
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 200_000
+# Eviction runs every this many writes instead of on every put
+EVICT_EVERY = 500
+DIGIT_RUN = re.compile(r"\d+")
+
+
+def make_cache_key(
+    model: str,
+    prompt: str,
+    temperature: float,
+    use_grounding: bool = False,
+    **extra: Any
+) -> str:
+    """SHA-256 over everything that changes the response (extra: e.g. maxOutputTokens)."""
+    material = json.dumps(
+        {
+            "model": model,
+            "prompt": prompt,
+            "temperature": round(float(temperature), 4),
+            "grounding": bool(use_grounding),
+            "extra": extra,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """SQLite-backed response cache; safe to share between threads."""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl_seconds: Optional[float] = DEFAULT_TTL_SECONDS,
+        max_entries: Optional[int] = DEFAULT_MAX_ENTRIES,
+    ):
+        self.path = Path(path or os.environ.get("LLM_CACHE_PATH") or DEFAULT_CACHE_PATH)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_responses (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_llm_responses_accessed ON llm_responses (accessed_at)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Cached response for key, or None on a miss or an expired entry."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM llm_responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            response, created_at = row
+            if self.ttl_seconds is not None and now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                self.evictions += 1
+                return None
+            self._conn.execute(
+                "UPDATE llm_responses SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(response)
+
+    def put(self, key: str, response: Any, model: Optional[str] = None):
+        """Store a JSON-serialisable response."""
+        now = time.time()
+        payload = json.dumps(response, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, model, response, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, model, payload, now, now),
+            )
+            self.writes += 1
+            if self.writes % EVICT_EVERY == 0:
+                self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        """Drop expired rows, then least recently used rows above max_entries (lock held)."""
+        if self.ttl_seconds is not None:
+            cur = self._conn.execute(
+                "DELETE FROM llm_responses WHERE created_at < ?", (now - self.ttl_seconds,)
+            )
+            self.evictions += max(cur.rowcount, 0)
+        if self.max_entries is not None:
+            count = self._conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+            excess = count - self.max_entries
+            if excess > 0:
+                cur = self._conn.execute(
+                    "DELETE FROM llm_responses WHERE key IN ("
+                    "SELECT key FROM llm_responses ORDER BY accessed_at ASC LIMIT ?)",
+                    (excess,),
+                )
+                self.evictions += max(cur.rowcount, 0)
+
+    def evict(self):
+        """Apply TTL and size cap now."""
+        with self._lock:
+            self._evict(time.time())
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_responses")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "entries": entries,
+            "path": str(self.path),
+        }
+
+    def summary(self) -> str:
+        s = self.stats()
+        return (
+            f"LLM cache: {s['hits']:,} hits, {s['misses']:,} misses "
+            f"({s['hit_rate']:.0%} hit rate), {s['entries']:,} entries"
+        )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ClassificationMemo:
+    """
+    Persistent memo of PO-line classifications: (taxonomy version, normalized
+    description) -> classification dict. Lives in its own table next to the
+    response cache and keeps an in-memory copy of every entry it has seen.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path or os.environ.get("LLM_CACHE_PATH") or DEFAULT_CACHE_PATH)
+        self.hits = 0
+        self.misses = 0
+        self._memory: Dict[tuple, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS po_line_classifications (
+                taxonomy_version TEXT NOT NULL,
+                description_key TEXT NOT NULL,
+                classification TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (taxonomy_version, description_key)
+            )
+        """)
+        self._conn.commit()
+
+    @staticmethod
+    def normalize_description(description: str) -> str:
+        """Case, whitespace and digit-insensitive key ("PO 4501 Freight" == "po 9 freight")."""
+        text = unicodedata.normalize("NFKC", str(description or "")).lower()
+        text = DIGIT_RUN.sub("0", text)
+        return " ".join(text.split()).strip(" .,;:-")
+
+    def get_many(self, taxonomy_version: str, keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Known classifications for the given description keys."""
+        keys = list(keys)
+        found = {}
+        missing = []
+        with self._lock:
+            for key in keys:
+                hit = self._memory.get((taxonomy_version, key))
+                if hit is not None:
+                    found[key] = hit
+                else:
+                    missing.append(key)
+            for start in range(0, len(missing), 500):
+                chunk = missing[start:start + 500]
+                rows = self._conn.execute(
+                    "SELECT description_key, classification FROM po_line_classifications "
+                    f"WHERE taxonomy_version = ? AND description_key IN ({','.join('?' * len(chunk))})",
+                    [taxonomy_version, *chunk],
+                ).fetchall()
+                for key, payload in rows:
+                    value = json.loads(payload)
+                    self._memory[(taxonomy_version, key)] = value
+                    found[key] = value
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, taxonomy_version: str, items: Dict[str, Dict[str, Any]]):
+        """Store classifications by description key."""
+        if not items:
+            return
+        now = time.time()
+        with self._lock:
+            for key, value in items.items():
+                self._memory[(taxonomy_version, key)] = value
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO po_line_classifications "
+                "(taxonomy_version, description_key, classification, created_at) VALUES (?, ?, ?, ?)",
+                [(taxonomy_version, key, json.dumps(value, ensure_ascii=False), now)
+                 for key, value in items.items()],
+            )
+            self._conn.commit()
+
+    def summary(self) -> str:
+        lookups = self.hits + self.misses
+        rate = self.hits / lookups if lookups else 0.0
+        return f"PO-line memo: {self.hits:,} hits, {self.misses:,} misses ({rate:.0%} hit rate)"
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_default_cache: Optional[LLMResponseCache] = None
+_default_unavailable = False
+_default_lock = threading.Lock()
+
+
+def cache_disabled() -> bool:
+    return os.environ.get("LLM_CACHE_DISABLE", "").strip().lower() in ("1", "true", "yes")
+
+
+def get_default_cache() -> Optional[LLMResponseCache]:
+    """Process-wide cache instance, or None when disabled or the cache file cannot be opened."""
+    global _default_cache, _default_unavailable
+    if cache_disabled() or _default_unavailable:
+        return None
+    with _default_lock:
+        if _default_cache is None and not _default_unavailable:
+            try:
+                _default_cache = LLMResponseCache()
+            except (OSError, sqlite3.Error):
+                _default_unavailable = True
+        return _default_cache
+
+
+_default_memo: Optional[ClassificationMemo] = None
+_default_memo_unavailable = False
+
+
+def get_default_classification_memo() -> Optional[ClassificationMemo]:
+    """Process-wide PO-line classification memo, or None when the cache is disabled/unavailable."""
+    global _default_memo, _default_memo_unavailable
+    if cache_disabled() or _default_memo_unavailable:
+        return None
+    with _default_lock:
+        if _default_memo is None and not _default_memo_unavailable:
+            try:
+                _default_memo = ClassificationMemo()
+            except (OSError, sqlite3.Error):
+                _default_memo_unavailable = True
+        return _default_memo
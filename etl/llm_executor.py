@@ -0,0 +1,115 @@
+"""
+Concurrent execution layer for Gemini calls.
+
+TokenBucket admits requests at a steady requests-per-minute rate with a small
+burst allowance. The lock only guards the token arithmetic; callers that have
+to wait sleep outside it, so one waiting thread never blocks the others from
+checking or refilling. A call can take more than one token (cost), so the same
+bucket also meters tokens-per-minute budgets. LLMExecutor keeps up to
+max_workers calls in flight on a thread pool and hands back
+concurrent.futures.Future objects.
+"""
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Iterable, List, Optional
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: rate_per_minute tokens per minute, at most burst banked.
+
+    wait_if_needed() matches the RateLimiter interface used by call_gemini_sync.
+    """
+
+    def __init__(self, rate_per_minute: float, burst: Optional[int] = None):
+        if rate_per_minute <= 0:
+            raise ValueError("rate_per_minute must be positive")
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = float(burst if burst is not None else max(1, min(int(rate_per_minute), 5)))
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def set_rate(self, rate_per_minute: float):
+        """Change the admission rate (tokens already banked are kept)."""
+        with self.lock:
+            self._refill(time.monotonic())
+            self.rate_per_second = max(rate_per_minute, 1e-6) / 60.0
+
+    def _refill(self, now: float):
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate_per_second)
+            self.updated_at = now
+
+    def try_acquire(self, cost: float = 1.0) -> float:
+        """Take cost tokens and return 0.0, or return the seconds until they are available."""
+        # A cost above the burst capacity could never be paid; it takes a full bucket instead
+        cost = min(cost, self.capacity)
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            if self.tokens >= cost:
+                self.tokens -= cost
+                return 0.0
+            return (cost - self.tokens) / self.rate_per_second
+
+    def acquire(self, timeout: Optional[float] = None, cost: float = 1.0) -> bool:
+        """Block until cost tokens are taken (sleeping without the lock). False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.try_acquire(cost)
+            if wait <= 0:
+                return True
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+    def wait_if_needed(self):
+        self.acquire()
+
+
+class LLMExecutor:
+    """
+    Thread-pool executor that keeps up to max_workers LLM calls in flight.
+
+    Tasks do their own admission through the shared bucket (pass executor.bucket
+    as the rate limiter), so cached responses never consume a token. Pass the
+    caller's existing limiter as bucket; with rate_per_minute=None and no
+    bucket, calls are not rate limited (bucket is None).
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        rate_per_minute: Optional[float] = 30,
+        burst: Optional[int] = None,
+        bucket: Optional[TokenBucket] = None,
+    ):
+        self.max_workers = max(1, int(max_workers))
+        if bucket is None and rate_per_minute is not None:
+            bucket = TokenBucket(rate_per_minute, burst)
+        self.bucket = bucket
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="llm")
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        return self._pool.submit(fn, *args, **kwargs)
+
+    def map_ordered(self, fn: Callable[[Any], Any], items: Iterable[Any]) -> List[Any]:
+        """Run fn over items concurrently; results come back in input order (exceptions re-raised)."""
+        futures = [self._pool.submit(fn, item) for item in items]
+        return [future.result() for future in futures]
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False):
+        self._pool.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown(wait=True, cancel_futures=exc_type is not None)
+        return False
@@ -0,0 +1,206 @@
+"""
+Shared retry policy and adaptive concurrency for Gemini calls.
+
+call_gemini_sync() had no retry at all (every 429 or 503 became "Not
+available" / "Unclassified") and the name normalizer slept a fixed
+retries * 10 s whenever "429" appeared in an error string. Both clients now
+send each request through call_with_retry():
+
+  * RetryPolicy: exponential backoff with full jitter for 408/429/5xx and
+    connection errors; a server-supplied delay (Retry-After header, or the
+    RetryInfo retryDelay Gemini puts in 429 bodies) is honoured instead.
+    Other 4xx errors are raised at once.
+  * AIMDController: caps calls in flight across the whole worker pool. Every
+    success adds 1/limit (about +1 per window of successes); a 429 halves the
+    limit and pauses all workers until the retry delay has passed. Decreases
+    within one cooldown count as a single congestion event.
+
+The generator engine installs a controller sized to max_workers for each run
+(set_default_controller); without one, calls are only retried.
+"""
+import email.utils
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+try:
+    import requests
+except ImportError:
+    requests = None
+
+RETRYABLE_STATUS = frozenset({408, 429, 500, 502, 503, 504})
+RETRY_DELAY_RE = re.compile(r"^\s*([0-9.]+)s\s*$")
+
+
+class LLMHTTPError(RuntimeError):
+    """Non-2xx response from the LLM API, with the server's retry hint if it gave one."""
+
+    def __init__(self, status: int, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when is None:
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def retry_after_from_response(response: Any) -> Optional[float]:
+    """Retry-After header, else google.rpc.RetryInfo.retryDelay ("17s") from a Gemini error body."""
+    retry_after = parse_retry_after(getattr(response, "headers", {}).get("Retry-After"))
+    if retry_after is not None:
+        return retry_after
+    try:
+        details = response.json().get("error", {}).get("details", [])
+    except Exception:
+        return None
+    for detail in details or []:
+        match = RETRY_DELAY_RE.match(str(detail.get("retryDelay", ""))) if isinstance(detail, dict) else None
+        if match:
+            return float(match.group(1))
+    return None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, LLMHTTPError):
+        return exc.status in RETRYABLE_STATUS
+    return requests is not None and isinstance(exc, (requests.ConnectionError, requests.Timeout))
+
+
+@dataclass
+class RetryPolicy:
+    """Exponential backoff with full jitter; max_attempts counts the first call."""
+    max_attempts: int = 5
+    base_delay: float = 1.0
+    max_delay: float = 60.0
+    multiplier: float = 2.0
+    # Longest server-requested wait we honour before giving up on the hint
+    max_retry_after: float = 300.0
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Seconds to wait before retry number attempt + 1."""
+        if retry_after is not None:
+            # Small jitter so workers released by the same hint do not retry in lockstep
+            return min(retry_after, self.max_retry_after) + random.uniform(0, self.base_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * self.multiplier ** attempt))
+
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
+
+
+class AIMDController:
+    """Additive-increase / multiplicative-decrease limit on concurrent calls, shared by all workers."""
+
+    def __init__(self, max_limit: int, min_limit: int = 1, decrease: float = 0.5, cooldown: float = 1.0):
+        self.max_limit = max(1, int(max_limit))
+        self.min_limit = max(1, min(int(min_limit), self.max_limit))
+        self.limit = float(self.max_limit)
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.throttles = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        """Block until the pool is not paused and a slot under the current limit is free."""
+        with self._cond:
+            while True:
+                wait = self.paused_until - time.monotonic()
+                if wait <= 0 and self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return
+                self._cond.wait(timeout=wait if wait > 0 else None)
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def on_success(self):
+        with self._cond:
+            if self.limit < self.max_limit:
+                self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+                self._cond.notify_all()
+
+    def on_throttle(self, pause: float):
+        """A 429: pause every worker for `pause` seconds and cut the limit (once per cooldown)."""
+        with self._cond:
+            now = time.monotonic()
+            self.paused_until = max(self.paused_until, now + pause)
+            if now - self._last_decrease >= max(self.cooldown, pause):
+                self.limit = max(float(self.min_limit), self.limit * self.decrease)
+                self._last_decrease = now
+                self.throttles += 1
+
+    def summary(self) -> str:
+        return f"Adaptive concurrency: {self.throttles} throttle events, limit {self.limit:.1f}/{self.max_limit}"
+
+
+_default_controller: Optional[AIMDController] = None
+
+
+def set_default_controller(controller: Optional[AIMDController]):
+    """Install (or with None, remove) the pool-wide controller used by call_with_retry()."""
+    global _default_controller
+    _default_controller = controller
+
+
+def get_default_controller() -> Optional[AIMDController]:
+    return _default_controller
+
+
+def call_with_retry(
+    send: Callable[[int], Any],
+    policy: Optional[RetryPolicy] = None,
+    controller: Optional[AIMDController] = None,
+    on_retry: Optional[Callable[[int, float, BaseException], None]] = None,
+) -> Any:
+    """
+    Run send(attempt) until it returns, retrying retryable errors per the policy.
+    send raises LLMHTTPError for non-2xx responses; anything else that is not a
+    connection error or timeout is raised immediately.
+    """
+    policy = policy or DEFAULT_RETRY_POLICY
+    controller = controller if controller is not None else get_default_controller()
+    attempt = 0
+    while True:
+        if controller is not None:
+            controller.acquire()
+        try:
+            result = send(attempt)
+        except Exception as exc:
+            if controller is not None:
+                controller.release()
+            if not is_retryable(exc) or attempt + 1 >= policy.max_attempts:
+                raise
+            delay = policy.backoff(attempt, getattr(exc, "retry_after", None))
+            if controller is not None and getattr(exc, "status", None) == 429:
+                controller.on_throttle(delay)
+            if on_retry is not None:
+                on_retry(attempt + 1, delay, exc)
+            time.sleep(delay)
+            attempt += 1
+            continue
+        if controller is not None:
+            controller.release()
+            controller.on_success()
+        return result
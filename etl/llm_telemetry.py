@@ -0,0 +1,225 @@
+"""
+Per-call telemetry for Gemini requests.
+
+call_gemini_sync() (Supplier Master Generator) and call_gemini() (name
+normalizer) used to discard usageMetadata and timing, so there was no way to
+tell whether enrichment, classification or consolidation dominated wall-clock
+time and spend. LLMTelemetry appends one JSON line per call with model,
+stage, prompt/completion tokens, latency, HTTP status, retry number, whether
+the LLM cache answered it, and the error if any (with any key=... query
+parameter redacted). summarize() aggregates a run into p50/p95 latency,
+token totals and an estimated cost per stage.
+
+The generator engine writes logs/llm_calls_<timestamp>.jsonl for every run
+and logs the summary at the end. Elsewhere telemetry is off unless a default
+is installed with set_default_telemetry() or LLM_TELEMETRY_PATH is set.
+
+  python -m etl.llm_telemetry logs/llm_calls_20260101_120000.jsonl   # print the summary again
+"""
+import json
+import math
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_TELEMETRY_DIR = ROOT / "logs"
+# USD per 1M (prompt, completion) tokens, list prices; unknown models are not costed
+MODEL_PRICES = {
+    "gemini-1.5-flash": (0.075, 0.30),
+    "gemini-2.0-flash": (0.10, 0.40),
+    "gemini-2.5-flash": (0.30, 2.50),
+    "gemini-2.5-pro": (1.25, 10.00),
+}
+# API keys in request URLs (e.g. ?key=...) that an exception message may quote
+API_KEY_PARAM = re.compile(r"(?i)\b(key=)[^&\s'\")]+")
+
+
+def redact_api_key(text: str) -> str:
+    return API_KEY_PARAM.sub(r"\1REDACTED", text)
+
+
+def default_telemetry_path() -> Path:
+    return DEFAULT_TELEMETRY_DIR / f"llm_calls_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+
+
+def usage_tokens(usage: Optional[Dict[str, Any]]) -> Dict[str, int]:
+    """Prompt/completion/total token counts from a Gemini usageMetadata dict."""
+    usage = usage or {}
+    prompt = int(usage.get("promptTokenCount") or 0)
+    # Thinking models bill thoughts as output tokens
+    completion = int(usage.get("candidatesTokenCount") or 0) + int(usage.get("thoughtsTokenCount") or 0)
+    total = int(usage.get("totalTokenCount") or prompt + completion)
+    return {"prompt_tokens": prompt, "completion_tokens": completion, "total_tokens": total}
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+    for name, (prompt_price, completion_price) in MODEL_PRICES.items():
+        if str(model).startswith(name):
+            return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+    return None
+
+
+class LLMTelemetry:
+    """Thread-safe JSONL recorder of LLM calls; also keeps the records for summarize()."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path) if path else default_telemetry_path()
+        self.records: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def record(
+        self,
+        stage: str,
+        model: str,
+        latency_s: float = 0.0,
+        status: Optional[int] = None,
+        usage: Optional[Dict[str, Any]] = None,
+        retries: int = 0,
+        cached: bool = False,
+        error: Optional[str] = None,
+    ):
+        record = {
+            "ts": time.time(),
+            "stage": stage,
+            "model": model,
+            **usage_tokens(usage),
+            "latency_s": round(latency_s, 4),
+            "status": status,
+            "retries": retries,
+            "cached": cached,
+        }
+        if error:
+            record["error"] = redact_api_key(error)[:300]
+        with self._lock:
+            self.records.append(record)
+            if not self._file.closed:
+                self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+                self._file.flush()
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return summarize(list(self.records))
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(records: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Per-stage totals: calls, cached, errors, retries, p50/p95 latency (API
+    calls only, cache hits excluded), tokens and estimated cost (None when
+    a model has no price).
+    """
+    by_stage: Dict[str, List[Dict[str, Any]]] = {}
+    for record in records:
+        by_stage.setdefault(record.get("stage") or "other", []).append(record)
+
+    out = {}
+    for stage, stage_records in sorted(by_stage.items()):
+        api = [r for r in stage_records if not r.get("cached")]
+        latencies = sorted(float(r.get("latency_s") or 0.0) for r in api)
+        cost = 0.0
+        for r in api:
+            call_cost = estimate_cost(r.get("model", ""), r.get("prompt_tokens", 0), r.get("completion_tokens", 0))
+            if call_cost is None:
+                cost = None
+                break
+            cost += call_cost
+        out[stage] = {
+            "calls": len(stage_records),
+            "cached": len(stage_records) - len(api),
+            "errors": sum(1 for r in stage_records if r.get("error")),
+            "retries": sum(int(r.get("retries") or 0) for r in stage_records),
+            "p50_latency_s": _percentile(latencies, 50),
+            "p95_latency_s": _percentile(latencies, 95),
+            "total_latency_s": sum(latencies),
+            "prompt_tokens": sum(int(r.get("prompt_tokens") or 0) for r in api),
+            "completion_tokens": sum(int(r.get("completion_tokens") or 0) for r in api),
+            "total_tokens": sum(int(r.get("total_tokens") or 0) for r in api),
+            "cost_usd": cost,
+        }
+    return out
+
+
+def format_summary(summary: Dict[str, Dict[str, Any]]) -> str:
+    """Fixed-width table of summarize() output, one line per stage plus a total."""
+    header = f"{'stage':<24}{'calls':>7}{'cached':>8}{'errors':>8}{'p50 s':>8}{'p95 s':>8}{'total s':>9}{'tokens':>11}{'cost $':>9}"
+    lines = [header, "-" * len(header)]
+    totals = {"calls": 0, "cached": 0, "errors": 0, "total_latency_s": 0.0, "total_tokens": 0, "cost_usd": 0.0}
+    for stage, s in summary.items():
+        cost = "n/a" if s["cost_usd"] is None else f"{s['cost_usd']:.4f}"
+        lines.append(f"{stage[:23]:<24}{s['calls']:>7}{s['cached']:>8}{s['errors']:>8}{s['p50_latency_s']:>8.2f}"
+                     f"{s['p95_latency_s']:>8.2f}{s['total_latency_s']:>9.1f}{s['total_tokens']:>11,}{cost:>9}")
+        for key in ("calls", "cached", "errors", "total_latency_s", "total_tokens"):
+            totals[key] += s[key]
+        totals["cost_usd"] = None if s["cost_usd"] is None or totals["cost_usd"] is None else totals["cost_usd"] + s["cost_usd"]
+    cost = "n/a" if totals["cost_usd"] is None else f"{totals['cost_usd']:.4f}"
+    lines.append(f"{'TOTAL':<24}{totals['calls']:>7}{totals['cached']:>8}{totals['errors']:>8}{'':>8}{'':>8}"
+                 f"{totals['total_latency_s']:>9.1f}{totals['total_tokens']:>11,}{cost:>9}")
+    return "\n".join(lines)
+
+
+def read_telemetry(path: str) -> List[Dict[str, Any]]:
+    records = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return records
+
+
+_default_telemetry: Optional[LLMTelemetry] = None
+_default_lock = threading.Lock()
+
+
+def set_default_telemetry(telemetry: Optional[LLMTelemetry]):
+    """Install (or with None, remove) the recorder used by call_gemini_sync()/call_gemini()."""
+    global _default_telemetry
+    with _default_lock:
+        _default_telemetry = telemetry
+
+
+def get_default_telemetry() -> Optional[LLMTelemetry]:
+    """The installed recorder; created from LLM_TELEMETRY_PATH on first use if that is set."""
+    global _default_telemetry
+    with _default_lock:
+        if _default_telemetry is None and os.environ.get("LLM_TELEMETRY_PATH"):
+            _default_telemetry = LLMTelemetry(os.environ["LLM_TELEMETRY_PATH"])
+        return _default_telemetry
+
+
+def main():
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Summarize an LLM telemetry JSONL file by stage")
+    ap.add_argument("path", help="Telemetry JSONL (e.g. logs/llm_calls_<timestamp>.jsonl)")
+    ap.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    args = ap.parse_args()
+    summary = summarize(read_telemetry(args.path))
+    print(json.dumps(summary, indent=2) if args.json else format_summary(summary))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Indexed SQLite store for the Genpact Supplier Master.
+
+The generator used to read the whole GenpactSupplierMaster.csv, rebuild every
+row, sort and rewrite it on each run, so run time tracked the size of the
+master instead of the size of the new PO file. SupplierMasterStore keeps the
+master in one SQLite table with an index on the lower-cased normalized name:
+a run fetches only the suppliers it saw and upserts only new and updated ones
+(all rows of a supplier are replaced in one transaction). CSV stays available
+as an on-demand export in the same column order and sort as before.
+
+The generator uses the store when its master path ends in .sqlite or .db.
+"""
+import math
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+MASTER_COLUMNS = [
+    'Normalized_Supplier_Name', 'Original_Name_Variants',
+    'Supplier_Description', 'Employee_Count', 'Revenue', 'Year_Established',
+    'Overall_Category', 'Category_Code', 'Category_Name', 'Category_Confidence', 'L3_Token_Probability', 'Confidence_Reasoning',
+    'Product_Service_Tags', 'Total_PO_Items',
+    'Ship_To_Countries', 'Country_Codes', 'Last_Updated'
+]
+STORE_SUFFIXES = ('.sqlite', '.db')
+# SQLite's default limit on bound parameters per statement is 999
+LOOKUP_CHUNK = 500
+
+
+def is_store_path(path: str) -> bool:
+    return Path(str(path)).suffix.lower() in STORE_SUFFIXES
+
+
+def name_key(name: Any) -> str:
+    """Lookup key for a normalized supplier name (same as the CSV path: stripped, lower-cased)."""
+    return str(name).strip().lower()
+
+
+def _sql_value(value: Any) -> Any:
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    if isinstance(value, (str, int, float)):
+        return value
+    if hasattr(value, 'item'):
+        # numpy scalar
+        return value.item()
+    return str(value)
+
+
+class SupplierMasterStore:
+    """SQLite-backed master with keyed per-supplier upserts; safe to share between threads."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        columns_sql = ", ".join(f'"{col}"' for col in MASTER_COLUMNS)
+        self._conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS supplier_master (
+                row_id INTEGER PRIMARY KEY,
+                name_key TEXT NOT NULL,
+                {columns_sql}
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_supplier_master_name ON supplier_master (name_key)")
+        self._conn.commit()
+        self._select = f"SELECT name_key, {columns_sql} FROM supplier_master"
+        self._insert = (
+            f"INSERT INTO supplier_master (name_key, {columns_sql}) "
+            f"VALUES (?, {', '.join('?' * len(MASTER_COLUMNS))})"
+        )
+
+    def fetch(self, names: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Stored rows for these supplier names keyed by name_key (last row per supplier, like the CSV path)."""
+        keys = sorted({name_key(name) for name in names if name and str(name).strip()})
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), LOOKUP_CHUNK):
+                chunk = keys[start:start + LOOKUP_CHUNK]
+                rows = self._conn.execute(
+                    f"{self._select} WHERE name_key IN ({','.join('?' * len(chunk))}) ORDER BY row_id",
+                    chunk,
+                ).fetchall()
+                for row in rows:
+                    found[row[0]] = dict(zip(MASTER_COLUMNS, row[1:]))
+        return found
+
+    def upsert_suppliers(self, rows_by_name: Dict[str, List[Dict[str, Any]]]) -> int:
+        """Replace all stored rows of each supplier with the given rows; returns rows written."""
+        written = 0
+        with self._lock:
+            with self._conn:
+                for name, rows in rows_by_name.items():
+                    key = name_key(name)
+                    self._conn.execute("DELETE FROM supplier_master WHERE name_key = ?", (key,))
+                    self._conn.executemany(
+                        self._insert,
+                        [[key] + [_sql_value(row.get(col)) for col in MASTER_COLUMNS] for row in rows],
+                    )
+                    written += len(rows)
+        return written
+
+    def import_dataframe(self, df: pd.DataFrame) -> int:
+        """Load an existing master (e.g. GenpactSupplierMaster.csv) into the store, replacing matching suppliers."""
+        rows_by_name: Dict[str, List[Dict[str, Any]]] = {}
+        if 'Normalized_Supplier_Name' not in df.columns:
+            return 0
+        for row in df.to_dict('records'):
+            name = row.get('Normalized_Supplier_Name')
+            if name is None or (isinstance(name, float) and math.isnan(name)) or not str(name).strip():
+                continue
+            rows_by_name.setdefault(name_key(name), []).append(row)
+        return self.upsert_suppliers(rows_by_name)
+
+    def supplier_count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(DISTINCT name_key) FROM supplier_master").fetchone()[0]
+
+    def row_count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM supplier_master").fetchone()[0]
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Whole master in the CSV layout, sorted by Normalized_Supplier_Name."""
+        with self._lock:
+            rows = self._conn.execute(f"{self._select} ORDER BY row_id").fetchall()
+        df = pd.DataFrame([row[1:] for row in rows], columns=MASTER_COLUMNS)
+        return df.sort_values('Normalized_Supplier_Name', key=lambda x: x.astype(str), kind='stable').reset_index(drop=True)
+
+    def export_csv(self, file_path: str) -> int:
+        """Write the master as CSV (same layout as GenpactSupplierMaster.csv); returns rows written."""
+        df = self.to_dataframe()
+        df.to_csv(file_path, index=False, encoding='utf-8')
+        return len(df)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def open_master_store(path: str) -> Optional[SupplierMasterStore]:
+    """Store for a .sqlite/.db master path, None for a CSV master."""
+    return SupplierMasterStore(path) if is_store_path(path) else None
+
+
+def main():
+    """python -m etl.master_store export|import ... (on-demand CSV conversion)"""
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Genpact Supplier Master store: CSV import/export")
+    sub = ap.add_subparsers(dest="command", required=True)
+    export = sub.add_parser("export", help="Write the store as GenpactSupplierMaster-style CSV")
+    export.add_argument("store", help="Path to .sqlite/.db master store")
+    export.add_argument("csv", help="Output CSV path")
+    load = sub.add_parser("import", help="Load an existing master CSV into the store")
+    load.add_argument("csv", help="Existing GenpactSupplierMaster.csv")
+    load.add_argument("store", help="Path to .sqlite/.db master store (created if missing)")
+    args = ap.parse_args()
+
+    store = SupplierMasterStore(args.store)
+    try:
+        if args.command == "export":
+            print(f"Exported {store.export_csv(args.csv)} rows to {args.csv}")
+        else:
+            try:
+                df = pd.read_csv(args.csv, encoding="utf-8")
+            except UnicodeDecodeError:
+                df = pd.read_csv(args.csv, encoding="latin-1")
+            print(f"Imported {store.import_dataframe(df)} rows ({store.supplier_count()} suppliers in store)")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
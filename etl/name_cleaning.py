@@ -0,0 +1,191 @@
+"""
+Shared supplier-name cleaning engine.
+
+One implementation of the three cleaning recipes used across the project:
+  - GroupingNameCleaner   clean_name() in supplier_name_normalizer.py and etl/supplier_normalize.py
+  - ComparisonNameCleaner clean_company_name() in the supplier master generator
+  - CanonicalNameCleaner  clean_canonical_name() in the supplier master generator
+
+Callers keep their own vocabularies (legal suffixes, prefix/location words) and
+pass them in; the patterns are compiled once into single alternations and the
+word lists become set lookups. clean_many() cleans a whole column and only
+cleans each distinct value once, which is where most of the time goes on
+transaction files with repeated supplier names.
+"""
+import re
+import unicodedata
+from typing import Iterable, List, Sequence
+
+COMBINING_MARKS = re.compile("[\u0300-\u036f]")
+WHITESPACE = re.compile(r"\s+")
+
+# DBA / AKA / FKA / C/O / ATTN markers are deleted outright (no spacer, so
+# "x-aka-y" stays "x--y"), then punctuation (hyphens kept) and short numbers
+# (account codes) are replaced by a space in one pass
+GROUPING_MARKERS = re.compile(r"\b(?:d/b/a|a/k/a|dba|aka|fka|c/o|attn)\b")
+GROUPING_NOISE = re.compile(r"[^\w\s-]|\b\d{1,3}\b")
+
+PARENTHESIZED = re.compile(r"\([^)]*\)")
+PARENTHESIZED_SPACED = re.compile(r"\s*\([^)]*\)\s*")
+NON_WORD_OR_AMP = re.compile(r"[^\w\s&]")
+SPACED_AMPERSAND = re.compile(r"\s+&\s+")
+NON_WORD = re.compile(r"[^\w]")
+TRAILING_PUNCT = re.compile(r"[\s,-]+$")
+LEADING_PUNCT = re.compile(r"^[\s,-]+")
+SHORT_UPPER_WORD = re.compile(r"^[A-Z0-9&]+$")
+
+
+class BatchCleaner:
+    """Base class: clean() one value, clean_many() a column with duplicate inputs cleaned once."""
+
+    def clean(self, raw) -> str:
+        raise NotImplementedError
+
+    def __call__(self, raw) -> str:
+        return self.clean(raw)
+
+    def clean_many(self, names: Iterable) -> List[str]:
+        """Clean every value in order; repeated inputs reuse the first result."""
+        memo = {}
+        clean = self.clean
+        out = []
+        append = out.append
+        for name in names:
+            cleaned = memo.get(name)
+            if cleaned is None:
+                cleaned = memo[name] = clean(name)
+            append(cleaned)
+        return out
+
+
+class GroupingNameCleaner(BatchCleaner):
+    """
+    Deterministic cleaning for grouping/deduplication:
+    - Unicode normalization (NFKD, strip combining marks)
+    - Lowercase, '&' -> 'and'
+    - Remove DBA / AKA / FKA / C/O / ATTN markers
+    - Strip non-alphanumeric (keep spaces and hyphens) and standalone 1-3 digit numbers
+    - Remove legal suffixes from the end and filler prefix words from the start
+    """
+
+    def __init__(self, legal_suffixes: Iterable[str], strip_prefix_words: Iterable[str]):
+        self.legal_suffixes = frozenset(legal_suffixes)
+        self.strip_prefix_words = frozenset(strip_prefix_words)
+
+    def clean(self, raw) -> str:
+        if not raw:
+            return ""
+        s = str(raw).strip()
+        # Skip if looks like a number or is too short
+        if len(s) < 2 or s.isdecimal():
+            return ""
+        # NFKD is the identity on ASCII, which is nearly every supplier name
+        if not s.isascii():
+            s = COMBINING_MARKS.sub("", unicodedata.normalize("NFKD", s))
+        s = s.lower().replace("&", " and ")
+        tokens = GROUPING_NOISE.sub(" ", GROUPING_MARKERS.sub("", s)).split()
+
+        legal_suffixes = self.legal_suffixes
+        while len(tokens) > 1 and tokens[-1] in legal_suffixes:
+            tokens.pop()
+        start = 0
+        prefix_words = self.strip_prefix_words
+        while len(tokens) - start > 1 and tokens[start] in prefix_words:
+            start += 1
+        return " ".join(tokens[start:])
+
+
+class ComparisonNameCleaner(BatchCleaner):
+    """
+    Cleaning for similarity scoring: lowercase, drop parenthesised text and
+    punctuation, then drop legal suffixes, ignored (location) words and
+    single-character tokens wherever they appear.
+    """
+
+    def __init__(self, legal_suffixes: Iterable[str], ignore_words: Iterable[str]):
+        self.legal_suffixes = frozenset(legal_suffixes)
+        self.ignore_words = frozenset(ignore_words)
+
+    def clean(self, raw) -> str:
+        if not raw:
+            return ""
+        name = str(raw).lower().strip()
+        if "(" in name:
+            name = PARENTHESIZED.sub("", name)
+        name = NON_WORD_OR_AMP.sub(" ", name)
+        if "&" in name:
+            name = SPACED_AMPERSAND.sub(" and ", name)
+        tokens = name.split()
+
+        legal_suffixes = self.legal_suffixes
+        ignore_words = self.ignore_words
+        filtered = [
+            token for token in tokens
+            if token not in legal_suffixes and token not in ignore_words
+            and (len(token) > 1 or token == "&")
+        ]
+        if not filtered:
+            filtered = [token for token in tokens if token not in legal_suffixes]
+        if not filtered:
+            filtered = tokens
+        return " ".join(filtered)
+
+
+class CanonicalNameCleaner(BatchCleaner):
+    """
+    Cleaning for the output (canonical) name: keeps the original casing, drops
+    parenthesised text, legal-form patterns and location words, and title-cases
+    names that are entirely upper or lower case (short all-caps words stay
+    upper case as likely acronyms).
+    """
+
+    def __init__(self, suffix_patterns: Sequence[str], location_words: Iterable[str]):
+        # Alternatives are tried left to right, so list order still decides overlaps
+        self.suffix_pattern = re.compile(
+            "|".join(f"(?:{pattern})" for pattern in suffix_patterns), re.IGNORECASE
+        )
+        self.location_words = frozenset(location_words)
+
+    def _strip_suffixes(self, text: str) -> str:
+        if "(" in text:
+            text = PARENTHESIZED_SPACED.sub(" ", text)
+        return self.suffix_pattern.sub(" ", text)
+
+    def clean(self, raw) -> str:
+        if not raw:
+            return ""
+
+        original = str(raw).strip()
+        stripped = self._strip_suffixes(original)
+
+        location_words = self.location_words
+        kept = []
+        for word in stripped.split():
+            word_clean = NON_WORD.sub("", word).lower()
+            if word_clean and word_clean not in location_words:
+                kept.append(word)
+        result = " ".join(kept)
+        result = TRAILING_PUNCT.sub("", result)
+        result = LEADING_PUNCT.sub("", result)
+        result = WHITESPACE.sub(" ", result).strip()
+
+        if len(result) < 2:
+            # Location words only (e.g. "India Pvt Ltd"): keep them
+            result = WHITESPACE.sub(" ", stripped).strip()
+            result = TRAILING_PUNCT.sub("", result)
+
+        if len(result) < 2:
+            result = original
+
+        if result == result.upper() or result == result.lower():
+            words = []
+            for word in result.split():
+                if len(word) <= 4 and SHORT_UPPER_WORD.match(word):
+                    words.append(word.upper())
+                elif "&" in word:
+                    words.append(word.upper())
+                else:
+                    words.append(word.capitalize())
+            result = " ".join(words)
+
+        return result
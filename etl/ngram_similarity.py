@@ -0,0 +1,169 @@
+"""
+Character n-gram TF-IDF similarity for supplier names.
+
+Turns cleaned names into sparse, L2-normalised char-trigram TF-IDF vectors so
+that one-vs-many and top-k cosine neighbours come from sparse matrix products
+instead of pairwise difflib calls. Used to pick candidate pairs before the
+detailed (and slower) multi-signal scoring runs.
+
+Requires numpy and scipy; NGRAM_BACKEND_AVAILABLE is False when they are missing.
+"""
+import math
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:
+    np = None
+    sparse = None
+
+NGRAM_BACKEND_AVAILABLE = np is not None and sparse is not None
+
+
+def char_ngrams(text: str, n: int = 3) -> List[str]:
+    """Character n-grams of a name, padded with one space on each side."""
+    if not text:
+        return []
+    padded = f" {text} "
+    if len(padded) < n:
+        return [padded]
+    return [padded[i:i + n] for i in range(len(padded) - n + 1)]
+
+
+class NgramIndex:
+    """
+    Sparse char-n-gram TF-IDF matrix over a fixed list of names.
+
+    Rows are L2-normalised, so a row-by-row dot product is the cosine
+    similarity. Row order follows the names passed in.
+    """
+
+    def __init__(self, names: Iterable[str], ngram_size: int = 3, chunk_size: int = 2000):
+        if not NGRAM_BACKEND_AVAILABLE:
+            raise ImportError("NgramIndex requires numpy and scipy (pip install numpy scipy)")
+        self.names = [str(name) if name is not None else "" for name in names]
+        self.ngram_size = ngram_size
+        self.chunk_size = chunk_size
+        self.vocabulary: Dict[str, int] = {}
+        self.idf = None
+        self.matrix = self._fit()
+
+    def _fit(self):
+        vocabulary = self.vocabulary
+        counts = []
+        doc_freq: Counter = Counter()
+        for name in self.names:
+            grams = Counter(char_ngrams(name, self.ngram_size))
+            counts.append(grams)
+            doc_freq.update(grams.keys())
+
+        for gram in doc_freq:
+            vocabulary[gram] = len(vocabulary)
+
+        # Smoothed idf, as in sklearn's TfidfVectorizer
+        n_docs = len(self.names)
+        idf = np.empty(len(vocabulary), dtype=np.float64)
+        for gram, col in vocabulary.items():
+            idf[col] = math.log((1 + n_docs) / (1 + doc_freq[gram])) + 1.0
+        self.idf = idf
+
+        indptr = [0]
+        indices: List[int] = []
+        data: List[float] = []
+        for grams in counts:
+            for gram, tf in grams.items():
+                indices.append(vocabulary[gram])
+                data.append(float(tf))
+            indptr.append(len(indices))
+
+        matrix = sparse.csr_matrix(
+            (np.asarray(data, dtype=np.float64), np.asarray(indices, dtype=np.int32), np.asarray(indptr)),
+            shape=(n_docs, len(vocabulary)),
+        )
+        matrix = matrix.multiply(idf).tocsr()
+        return _l2_normalize(matrix)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def transform(self, queries: Iterable[str]):
+        """Vectorise new names with the fitted vocabulary (unseen n-grams are dropped)."""
+        indptr = [0]
+        indices: List[int] = []
+        data: List[float] = []
+        for query in queries:
+            for gram, tf in Counter(char_ngrams(str(query), self.ngram_size)).items():
+                col = self.vocabulary.get(gram)
+                if col is not None:
+                    indices.append(col)
+                    data.append(tf * self.idf[col])
+            indptr.append(len(indices))
+        matrix = sparse.csr_matrix(
+            (np.asarray(data, dtype=np.float64), np.asarray(indices, dtype=np.int32), np.asarray(indptr)),
+            shape=(len(indptr) - 1, len(self.vocabulary)),
+        )
+        return _l2_normalize(matrix)
+
+    def similarities(self, query: str):
+        """Cosine similarity of one name against every indexed name (dense array)."""
+        vector = self.transform([query])
+        return np.asarray((self.matrix @ vector.T).todense()).ravel()
+
+    def most_similar(self, query: str, k: int = 10, min_similarity: float = 0.0) -> List[Tuple[int, float]]:
+        """Top-k indexed rows for a single name as (row, cosine), best first."""
+        scores = self.similarities(query)
+        return _top_k(np.arange(len(scores)), scores, k, min_similarity)
+
+    def top_k_neighbors(
+        self,
+        k: int = 10,
+        min_similarity: float = 0.5,
+        rows: Optional[Iterable[int]] = None
+    ) -> Iterator[Tuple[int, List[Tuple[int, float]]]]:
+        """
+        Yield (row, [(neighbour, cosine), ...]) for every indexed name.
+
+        The self-match is excluded. Rows are multiplied in chunks of chunk_size
+        so memory stays bounded on large name lists.
+        """
+        row_ids = np.arange(len(self.names)) if rows is None else np.asarray(list(rows), dtype=np.int64)
+        transposed = self.matrix.T.tocsc()
+        for start in range(0, len(row_ids), self.chunk_size):
+            chunk = row_ids[start:start + self.chunk_size]
+            product = (self.matrix[chunk] @ transposed).tocsr()
+            for offset, row in enumerate(chunk):
+                lo, hi = product.indptr[offset], product.indptr[offset + 1]
+                cols = product.indices[lo:hi]
+                scores = product.data[lo:hi]
+                keep = cols != row
+                yield int(row), _top_k(cols[keep], scores[keep], k, min_similarity)
+
+    def candidate_pairs(self, k: int = 10, min_similarity: float = 0.5) -> List[Tuple[int, int, float]]:
+        """Symmetric set of (i, j, cosine) pairs with i < j from the top-k neighbour lists."""
+        pairs: Dict[Tuple[int, int], float] = {}
+        for row, neighbours in self.top_k_neighbors(k, min_similarity):
+            for other, score in neighbours:
+                key = (row, other) if row < other else (other, row)
+                pairs[key] = score
+        return [(i, j, score) for (i, j), score in sorted(pairs.items())]
+
+
+def _l2_normalize(matrix):
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.diags(1.0 / norms).dot(matrix).tocsr()
+
+
+def _top_k(cols, scores, k: int, min_similarity: float) -> List[Tuple[int, float]]:
+    mask = scores >= min_similarity
+    cols, scores = cols[mask], scores[mask]
+    if len(scores) > k:
+        # Keep everything tied with the k-th score so the row tie-break below decides
+        kth = -np.partition(-scores, k - 1)[k - 1]
+        keep = scores >= kth
+        cols, scores = cols[keep], scores[keep]
+    # Best first; ties broken by row so results are deterministic
+    order = np.lexsort((cols, -scores))[:k]
+    return [(int(cols[i]), float(scores[i])) for i in order]
@@ -0,0 +1,133 @@
+"""
+Append-only checkpoint journal for Supplier Master Generator runs.
+
+process_all_data() keeps new and updated master rows in memory until the final
+save, so a crash near the end of a long run used to lose every enrichment and
+classification. SupplierJournal appends one JSON line per completed supplier
+(flushed and fsynced) to <master>.journal.jsonl next to the output file. A
+resumed run replays the journal and only processes suppliers that are not in
+it; the journal is removed once the master has been saved.
+
+The first line is a header with a run key (taxonomy version and model), so a
+journal written for a different taxonomy or model is never replayed. A torn
+last line from a crash mid-write is ignored. read_journal() returns the
+records of a journal that is still being written, for inspecting partial output.
+
+A journal with records that a new run will not replay (no resume, or a
+different run key) is never truncated: it is first renamed to
+<master>.journal.jsonl.bak, so a rerun that forgot --resume does not destroy
+the only recovery record. Rename it back and resume to use it.
+"""
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+JOURNAL_FORMAT = 1
+
+
+def journal_path_for(master_path: str) -> Path:
+    """Journal file used for a master CSV path."""
+    return Path(str(master_path) + ".journal.jsonl")
+
+
+def backup_path_for(journal_path: Path) -> Path:
+    """Where a journal that is not replayed is kept (one generation)."""
+    return Path(str(journal_path) + ".bak")
+
+
+def read_journal(path: str) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+    """(header, supplier records) of a journal; unreadable lines are skipped."""
+    header = None
+    records = []
+    path = Path(path)
+    if not path.is_file():
+        return None, []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # Torn write from a crash; everything before it is intact
+                continue
+            if record.get("type") == "header":
+                header = record
+            else:
+                records.append(record)
+    return header, records
+
+
+class SupplierJournal:
+    """
+    Thread-safe JSONL journal of completed suppliers.
+
+    Records are keyed by (kind, supplier), kind being "new" or "update". With
+    resume=True, records from an earlier journal with the same run key are
+    loaded and kept; otherwise the journal starts empty, and an earlier journal
+    with records is moved to backup_path (discarded counts its records).
+    """
+
+    def __init__(self, path: str, run_key: str, resume: bool = False):
+        self.path = Path(path)
+        self.run_key = run_key
+        self.entries: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.discarded = 0
+        self.backup_path: Optional[Path] = None
+        self._lock = threading.Lock()
+
+        if resume:
+            header, records = read_journal(str(self.path))
+            if header and header.get("format") == JOURNAL_FORMAT and header.get("run_key") == run_key:
+                for record in records:
+                    self.entries[(record.get("type"), record.get("supplier"))] = record
+            else:
+                self.discarded = len(records)
+        elif self.path.is_file():
+            self.discarded = len(read_journal(str(self.path))[1])
+        if self.discarded:
+            self.backup_path = backup_path_for(self.path)
+            os.replace(self.path, self.backup_path)
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Rewrite header + kept records so a stale or torn tail never survives
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._write({"type": "header", "format": JOURNAL_FORMAT, "run_key": run_key, "started_at": time.time()})
+        for record in self.entries.values():
+            self._write(record)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _write(self, record: Dict[str, Any]):
+        self._file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def completed(self, kind: str, supplier: str) -> Optional[Dict[str, Any]]:
+        """Journaled record for a supplier, or None if it still has to be processed."""
+        return self.entries.get((kind, supplier))
+
+    def record(self, kind: str, supplier: str, **payload: Any):
+        """Durably append one completed supplier."""
+        record = {"type": kind, "supplier": supplier, "completed_at": time.time(), **payload}
+        with self._lock:
+            self._write(record)
+            self.entries[(kind, supplier)] = record
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def finish(self):
+        """Close and delete the journal (the master file now holds its rows)."""
+        self.close()
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
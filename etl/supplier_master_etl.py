@@ -24,7 +24,7 @@ ROOT = Path(__file__).resolve().parent.parent
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from etl.supplier_normalize import clean_name, name_key_for_match
+from etl.supplier_normalize import clean_name, clean_names, name_key_for_match
 
 try:
     import psycopg2
@@ -84,12 +84,12 @@ def load_transaction_csv(
     item_col = _find_column(first, ITEM_DESC_COLUMNS)
     if not name_col:
         raise ValueError(f"No supplier name column found in CSV. Tried: {DEFAULT_SUPPLIER_NAME_COLUMNS}. Columns: {list(first.keys())}")
+    raw_names = [_clean_val(r.get(name_col)) for r in rows]
+    normalized = clean_names(raw_names)
     out = []
-    for r in rows:
-        raw_name = _clean_val(r.get(name_col))
+    for r, raw_name, norm in zip(rows, raw_names, normalized):
         if not raw_name:
             continue
-        norm = clean_name(raw_name)
         if not norm:
             norm = raw_name
         rec = {
@@ -148,9 +148,14 @@ def fetch_existing_supplier_master(cur) -> dict[str, str]:
         FROM ref.supplier_master
     """)
     out = {}
-    for gid, name in cur.fetchall():
+    rows = cur.fetchall()
+    for gid, name in rows:
         if name:
             out[name.strip().lower()] = gid
+    # Rows keyed by an older clean_name still match today's normalized names
+    for gid, name in rows:
+        if name:
+            out.setdefault(clean_name(name) or name.strip().lower(), gid)
     return out
 
 
@@ -193,6 +198,11 @@ def ensure_ref_tables(cur):
         CREATE INDEX IF NOT EXISTS idx_ref_supplier_master_name
         ON ref.supplier_master (normalized_supplier_name)
     """)
+    # Case-insensitive name lookup of the enrichment store (etl/enrichment_store.py)
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_ref_supplier_master_name_lower
+        ON ref.supplier_master (lower(normalized_supplier_name))
+    """)
     cur.execute("""
         CREATE TABLE IF NOT EXISTS ref.global_supplier_data_master (
             genpact_supplier_id TEXT NOT NULL PRIMARY KEY REFERENCES ref.supplier_master(genpact_supplier_id),
@@ -206,9 +216,17 @@ def ensure_ref_tables(cur):
             product_service_tags TEXT,
             ship_to_countries TEXT,
             country_codes TEXT,
+            enrichment_confidence REAL,
+            enriched_at TIMESTAMP,
             date_added TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     """)
+    # Enrichment store columns (etl/enrichment_store.py) for tables created before they existed
+    cur.execute("""
+        ALTER TABLE ref.global_supplier_data_master
+        ADD COLUMN IF NOT EXISTS enrichment_confidence REAL,
+        ADD COLUMN IF NOT EXISTS enriched_at TIMESTAMP
+    """)
 
 
 def run_supplier_master_etl(
@@ -354,29 +372,47 @@ def run_supplier_master_etl(
         conn.close()
 
 
+_enrich_module = None
+_enrich_rate_limiter = None
+
+
+def _load_enrich_module():
+    """Bhavin's generator script, loaded once per process with its HTTP calls on the pooled Gemini transport."""
+    global _enrich_module, _enrich_rate_limiter
+    if _enrich_module is not None:
+        return _enrich_module
+    # Try to load Bhavin's module from ../Documents/supplier_master_generator 1.py
+    parent = ROOT.parent
+    gen_path = parent / "Documents" / "supplier_master_generator 1.py"
+    if not gen_path.is_file():
+        return None
+    import importlib.util
+    spec = importlib.util.spec_from_file_location("smg", str(gen_path))
+    if spec is None or spec.loader is None:
+        return None
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules["smg"] = mod
+    spec.loader.exec_module(mod)
+    if getattr(mod, "requests", None) is not None:
+        # Keep-alive connections instead of a new TLS handshake per call
+        from etl.gemini_transport import PooledRequests
+        mod.requests = PooledRequests()
+    rate_limiter = getattr(mod, "RateLimiter", None)
+    _enrich_rate_limiter = rate_limiter(max_rpm=30) if rate_limiter else None
+    _enrich_module = mod
+    return mod
+
+
 def _enrich_one(norm_name: str, data: dict) -> tuple[str, str, str, str, str]:
     """Optional enrichment via Bhavin's script (if available). Returns (description, l1, l2, l3, product_service_tags)."""
     try:
-        # Try to load Bhavin's module from ../Documents/supplier_master_generator 1.py
-        parent = ROOT.parent
-        gen_path = parent / "Documents" / "supplier_master_generator 1.py"
-        if not gen_path.is_file():
-            return "", "", "", "", ""
-        import importlib.util
-        spec = importlib.util.spec_from_file_location("smg", str(gen_path))
-        if spec is None or spec.loader is None:
-            return "", "", "", "", ""
-        mod = importlib.util.module_from_spec(spec)
-        sys.modules["smg"] = mod
-        spec.loader.exec_module(mod)
         api_key = os.environ.get("GEMINI_API_KEY", "")
         if not api_key:
             return "", "", "", "", ""
-        rate_limiter = getattr(mod, "RateLimiter", None)
-        if rate_limiter:
-            rl = rate_limiter(max_rpm=30)
-        else:
-            rl = None
+        mod = _load_enrich_module()
+        if mod is None:
+            return "", "", "", "", ""
+        rl = _enrich_rate_limiter
         desc, emp, rev, yr = "Not available", "Unknown", "Unknown", "Unknown"
         if hasattr(mod, "enrich_supplier") and rl:
             try:
@@ -4,7 +4,8 @@ Used by supplier master ETL for: clean_name, get_group_key, classify_entity.
 No GUI/tkinter/pandas dependency.
 """
 import re
-import unicodedata
+
+from etl.name_cleaning import GroupingNameCleaner
 
 # Legal suffixes to strip (from Bhavin's script)
 LEGAL_SUFFIXES = {
@@ -55,33 +56,17 @@ COMMON_FIRST_WORDS = {
     'advanced', 'applied', 'best', 'blue', 'city', 'custom', 'digital', 'direct',
     'global', 'key', 'star', 'sun', 'top', 'total', 'us', 'usa', 'world', 'pro',
 }
+NAME_CLEANER = GroupingNameCleaner(LEGAL_SUFFIXES, STRIP_PREFIX_WORDS)
 
 
 def clean_name(raw: str) -> str:
     """Deterministic name cleaning for grouping. Same logic as Bhavin's supplier_master_generator."""
-    if not raw:
-        return ''
-    s = str(raw).strip()
-    if re.match(r'^\W+\d+$', s) or len(s) < 2:
-        return ''
-    s = unicodedata.normalize('NFKD', s)
-    s = re.sub(r'[\u0300-\u036f]', '', s)
-    s = s.lower()
-    s = s.replace('&', ' and ')
-    s = re.sub(r'\bdba\b', '', s)
-    s = re.sub(r'\bdb/b/a\b', '', s)
-    s = re.sub(r'\baka\b', '', s)
-    s = re.sub(r'\ba/k/a\b', '', s)
-    s = re.sub(r'\bfka\b', '', s)
-    s = re.sub(r'\bc/o\b', '', s)
-    s = re.sub(r'\battn\b', '', s)
-    s = re.sub(r'^\W+\s-', '', s)
-    s = re.sub(r'\b\d{1,3}\b', '', s)
-    s = re.sub(r'\s+', ' ', s).strip()
-    tokens = s.split(' ')
-    while len(tokens) > 1 and tokens[0] in STRIP_PREFIX_WORDS:
-        tokens.pop(0)
-    return ' '.join(tokens).strip()
+    return NAME_CLEANER.clean(raw)
+
+
+def clean_names(raw_names) -> list:
+    """clean_name() over a whole column; duplicate names are only cleaned once."""
+    return NAME_CLEANER.clean_many(raw_names)
 
 
 def get_group_key(cleaned: str) -> str:
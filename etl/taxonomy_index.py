@@ -0,0 +1,211 @@
+"""
+Prebuilt index over the L1/L2/L3 category taxonomy for candidate prefiltering.
+
+prefilter_categories() in the supplier master generator used to re-tokenize
+every taxonomy path and run a tokens x categories x category-tokens substring
+loop on every classification call. TaxonomyIndex tokenizes the taxonomy once
+and keeps:
+  - an inverted index token -> [(category, BM25 weight)]
+  - a substring map (every 3+ char substring of a vocabulary token -> tokens
+    containing it), so partial matches are dictionary lookups
+A query scores exact token hits at full BM25 weight and partial (substring
+either way) hits at half weight, then returns the top-k paths. Categories with
+no hit keep their taxonomy order, as before.
+
+Indexes are JSON-serializable and stamped with taxonomy_version(), so
+load_or_build() reuses an index saved by a previous run of the same taxonomy.
+"""
+import hashlib
+import heapq
+import json
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+TOKEN_SPLIT = re.compile(r"\W+")
+MIN_TOKEN_LEN = 3
+PARTIAL_MATCH_WEIGHT = 0.5
+BM25_K1 = 1.2
+BM25_B = 0.75
+INDEX_FORMAT = 1
+
+
+def taxonomy_tokens(text: str) -> set:
+    """Lower-cased word tokens of 3+ characters (shorter ones never scored)."""
+    return {t for t in TOKEN_SPLIT.split(text.lower()) if len(t) >= MIN_TOKEN_LEN}
+
+
+def category_path(cat: Dict) -> Tuple[str, str, str]:
+    return (str(cat.get("l1", "")), str(cat.get("l2", "")), str(cat.get("l3", "")))
+
+
+def taxonomy_version(categories: Sequence[Dict]) -> str:
+    """Stable hash of the taxonomy paths; changes when any category is added, removed or renamed."""
+    paths = sorted({category_path(cat) for cat in categories})
+    return hashlib.sha256(json.dumps(paths, ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+
+
+class TaxonomyIndex:
+    """Inverted BM25 index with substring lookups over a list of {l1, l2, l3} categories."""
+
+    def __init__(self, categories: Sequence[Dict]):
+        self.categories = [dict(cat) for cat in categories]
+        self.version = taxonomy_version(self.categories)
+        self.postings: Dict[str, List[Tuple[int, float]]] = {}
+        self.substrings: Dict[str, List[str]] = {}
+        self._build()
+
+    def _build(self):
+        docs = []
+        for cat in self.categories:
+            l1, l2, l3 = category_path(cat)
+            docs.append(Counter(t for t in TOKEN_SPLIT.split(f"{l1} {l2} {l3}".lower())
+                                if len(t) >= MIN_TOKEN_LEN))
+        n_docs = len(docs)
+        avg_len = (sum(sum(doc.values()) for doc in docs) / n_docs) if n_docs else 0.0
+        doc_freq = Counter()
+        for doc in docs:
+            doc_freq.update(doc.keys())
+
+        postings = defaultdict(list)
+        for cat_idx, doc in enumerate(docs):
+            length = sum(doc.values())
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * (length / avg_len if avg_len else 0.0))
+            for token, tf in doc.items():
+                idf = math.log(1 + (n_docs - doc_freq[token] + 0.5) / (doc_freq[token] + 0.5))
+                postings[token].append((cat_idx, idf * tf * (BM25_K1 + 1) / (tf + norm)))
+        self.postings = dict(postings)
+
+        substrings = defaultdict(set)
+        for token in self.postings:
+            for i in range(len(token)):
+                for j in range(i + MIN_TOKEN_LEN, len(token) + 1):
+                    substrings[token[i:j]].add(token)
+        self.substrings = {key: sorted(tokens) for key, tokens in substrings.items()}
+
+    def __len__(self) -> int:
+        return len(self.categories)
+
+    def _related_tokens(self, token: str) -> Dict[str, float]:
+        """Vocabulary tokens matching a query token, with their match weight."""
+        related = {}
+        # Vocabulary tokens containing the query token (includes the exact token)
+        for other in self.substrings.get(token, ()):
+            related[other] = PARTIAL_MATCH_WEIGHT
+        # Vocabulary tokens contained in the query token
+        n = len(token)
+        for i in range(n):
+            for j in range(i + MIN_TOKEN_LEN, n + 1):
+                piece = token[i:j]
+                if piece in self.postings:
+                    related[piece] = PARTIAL_MATCH_WEIGHT
+        if token in self.postings:
+            related[token] = 1.0 + PARTIAL_MATCH_WEIGHT
+        return related
+
+    def scores(self, description: str) -> Dict[int, float]:
+        """Non-zero scores by category position."""
+        totals = defaultdict(float)
+        for token in taxonomy_tokens(description):
+            for other, weight in self._related_tokens(token).items():
+                for cat_idx, bm25 in self.postings[other]:
+                    totals[cat_idx] += weight * bm25
+        return totals
+
+    def top_k(self, description: str, k: int = 25) -> List[Dict]:
+        """Best k categories (copies), ties and zero scores in taxonomy order."""
+        totals = self.scores(description)
+        best = heapq.nsmallest(k, totals.items(), key=lambda item: (-item[1], item[0]))
+        chosen = [cat_idx for cat_idx, _ in best]
+        if len(chosen) < k:
+            picked = set(chosen)
+            for cat_idx in range(len(self.categories)):
+                if len(chosen) >= k:
+                    break
+                if cat_idx not in picked:
+                    chosen.append(cat_idx)
+        return [dict(self.categories[cat_idx]) for cat_idx in chosen]
+
+    def to_dict(self) -> Dict:
+        return {
+            "format": INDEX_FORMAT,
+            "version": self.version,
+            "categories": self.categories,
+            "postings": self.postings,
+            "substrings": self.substrings,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "TaxonomyIndex":
+        index = cls.__new__(cls)
+        index.categories = data["categories"]
+        index.version = data["version"]
+        index.postings = {token: [tuple(p) for p in plist] for token, plist in data["postings"].items()}
+        index.substrings = data["substrings"]
+        return index
+
+    def save(self, path: str):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: str) -> "TaxonomyIndex":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("format") != INDEX_FORMAT:
+            raise ValueError(f"Unsupported taxonomy index format in {path}")
+        return cls.from_dict(data)
+
+    @classmethod
+    def load_or_build(cls, categories: Sequence[Dict], cache_dir: Optional[str] = None) -> "TaxonomyIndex":
+        """Reuse <cache_dir>/taxonomy_index_<version>.json when present, else build (and save)."""
+        if cache_dir is None:
+            return cls(categories)
+        path = Path(cache_dir) / f"taxonomy_index_{taxonomy_version(categories)}.json"
+        if path.is_file():
+            try:
+                index = cls.load(str(path))
+                # Postings refer to category positions, so the order must match too
+                if [category_path(cat) for cat in index.categories] == [category_path(cat) for cat in categories]:
+                    index.categories = [dict(cat) for cat in categories]
+                    return index
+            except (OSError, ValueError, KeyError):
+                pass
+        index = cls(categories)
+        try:
+            index.save(str(path))
+        except OSError:
+            pass
+        return index
+
+
+_indexes: Dict[int, Tuple[Sequence[Dict], TaxonomyIndex]] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_taxonomy_index(categories: Sequence[Dict], cache_dir: Optional[str] = None) -> TaxonomyIndex:
+    """
+    Index for this categories list, built once per list object.
+
+    Keeps a reference to the list so its id cannot be reused; a list mutated in
+    place after indexing is not picked up (build the category list first).
+    """
+    key = id(categories)
+    with _indexes_lock:
+        cached = _indexes.get(key)
+        if cached is not None and cached[0] is categories and len(cached[1]) == len(categories):
+            return cached[1]
+    index = TaxonomyIndex.load_or_build(categories, cache_dir)
+    with _indexes_lock:
+        # Only the most recent few taxonomies are kept alive
+        if len(_indexes) >= 8:
+            _indexes.pop(next(iter(_indexes)))
+        _indexes[key] = (categories, index)
+    return index
@@ -0,0 +1,192 @@
+"""
+Run the Supplier Master Generator without the Tk GUI (batch servers, display-less Linux hosts).
+
+Usage (from project root):
+
+  # Required env: GEMINI_API_KEY (or pass --api-key)
+
+  python run_supplier_master_generator.py "path/to/PO.csv" --categories "path/to/Taxonomy.csv"
+  python run_supplier_master_generator.py "path/to/PO.csv" --categories taxonomy.csv --client-sm "Client SM.csv"
+  python run_supplier_master_generator.py "path/to/PO.csv" --categories taxonomy.csv --workers 8 --rpm 120
+  python run_supplier_master_generator.py "path/to/PO.csv" --categories taxonomy.csv --resume   # after a crash
+  python run_supplier_master_generator.py "path/to/PO.csv" --categories taxonomy.csv --output master.sqlite --export-csv GenpactSupplierMaster.csv
+  python run_supplier_master_generator.py "path/to/PO.csv" --categories taxonomy.csv --po-supplier-name-column "Vendor Name"
+
+Columns are auto-detected like the GUI's mapping tab unless given explicitly. The PO file is
+streamed in --chunksize row chunks (mapped columns only), so it never has to fit in memory.
+Output defaults to GenpactSupplierMaster.csv next to the PO file, the same as the GUI. A .sqlite/.db
+--output uses the indexed master store (etl/master_store.py): only new and updated suppliers are
+written, and CSV becomes an on-demand export (--export-csv, or python -m etl.master_store export).
+Supplier enrichments are reused from the shared enrichment store (etl/enrichment_store.py) for
+--enrichment-max-age days, across clients and runs.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from etl.enrichment_store import DEFAULT_MAX_AGE_DAYS
+from etl.llm_telemetry import format_summary
+from etl.master_store import SupplierMasterStore, is_store_path
+from supplier_master_generator_latest import (
+    SupplierMasterConfig,
+    SupplierMasterEngine,
+    PO_CHUNK_ROWS,
+    detect_columns,
+    read_csv_header,
+    read_input_csv,
+)
+
+# CLI flag -> (file type, logical column)
+COLUMN_FLAGS = {
+    "po_supplier_number_column": ("po", "supplier_number"),
+    "po_supplier_name_column": ("po", "supplier_name"),
+    "po_item_column": ("po", "item_description"),
+    "csm_supplier_number_column": ("csm", "supplier_number"),
+    "csm_country_column": ("csm", "country"),
+    "l1_column": ("cat", "l1"),
+    "l2_column": ("cat", "l2"),
+    "l3_column": ("cat", "l3"),
+}
+
+
+def resolve_path(path: Path) -> Path:
+    """Relative input paths: the working directory first, then the project root."""
+    if path.is_absolute() or path.exists():
+        return path.resolve()
+    return (ROOT / path).resolve()
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="Supplier Master Generator: PO CSV + taxonomy → GenpactSupplierMaster.csv (headless)"
+    )
+    ap.add_argument("po_path", type=Path, help="Path to PO line CSV")
+    ap.add_argument("--categories", type=Path, required=True, help="Path to L1/L2/L3 taxonomy CSV")
+    ap.add_argument("--client-sm", type=Path, default=None, help="Path to Client Supplier Master CSV (countries)")
+    ap.add_argument("--output", type=Path, default=None, help="Master to update: .csv, or .sqlite/.db for the indexed store (default: GenpactSupplierMaster.csv next to the PO file)")
+    ap.add_argument("--import-master", type=Path, default=None, help="Seed a .sqlite/.db --output from an existing master CSV first")
+    ap.add_argument("--export-csv", type=Path, default=None, help="After the run, export a .sqlite/.db master to this CSV")
+    ap.add_argument("--api-key", default=os.environ.get("GEMINI_API_KEY", ""), help="Gemini API key (default: GEMINI_API_KEY)")
+    ap.add_argument("--model", default="gemini-2.0-flash", help="Gemini model (default: gemini-2.0-flash)")
+    ap.add_argument("--temperature", type=float, default=0.2)
+    ap.add_argument("--rpm", type=int, default=30, help="Max requests per minute (default: 30)")
+    ap.add_argument("--workers", type=int, default=4, help="Suppliers processed in parallel (default: 4)")
+    ap.add_argument("--chunksize", type=int, default=PO_CHUNK_ROWS, help=f"PO rows read per chunk (default: {PO_CHUNK_ROWS:,})")
+    ap.add_argument("--no-grounding", action="store_false", dest="use_grounding", help="Disable Google Search grounding")
+    ap.add_argument("--no-cache", action="store_false", dest="use_cache", help="Bypass the on-disk LLM response cache")
+    ap.add_argument("--no-enrichment-store", action="store_false", dest="use_enrichment_store",
+                    help="Always call the API for supplier enrichment instead of reusing stored results")
+    ap.add_argument("--enrichment-max-age", type=float, default=DEFAULT_MAX_AGE_DAYS, metavar="DAYS",
+                    help=f"Reuse stored enrichments younger than this (default: {DEFAULT_MAX_AGE_DAYS}; 0 = never expire)")
+    ap.add_argument("--telemetry", type=Path, default=None, dest="telemetry_path", metavar="PATH",
+                    help="Per-call LLM telemetry JSONL (default: logs/llm_calls_<timestamp>.jsonl)")
+    ap.add_argument("--no-telemetry", action="store_false", dest="telemetry", help="Do not record LLM call telemetry")
+    ap.add_argument("--resume", action="store_true", help="Continue an interrupted run from <output>.journal.jsonl")
+    for flag, (file_type, key) in COLUMN_FLAGS.items():
+        ap.add_argument("--" + flag.replace("_", "-"), default=None, help=f"{file_type.upper()} column for {key} (default: auto-detect)")
+    ap.add_argument("--quiet", action="store_true", help="Only print the summary")
+    ap.add_argument("--json", action="store_true", help="Output stats as JSON only")
+    args = ap.parse_args()
+
+    if not args.api_key:
+        print("Error: set GEMINI_API_KEY or pass --api-key", file=sys.stderr)
+        sys.exit(1)
+
+    paths = {"po": resolve_path(args.po_path), "cat": resolve_path(args.categories)}
+    if args.client_sm is not None:
+        paths["csm"] = resolve_path(args.client_sm)
+    for path in paths.values():
+        if not path.is_file():
+            print(f"Error: CSV not found: {path}", file=sys.stderr)
+            sys.exit(1)
+    output_path = args.output.resolve() if args.output else paths["po"].parent / "GenpactSupplierMaster.csv"
+    if (args.import_master or args.export_csv) and not is_store_path(str(output_path)):
+        print("Error: --import-master/--export-csv need a .sqlite or .db --output", file=sys.stderr)
+        sys.exit(1)
+
+    # The PO file is streamed in chunks by the engine; only its header is read here
+    data = {file_type: read_input_csv(str(path)) for file_type, path in paths.items() if file_type != "po"}
+    data["po"] = read_csv_header(str(paths["po"]))
+    columns = {file_type: detect_columns(df.columns.tolist(), file_type) for file_type, df in data.items()}
+    for flag, (file_type, key) in COLUMN_FLAGS.items():
+        value = getattr(args, flag)
+        if value is None or file_type not in data:
+            continue
+        if value not in data[file_type].columns:
+            print(f"Error: column '{value}' not found in {paths[file_type]}", file=sys.stderr)
+            sys.exit(1)
+        columns[file_type][key] = value
+
+    config = SupplierMasterConfig(
+        api_key=args.api_key,
+        model=args.model,
+        temperature=args.temperature,
+        use_grounding=args.use_grounding,
+        rpm_limit=args.rpm,
+        max_workers=args.workers,
+        use_cache=args.use_cache,
+        use_enrichment_store=args.use_enrichment_store,
+        enrichment_max_age_days=args.enrichment_max_age,
+        telemetry=args.telemetry,
+        telemetry_path=str(args.telemetry_path.resolve()) if args.telemetry_path else None,
+        resume=args.resume,
+        po_chunksize=args.chunksize,
+        po_columns=columns["po"],
+        client_sm_columns=columns.get("csm", {}),
+        category_columns=columns["cat"],
+    )
+
+    print_lock = threading.Lock()
+
+    def on_log(message: str, level: str = "info"):
+        if args.quiet or args.json:
+            return
+        with print_lock:
+            print(f"[{datetime.now().strftime('%H:%M:%S')}] {message}", file=sys.stderr, flush=True)
+
+    engine = SupplierMasterEngine(config, None, data["cat"], data.get("csm"), on_log=on_log,
+                                  po_path=str(paths["po"]))
+    on_log(f"Columns: {json.dumps(columns)}")
+
+    try:
+        if args.import_master:
+            store = SupplierMasterStore(str(output_path))
+            imported = store.import_dataframe(read_input_csv(str(resolve_path(args.import_master))))
+            store.close()
+            on_log(f"Imported {imported} rows from {args.import_master} into {output_path.name}")
+        _, stats = engine.process_all_data(str(output_path))
+        if args.export_csv:
+            store = SupplierMasterStore(str(output_path))
+            exported = store.export_csv(str(args.export_csv.resolve()))
+            store.close()
+            on_log(f"Exported {exported} rows to {args.export_csv}")
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        if not args.json:
+            raise
+        sys.exit(1)
+
+    if args.json:
+        print(json.dumps({**stats, "output": str(output_path), "llm_telemetry": engine.telemetry_summary}, indent=2))
+    else:
+        print("Supplier Master Generator complete.")
+        print(f"  New: {stats['new_suppliers']}")
+        print(f"  Updated: {stats['updated_suppliers']}")
+        print(f"  Unchanged: {stats['unchanged_suppliers']}")
+        print(f"  Total in master: {stats['total_in_master']}")
+        print(f"  Saved to: {output_path}")
+        if engine.telemetry_summary:
+            print(f"\nLLM calls by stage ({engine.telemetry_path}):")
+            print(format_summary(engine.telemetry_summary))
+
+
+if __name__ == "__main__":
+    main()
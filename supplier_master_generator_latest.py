@@ -9,17 +9,42 @@ import re
 import random
 import threading
 import queue
-import unicodedata
-from collections import defaultdict
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from pathlib import Path
 from difflib import SequenceMatcher
-
-import tkinter as tk
-from tkinter import ttk, filedialog, messagebox, scrolledtext
+from functools import lru_cache
+
+try:
+    import tkinter as tk
+    from tkinter import ttk, filedialog, messagebox, scrolledtext
+except ImportError:
+    # Display-less hosts: SupplierMasterEngine and run_supplier_master_generator.py need no Tk
+    tk = ttk = filedialog = messagebox = scrolledtext = None
 import pandas as pd
-import requests
+
+from etl.llm_cache import (
+    DEFAULT_CACHE_PATH, ClassificationMemo, get_default_cache, get_default_classification_memo, make_cache_key
+)
+from etl.llm_executor import LLMExecutor, TokenBucket
+from etl.enrichment_store import DEFAULT_MAX_AGE_DAYS, PostgresEnrichmentStore, open_enrichment_store
+from etl.gemini_transport import generate_content_url, post_json
+from etl.llm_retry import (
+    AIMDController, LLMHTTPError, RetryPolicy, call_with_retry, retry_after_from_response, set_default_controller
+)
+from etl.llm_telemetry import LLMTelemetry, format_summary, get_default_telemetry, set_default_telemetry
+from etl.master_store import MASTER_COLUMNS, name_key, open_master_store
+from etl.run_journal import SupplierJournal, journal_path_for
+from etl.name_cleaning import CanonicalNameCleaner, ComparisonNameCleaner
+from etl.taxonomy_index import get_taxonomy_index, taxonomy_version
+
+try:
+    from etl.ngram_similarity import NgramIndex, NGRAM_BACKEND_AVAILABLE
+except ImportError:
+    NgramIndex = None
+    NGRAM_BACKEND_AVAILABLE = False
 
 ###########
 # Country Code Map
@@ -125,7 +150,7 @@ FIRST_NAMES = {
     'aarav', 'aditya', 'akash', 'akshay', 'akshaye', 'amit', 'amitabh', 'anil', 'ankit', 'anurag',
     'arjun', 'arun', 'ashish', 'bharat', 'chandra', 'deepak', 'dev', 'dhruv', 'dinesh', 'ganesh',
     'gaurav', 'gopal', 'hari', 'harsh', 'hemant', 'ishaan', 'jagdish', 'jay', 'karan', 'kartik',
-    'krishna', 'kumar', 'lalit', 'mahesh', 'manoj '4 'mohit', 'mukesh', 'naman', 'naresh', 'nikhil',
+    'krishna', 'kumar', 'lalit', 'mahesh', 'manoj', 'mohit', 'mukesh', 'naman', 'naresh', 'nikhil',
     'nitin', 'pankaj', 'pranav', 'prashant', 'rahul', 'raj', 'rajesh', 'rajan', 'rakesh', 'ravi',
     'rohit', 'sachin', 'sanjay', 'sanjeev', 'satish', 'shiv', 'shyam', 'siddharth', 'sunil', 'suresh',
     'tushar', 'varun', 'vijay', 'vikram', 'vinay', 'vinod', 'vipin', 'vishal', 'vivek', 'yash',
@@ -270,36 +295,21 @@ LOCATION_WORDS_OUTPUT = {
     'british', 'american', 'bermuda', 'hong', 'kong', 'hongkong',
 }
 
+# Location words ignored when comparing names
+LOCATION_WORDS = LOCATION_WORDS_OUTPUT
+
 
 ###########
 # Rate Limiter
 ###########
-class RateLimiter:
-    """Thread-safe rate limiter for API calls"""
+class RateLimiter(TokenBucket):
+    """Thread-safe rate limiter for API calls (token bucket; waiting never holds the lock)"""
     
     def __init__(self, max_rpm: int = 30):
+        super().__init__(rate_per_minute=max_rpm)
         self.max_rpm = max_rpm
-        self.request_times = []
-        self.lock = threading.Lock()
-    
-    def wait_if_needed(self):
-        with self.lock:
-            now = time.time()
-            self.request_times = [t for t in self.request_times if now - t < 60]
-            
-            if len(self.request_times) >= self.max_rpm:
-                        wait_time = 60 - (now - self.request_times[0]) + 0.1
-            if wait_time > 0:
-                time.sleep(wait_time)
-                now = time.time()
-            self.request_times = [t for t in self.request_times if now - t < 60]
-        
-        self.request_times.append(time.time())
 
 
-###########
-# Utility Functions
-###########
 def normalize_country(country_value: str) -> Tuple[str, str]:
     """Normalize country value to standard name and code"""
     if not country_value or pd.isna(country_value):
@@ -359,34 +369,8 @@ def safe_extract_json(text: str) -> Optional[Dict]:
 
 
 def prefilter_categories(description: str, categories: List[Dict], k: int = 25) -> List[Dict]:
-    """Pre-filter categories based on token overlap with L1, L2, and L3"""
-    def get_tokens(text: str) -> set:
-        return set(re.split(r'\W+', text.lower()))
-    
-    desc_tokens = get_tokens(description)
-    
-    scored = []
-    for cat in categories:
-        # Combine L1, L2, L3 for matching
-        cat_text = f"{cat.get('l1', '')} {cat.get('l2', '')} {cat.get('l3', '')}"
-        cat_tokens = get_tokens(cat_text)
-        score = 0
-        
-        for token in desc_tokens:
-            if len(token) <= 2:
-                continue
-            if token in cat_tokens:
-                score += 1
-            for cat_token in cat_tokens:
-                if len(cat_token) <= 2:
-                    continue
-                if token in cat_token or cat_token in token:
-                    score += 0.5
-        
-        scored.append({**cat, '_score': score})
-    
-    scored.sort(key=lambda x: x['_score'], reverse=True)
-    return [{k: v for k, v in cat.items() if k != '_score'} for cat in scored[:k]]
+    """Pre-filter categories by token overlap with L1, L2 and L3 (prebuilt BM25 taxonomy index)"""
+    return get_taxonomy_index(categories).top_k(description, k)
 
 
 def merge_tags(existing_tags: str, new_tags: List[str]) -> str:
@@ -482,89 +466,19 @@ def assess_supplier_po_quality(item_descriptions: List[str]) -> Tuple[List[str],
 ###########
 # Supplier Name Cleaning Functions
 ###########
+# Shared cleaning engine (etl/name_cleaning.py) with this module's vocabularies
+CANONICAL_NAME_CLEANER = CanonicalNameCleaner(LEGAL_SUFFIXES_OUTPUT, LOCATION_WORDS_OUTPUT)
+COMPARISON_NAME_CLEANER = ComparisonNameCleaner(LEGAL_SUFFIXES, LOCATION_WORDS)
+
+
 def clean_canonical_name(name: str) -> str:
     """Clean a supplier name for OUTPUT (canonical name)."""
-    if not name:
-        return ""
-    
-    original = str(name).strip()
-    result = original
-    
-    result = re.sub(r'\s*\([^)]*\)\s*', ' ', result)
-    
-    for suffix_pattern in LEGAL_SUFFIXES_OUTPUT:
-        result = re.sub(suffix_pattern, ' ', result, flags=re.IGNORECASE)
-
-    words = result.split()
-    filtered_words = []
-    for word in words:
-        word_clean = re.sub(r'[^\w]', '', word).lower()
-        if word_clean and word_clean not in LOCATION_WORDS_OUTPUT:
-            filtered_words.append(word)
-    result = ''.join(filtered_words)
-
-    result = re.sub(r'[\s,-]+$', '', result)
-    result = re.sub(r'^[\s,-]+', '', result)
-    result = re.sub(r'\s+', ' ', result).strip()
-
-    if not result or len(result) < 2:
-        result = original
-        result = re.sub(r'\s*\([^)]*\)\s*', ' ', result)
-        for suffix_pattern in LEGAL_SUFFIXES_OUTPUT:
-            result = re.sub(suffix_pattern, ' ', result, flags=re.IGNORECASE)
-        result = re.sub(r'\s+', ' ', result).strip()
-        result = re.sub(r'[\s,-]+$', '', result)
-    
-    if not result or len(result) < 2:
-        result = original
-    
-    if result == result.upper() or result == result.lower():
-        words = result.split()
-        capitalized = []
-        for word in words:
-            if len(word) <= 4 and re.match(r'^[A-Z0-9&]+$', word):
-                capitalized.append(word.upper())
-            elif '&' in word:
-                capitalized.append(word.upper())
-            else:
-                capitalized.append(word.capitalize())
-        result = ' '.join(capitalized)
-    
-    return result
+    return CANONICAL_NAME_CLEANER.clean(name)
 
 
 def clean_company_name(name: str) -> str:
     """Clean company name for comparison."""
-    if not name:
-        return ""
-    
-    name = str(name).lower().strip()
-    name = re.sub(r'\([^)]*\)', '', name)
-    name = re.sub(r'[^\w\s&]', ' ', name)
-    name = re.sub(r'\s+&\s+', ' and ', name)
-    
-    tokens = name.split()
-    
-    filtered_tokens = []
-    for token in tokens:
-        token_clean = token.strip()
-        if not token_clean:
-            continue
-        if token_clean in LEGAL_SUFFIXES:
-            continue
-        if token_clean in LOCATION_WORDS:
-            continue
-        if len(token_clean) == 1 and token_clean not in ('&',):
-            continue
-        filtered_tokens.append(token_clean)
-    
-    if not filtered_tokens:
-        filtered_tokens = [t for t in tokens if t.strip() and t.strip() not in LEGAL_SUFFIXES]
-    
-    if not filtered_tokens:
-        filtered_tokens = [t for t in tokens if t.strip()]
-    
-    return ' '.join(filtered_tokens)
+    return COMPARISON_NAME_CLEANER.clean(name)
 
 
 def get_tokens(name: str) -> set:
@@ -583,31 +497,77 @@ def jaccard_similarity(set1: set, set2: set) -> float:
     return intersection / union if union > 0 else 0.0
 
 
-def is_abbreviation(short: str, long: str) -> bool:
-    """Check if 'short' is an abbreviation/acronym of 'long'"""
-    short_clean = re.sub(r'[^\w]', '', short).upper()
-    
-    long_clean = long.lower()
-    for suffix in ['inc', 'corp', 'ltd', 'llc', 'plc', 'pvt', 'limited', 'corporation']:
-        long_clean = re.sub(r'\b' + suffix + r'\b', '', long_clean)
-    long_clean = re.sub(r'[^\w\s]', ' ', long_clean).strip()
-    long_tokens = [t for t in long_clean.split() if len(t) > 1]
+ABBREVIATION_SUFFIX_PATTERN = re.compile(r'\b(?:inc|corp|ltd|llc|plc|pvt|limited|corporation)\b')
+
+
+class NameFeatures:
+    """
+    Per-name comparison features, computed once per unique name.
+
+    Holds everything company_similarity, is_abbreviation and pick_canonical_name
+    need, so scoring a pair never re-runs the cleaning regexes.
+    """
+
+    __slots__ = ('name', 'cleaned', 'tokens', 'sorted_tokens', 'main_token',
+                 'abbrev_key', 'abbrev_tokens', 'initials', 'char_counts', 'canonical_score')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.cleaned = clean_company_name(name)
+        self.tokens = set([t for t in self.cleaned.split() if len(t) > 1])
+        self.sorted_tokens = ' '.join(sorted(self.cleaned.split()))
+        self.main_token = max(self.tokens, key=len) if self.tokens else ''
+
+        # Abbreviation view: 'short' form and suffix-stripped 'long' tokens
+        self.abbrev_key = re.sub(r'[^\w]', '', name).upper()
+        long_clean = ABBREVIATION_SUFFIX_PATTERN.sub('', name.lower())
+        long_clean = re.sub(r'[^\w\s]', ' ', long_clean).strip()
+        self.abbrev_tokens = [t for t in long_clean.split() if len(t) > 1]
+        self.initials = ''.join([t[0].upper() for t in self.abbrev_tokens])
+
+        self.char_counts = None
+        self.canonical_score = None
+
+    def char_profile(self) -> Dict[str, int]:
+        """Character histogram of the cleaned name (lazy; used for score bounds)."""
+        if self.char_counts is None:
+            self.char_counts = dict(Counter(self.cleaned))
+        return self.char_counts
+
+
+@lru_cache(maxsize=200000)
+def name_features(name: str) -> NameFeatures:
+    """Cached NameFeatures for a raw supplier name."""
+    return NameFeatures(name)
+
+
+def as_name_features(name) -> NameFeatures:
+    """Accept either a raw name or a precomputed NameFeatures."""
+    if isinstance(name, NameFeatures):
+        return name
+    return name_features(str(name))
+
+
+def is_abbreviation(short, long) -> bool:
+    """Check if 'short' is an abbreviation/acronym of 'long' (names or NameFeatures)"""
+    short_f = as_name_features(short)
+    long_f = as_name_features(long)
+    short_clean = short_f.abbrev_key
+    long_tokens = long_f.abbrev_tokens
     
     if not short_clean or not long_tokens:
         return False
     
     if len(short_clean) == len(long_tokens):
-        initials = ''.join([t[0].upper() for t in long_tokens if t])
-        if short_clean == initials:
+        if short_clean == long_f.initials:
             return True
     
+    # Any leading run of 2+ initials that prefixes the short form
     if len(short_clean) >= 2 and len(long_tokens) >= 2:
-        for n in range(2, min(len(short_clean) + 1, len(long_tokens) + 1)):
-            initials = ''.join([long_tokens[i][0].upper() for i in range(n) if i < len(long_tokens)])
-            if short_clean.startswith(initials):
-                return True
+        if short_clean.startswith(long_f.initials[:2]):
+            return True
     
-    if len(long_tokens) > 0 and len(short_clean) >= 3:
+    if len(short_clean) >= 3:
         first_word = long_tokens[0].upper()
         if first_word.startswith(short_clean[:3]):
             return True
@@ -619,7 +579,6 @@ def is_abbreviation(short: str, long: str) -> bool:
             second_part = short_lower[split_point:]
             
             if (long_tokens[0].startswith(first_part) and
-                len(long_tokens) > 1 and
                 long_tokens[1].startswith(second_part)):
                 return True
     
@@ -635,18 +594,19 @@ def levenshtein_ratio(s1: str, s2: str) -> float:
 
 def token_sort_ratio(s1: str, s2: str) -> float:
     """Sort tokens alphabetically then compare"""
-    tokens1 = ' '.join(sorted(clean_company_name(s1).split()))
-    tokens2 = ' '.join(sorted(clean_company_name(s2).split()))
-    return SequenceMatcher(None, tokens1, tokens2).ratio()
+    return SequenceMatcher(None, as_name_features(s1).sorted_tokens,
+                           as_name_features(s2).sorted_tokens).ratio()
 
 
-def company_similarity(name1: str, name2: str) -> float:
-    """Multi-signal similarity score for company names."""
+def company_similarity(name1, name2) -> float:
+    """Multi-signal similarity score for company names (raw names or NameFeatures)."""
     if not name1 or not name2:
         return 0.0
     
-    clean1 = clean_company_name(name1)
-    clean2 = clean_company_name(name2)
+    f1 = as_name_features(name1)
+    f2 = as_name_features(name2)
+    clean1 = f1.cleaned
+    clean2 = f2.cleaned
     
     if clean1 == clean2:
         return 1.0
@@ -654,16 +614,16 @@ def company_similarity(name1: str, name2: str) -> float:
     if not clean1 or not clean2:
         return 0.0
     
-    tokens1 = get_tokens(name1)
-    tokens2 = get_tokens(name2)
+    tokens1 = f1.tokens
+    tokens2 = f2.tokens
     
     jaccard = jaccard_similarity(tokens1, tokens2)
-    lev_ratio = levenshtein_ratio(clean1, clean2)
-    token_sort = token_sort_ratio(name1, name2)
+    lev_ratio = SequenceMatcher(None, clean1, clean2).ratio()
+    token_sort = SequenceMatcher(None, f1.sorted_tokens, f2.sorted_tokens).ratio()
     
     abbrev_score = 0.0
     if len(clean1) <= 6 or len(clean2) <= 6:
-        if is_abbreviation(name1, name2) or is_abbreviation(name2, name1):
+        if is_abbreviation(f1, f2) or is_abbreviation(f2, f1):
             abbrev_score = 1.0
     
     score = (jaccard * 0.35) + (lev_ratio * 0.25) + (token_sort * 0.25) + (abbrev_score * 0.15)
@@ -672,55 +632,237 @@ def company_similarity(name1: str, name2: str) -> float:
         if tokens1.issubset(tokens2) or tokens2.issubset(tokens1):
             score = max(score, 0.85)
     
-    if tokens1 and tokens2:
-        main1 = max(tokens1, key=len) if tokens1 else ''
-        main2 = max(tokens2, key=len) if tokens2 else ''
-        if main1 and main2 and main1 == main2:
+        if f1.main_token == f2.main_token:
             score = max(score, 0.80)
     
     return min(score, 1.0)
 
 
-def cluster_suppliers_algorithmic(names: List[str], threshold: float = 0.65) -> List[List[str]]:
-    """Cluster similar supplier names using multi-signal similarity."""
-    if not names:
-        return []
-    
-    clusters = []
-    
-    for name in names:
-        if not name or not str(name).strip():
-            continue
-        
-        best_cluster_idx = None
-        best_score = 0
-        
-        for idx, cluster in enumerate(clusters):
-            for existing_name in cluster:
-                score = company_similarity(name, existing_name)
-                if score > best_score:
-                    best_score = score
-                    if score >= threshold:
-                        best_cluster_idx = idx
-        
-        if best_cluster_idx is not None:
-            clusters[best_cluster_idx].append(name)
-        else:
-            clusters.append([name])
-    
-    return clusters
+def company_similarity_upper_bound(f1: NameFeatures, f2: NameFeatures) -> float:
+    """
+    Cheap upper bound on company_similarity(f1, f2).
 
+    Replaces both SequenceMatcher ratios with the character-histogram bound
+    (the cleaned and sorted-token strings share the same characters), so a
+    pair whose bound is below the current best can be skipped exactly.
+    """
+    clean1 = f1.cleaned
+    clean2 = f2.cleaned
+    if clean1 == clean2:
+        return 1.0
+    if not clean1 or not clean2:
+        return 0.0
 
-def pick_canonical_name(names: List[str]) -> str:
-    """Pick the best canonical name from a cluster."""
-    names = [n for n in names if n and str(n).strip()]
-    
-    if not names:
-        return "Unknown Supplier"
-    if len(names) == 1:
-        return names[0]
-    
-    REGIONAL_PATTERNS = [
+    tokens1 = f1.tokens
+    tokens2 = f2.tokens
+    floor = 0.0
+    if tokens1 and tokens2:
+        if tokens1.issubset(tokens2) or tokens2.issubset(tokens1):
+            floor = 0.85
+        elif f1.main_token == f2.main_token:
+            floor = 0.80
+
+    profile1 = f1.char_profile()
+    profile2 = f2.char_profile()
+    if len(profile1) > len(profile2):
+        profile1, profile2 = profile2, profile1
+    overlap = 0
+    for char, count in profile1.items():
+        other = profile2.get(char)
+        if other:
+            overlap += count if count < other else other
+    ratio_bound = 2.0 * overlap / (len(clean1) + len(clean2))
+
+    abbrev_score = 0.0
+    if len(clean1) <= 6 or len(clean2) <= 6:
+        if is_abbreviation(f1, f2) or is_abbreviation(f2, f1):
+            abbrev_score = 1.0
+
+    score = (jaccard_similarity(tokens1, tokens2) * 0.35) + (ratio_bound * 0.25) + \
+            (ratio_bound * 0.25) + (abbrev_score * 0.15)
+    return min(max(score, floor), 1.0)
+
+
+###########
+# Indexed Clustering
+###########
+# Below this threshold two names can score a match without sharing a token,
+# so character n-grams are indexed as well.
+TOKEN_BLOCKING_MIN_THRESHOLD = 0.65
+
+
+class UnionFind:
+    """Disjoint-set forest over integer ids (path halving)."""
+
+    __slots__ = ('parent',)
+
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, i: int) -> int:
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(self, child: int, target: int) -> int:
+        """Attach child's set to target's set and return the shared root."""
+        root = self.find(target)
+        self.parent[self.find(child)] = root
+        return root
+
+
+def cluster_block_keys(name, use_ngrams: bool = False, ngram_size: int = 3) -> set:
+    """Inverted-index keys for a name: cleaned form, tokens and optional char n-grams."""
+    features = as_name_features(name)
+    cleaned = features.cleaned
+    if not cleaned:
+        return set()
+    keys = {('c', cleaned)}
+    keys.update(('t', token) for token in features.tokens)
+    if use_ngrams:
+        padded = f" {cleaned} "
+        keys.update(('g', padded[i:i + ngram_size]) for i in range(len(padded) - ngram_size + 1))
+    return keys
+
+
+def cluster_suppliers_indexed(
+    names: List[str],
+    threshold: float = 0.65,
+    max_block_size: Optional[int] = None,
+    ngram_size: int = 3,
+    backend: str = 'index',
+    ngram_top_k: int = 20,
+    ngram_min_similarity: float = 0.3
+) -> List[List[str]]:
+    """
+    Cluster supplier names using an inverted index instead of all-pairs comparison.
+
+    Same result as the sequential greedy pass: each name joins the cluster of its
+    best-scoring earlier name when that score reaches the threshold (ties go to the
+    older cluster). Only earlier names sharing an index key are scored. At
+    thresholds >= 0.65 a matching pair always shares a token, so clusters are
+    identical; below that, character n-grams are indexed too. Candidates are
+    scored best-first by company_similarity_upper_bound and the exact score stops
+    as soon as no remaining bound can beat the current best.
+
+    max_block_size caps how many names a single key may point at (e.g. 'and');
+    keys beyond the cap are ignored for candidate generation, trading exactness
+    for speed on very large files. None keeps every key.
+
+    backend='ngram' takes candidates from the char-trigram TF-IDF top-k
+    neighbours (etl.ngram_similarity) instead of the token index: each name
+    is only scored against its ngram_top_k nearest names with cosine >=
+    ngram_min_similarity. Much cheaper on lists dominated by common words,
+    but approximate - a match outside the neighbour list is missed.
+    """
+    valid = [name for name in names if name and str(name).strip()]
+    if not valid:
+        return []
+
+    use_ngrams = threshold < TOKEN_BLOCKING_MIN_THRESHOLD
+    features = [name_features(str(name)) for name in valid]
+    postings = defaultdict(list)
+    forest = UnionFind(len(valid))
+
+    neighbours = None
+    if backend == 'ngram':
+        if not NGRAM_BACKEND_AVAILABLE:
+            raise ImportError("backend='ngram' requires numpy and scipy")
+        neighbours = ngram_candidate_lists(features, ngram_top_k, ngram_min_similarity, ngram_size)
+    elif backend != 'index':
+        raise ValueError(f"Unknown clustering backend: {backend}")
+
+    for idx, feat in enumerate(features):
+        if neighbours is not None:
+            candidates = neighbours[idx]
+            keys = ()
+        else:
+            keys = cluster_block_keys(feat, use_ngrams, ngram_size)
+            candidates = set()
+            for key in keys:
+                posting = postings.get(key)
+                if posting and (max_block_size is None or len(posting) <= max_block_size):
+                    candidates.update(posting)
+
+        bounded = []
+        for cand in candidates:
+            bound = company_similarity_upper_bound(feat, features[cand])
+            if bound >= threshold:
+                bounded.append((bound, cand))
+        bounded.sort(key=lambda item: item[0], reverse=True)
+
+        best_idx = None
+        best_rank = None
+        best_score = 0
+        for bound, cand in bounded:
+            if bound < best_score:
+                break
+            score = company_similarity(feat, features[cand])
+            if score < threshold or score < best_score:
+                continue
+            # Clusters are ordered by their first member (the root), members by position
+            rank = (forest.find(cand), cand)
+            if score > best_score or rank < best_rank:
+                best_idx, best_rank, best_score = cand, rank, score
+
+        if best_idx is not None:
+            forest.union(idx, best_idx)
+
+        for key in keys:
+            postings[key].append(idx)
+
+    members = defaultdict(list)
+    for idx in range(len(valid)):
+        members[forest.find(idx)].append(valid[idx])
+
+    return [members[root] for root in sorted(members)]
+
+
+def ngram_candidate_lists(
+    features: List[NameFeatures],
+    top_k: int = 20,
+    min_similarity: float = 0.3,
+    ngram_size: int = 3
+) -> List[List[int]]:
+    """For each position, the earlier positions among its char-trigram nearest neighbours."""
+    # Identical cleaned names always collide, however many there are
+    first_seen = {}
+    for idx, feat in enumerate(features):
+        first_seen.setdefault(feat.cleaned, idx)
+    distinct = list(first_seen)
+    row_of = {cleaned: row for row, cleaned in enumerate(distinct)}
+
+    related = [[] for _ in distinct]
+    index = NgramIndex(distinct, ngram_size=ngram_size)
+    for row, other, _score in index.candidate_pairs(top_k, min_similarity):
+        related[row].append(other)
+        related[other].append(row)
+
+    positions = [[] for _ in distinct]
+    lists = []
+    for idx, feat in enumerate(features):
+        row = row_of[feat.cleaned]
+        earlier = list(positions[row])
+        for other in related[row]:
+            earlier.extend(positions[other])
+        lists.append(earlier)
+        positions[row].append(idx)
+    return lists
+
+
+def cluster_suppliers_algorithmic(
+    names: List[str],
+    threshold: float = 0.65,
+    backend: str = 'index'
+) -> List[List[str]]:
+    """Cluster similar supplier names using multi-signal similarity (index-driven or n-gram)."""
+    return cluster_suppliers_indexed(names, threshold=threshold, backend=backend)
+
+
+CANONICAL_REGIONAL_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE) for pattern in (
         r'\([^)]*\)',
         r'\bpvt\b',
         r'\bprivate\b',
@@ -731,36 +873,56 @@ def pick_canonical_name(names: List[str]) -> str:
         r'\beurope\b',
         r'\bglobal\b',
         r'\bregion\b',
-    ]
+    )
+]
+CANONICAL_PREFERRED_SUFFIX = re.compile(r'\b(Inc|Corp|Corporation)\b', re.IGNORECASE)
+CANONICAL_PVT_LTD = re.compile(r'\bpvt\s*ltd\b|\bprivate\s*limited\b')
+
+
+def canonical_name_score(name: str) -> float:
+    """Preference score for a name as cluster canonical (higher is better)."""
+    score = 100
+    
+    name_lower = name.lower()
+    for pattern in CANONICAL_REGIONAL_PATTERNS:
+        if pattern.search(name_lower):
+            score -= 30
+    
+    if len(name) > 40:
+        score -= 15
+    elif len(name) > 30:
+        score -= 10
+    elif len(name) > 25:
+        score -= 5
+    
+    if name != name.upper() and name != name.lower():
+        score += 10
+    
+    if CANONICAL_PREFERRED_SUFFIX.search(name):
+        score += 5
+    
+    if CANONICAL_PVT_LTD.search(name_lower):
+        score -= 25
+    
+    score -= len(name) * 0.5
+    return score
+
+
+def pick_canonical_name(names) -> str:
+    """Pick the best canonical name from a cluster (raw names or NameFeatures)."""
+    names = [n for n in names if n and (isinstance(n, NameFeatures) or str(n).strip())]
+    
+    if not names:
+        return "Unknown Supplier"
+    if len(names) == 1:
+        return names[0].name if isinstance(names[0], NameFeatures) else names[0]
     
     scored = []
     for name in names:
-        score = 100
-        
-        name_lower = name.lower()
-        for pattern in REGIONAL_PATTERNS:
-            if re.search(pattern, name_lower, re.IGNORECASE):
-                score -= 30
-        
-        if len(name) > 40:
-            score -= 15
-        elif len(name) > 30:
-            score -= 10
-        elif len(name) > 25:
-            score -= 5
-        
-        if name != name.upper() and name != name.lower():
-            score += 10
-        
-        if re.search(r'\b(Inc|Corp|Corporation)\b', name, re.IGNORECASE):
-            score += 5
-        
-        if re.search(r'\bpvt\s*ltd\b', name_lower) or re.search(r'\bprivate\s*limited\b', name_lower):
-            score -= 25
-        
-        score -= len(name) * 0.5
-        
-        scored.append((name, score))
+        features = as_name_features(name)
+        if features.canonical_score is None:
+            features.canonical_score = canonical_name_score(features.name)
+        scored.append((features.name, features.canonical_score))
     
     scored.sort(key=lambda x: x[1], reverse=True)
     
@@ -809,30 +971,232 @@ def save_genpact_supplier_master(df: pd.DataFrame, file_path: str):
     df.to_csv(file_path, index=False, encoding='utf-8')
 
 
+###########
+# Vectorized Input Preparation
+###########
+# Column auto-detection keywords per input file (first matching column wins)
+COLUMN_KEYWORDS = {
+    'po': {
+        'supplier_number': ['supplier_number', 'supplier_num', 'vendor_number', 'vendor_id'],
+        'supplier_name': ['supplier_name', 'vendor_name', 'supplier'],
+        'item_description': ['item_desc', 'description', 'item'],
+    },
+    'csm': {
+        'supplier_number': ['supplier_number', 'supplier_num', 'vendor_number'],
+        'country': ['country', 'country_code'],
+    },
+    'cat': {
+        'l1': ['genpact level 1', 'level 1', 'l1'],
+        'l2': ['genpact level 2', 'level 2', 'l2', 'category_code', 'code'],
+        'l3': ['genpact level 3', 'level 3', 'l3', 'category_name', 'name'],
+    },
+}
+
+
+def read_input_csv(file_path: str) -> pd.DataFrame:
+    """Read an input CSV as UTF-8, falling back to Latin-1"""
+    try:
+        return pd.read_csv(file_path, encoding='utf-8')
+    except UnicodeDecodeError:
+        return pd.read_csv(file_path, encoding='latin-1')
+
+
+def find_col_index(columns: list, keywords: list) -> int:
+    """Find column index matching keywords (earlier keywords take priority)"""
+    lowered = [str(c).lower() for c in columns]
+    for k in keywords:
+        for i, c in enumerate(lowered):
+            if k in c:
+                return i
+    return 0
+
+
+def detect_columns(columns: list, file_type: str) -> Dict[str, str]:
+    """Best-guess column mapping for a 'po', 'csm' or 'cat' file"""
+    if not columns:
+        return {}
+    return {
+        key: columns[find_col_index(columns, keywords)]
+        for key, keywords in COLUMN_KEYWORDS[file_type].items()
+    }
+
+
+def _str_column(series: pd.Series) -> pd.Series:
+    """Column as str(value) per cell, like the old row loops (missing cells -> 'nan')."""
+    return series.astype(str).astype(object).where(series.notna(), 'nan')
+
+
+def _valid_text(values: pd.Series) -> pd.Series:
+    """Mask of non-empty cells that are not the text 'nan'."""
+    return (values != '') & (values.str.lower() != 'nan')
+
+
+def _supplier_numbers(series: pd.Series) -> pd.Series:
+    """Supplier numbers as text; '1042.0' (numeric column with blanks) matches '1042'."""
+    return _str_column(series).str.strip().str.replace(r'^(\d+)\.0$', r'\1', regex=True)
+
+
+def build_country_lookup(client_sm_df: pd.DataFrame, supplier_num_col: str, country_col: str) -> Dict[str, str]:
+    """Supplier number -> country from the Client Supplier Master (last row wins)."""
+    numbers = _supplier_numbers(client_sm_df[supplier_num_col])
+    countries = _str_column(client_sm_df[country_col])
+    keep = _valid_text(numbers) & _valid_text(countries)
+    return dict(zip(numbers[keep], countries[keep]))
+
+
+class POSupplierAggregator:
+    """
+    Folds PO lines, one DataFrame chunk at a time, into
+    {supplier name: {'items': [...], 'countries': {...}, 'original_names': {name}}}.
+
+    Only the mapped columns are read from each chunk and raw rows are not kept.
+    Repeated item descriptions share one string object. Suppliers keep
+    first-appearance order and items keep file order.
+    """
+
+    def __init__(self, supplier_num_col: Optional[str], supplier_name_col: Optional[str],
+                 item_col: Optional[str], country_lookup: Dict[str, str]):
+        self.supplier_num_col = supplier_num_col
+        self.supplier_name_col = supplier_name_col
+        self.item_col = item_col
+        self.country_lookup = country_lookup
+        self.suppliers: Dict[str, Dict] = {}
+        self.rows_read = 0
+        self._strings: Dict[str, str] = {}
+
+    def add(self, chunk: pd.DataFrame):
+        self.rows_read += len(chunk)
+        if not self.supplier_name_col or len(chunk) == 0:
+            return
+        names = _str_column(chunk[self.supplier_name_col]).str.strip()
+        keep = _valid_text(names)
+        frame = pd.DataFrame({'name': names[keep]})
+        if self.item_col:
+            frame['item'] = _str_column(chunk[self.item_col])[keep]
+        if self.supplier_num_col and self.country_lookup:
+            frame['country'] = _supplier_numbers(chunk[self.supplier_num_col])[keep].map(self.country_lookup)
+
+        suppliers = self.suppliers
+        for name in pd.unique(frame['name']):
+            if name not in suppliers:
+                suppliers[name] = {'items': [], 'countries': set(), 'original_names': {name}}
+        if 'item' in frame:
+            with_items = frame[_valid_text(frame['item'])]
+            strings = self._strings
+            for name, items in with_items.groupby('name', sort=False)['item'].agg(list).items():
+                suppliers[name]['items'].extend([strings.setdefault(item, item) for item in items])
+        if 'country' in frame:
+            pairs = frame[['name', 'country']].dropna().drop_duplicates()
+            for name, countries in pairs.groupby('name', sort=False)['country'].agg(set).items():
+                suppliers[name]['countries'].update(countries)
+
+
+def extract_po_suppliers(po_df: pd.DataFrame, supplier_num_col: Optional[str], supplier_name_col: Optional[str],
+                         item_col: Optional[str], country_lookup: Dict[str, str]) -> Dict[str, Dict]:
+    """Group an in-memory PO DataFrame by supplier name (see POSupplierAggregator)."""
+    aggregator = POSupplierAggregator(supplier_num_col, supplier_name_col, item_col, country_lookup)
+    aggregator.add(po_df)
+    return aggregator.suppliers
+
+
+# Rows per chunk when streaming a PO file
+PO_CHUNK_ROWS = 200_000
+# GUI: PO files larger than this are streamed at run time instead of loaded
+PO_STREAM_THRESHOLD_BYTES = 200 * 1024 * 1024
+
+
+def stream_po_suppliers(file_path: str, supplier_num_col: Optional[str], supplier_name_col: Optional[str],
+                        item_col: Optional[str], country_lookup: Dict[str, str],
+                        chunksize: int = PO_CHUNK_ROWS,
+                        on_chunk: Optional[Callable[[int], None]] = None) -> Tuple[Dict[str, Dict], int]:
+    """
+    Aggregate a PO CSV without loading it: reads only the mapped columns, as text,
+    chunksize rows at a time. Returns (suppliers, rows read); on_chunk gets the
+    running row count after each chunk.
+    """
+    columns = [col for col in (supplier_num_col, supplier_name_col, item_col) if col]
+    for encoding in ('utf-8', 'latin-1'):
+        aggregator = POSupplierAggregator(supplier_num_col, supplier_name_col, item_col, country_lookup)
+        try:
+            # dtype=str: per-chunk type inference would turn 1042 into '1042' in one chunk and '1042.0' in another
+            for chunk in pd.read_csv(file_path, usecols=list(dict.fromkeys(columns)), dtype=str,
+                                     encoding=encoding, chunksize=chunksize):
+                aggregator.add(chunk)
+                if on_chunk is not None:
+                    on_chunk(aggregator.rows_read)
+        except UnicodeDecodeError:
+            if encoding == 'latin-1':
+                raise
+            continue
+        return aggregator.suppliers, aggregator.rows_read
+    return {}, 0
+
+
+def read_csv_header(file_path: str, nrows: int = 0) -> pd.DataFrame:
+    """First nrows of a CSV (column names only for 0), UTF-8 with Latin-1 fallback"""
+    try:
+        return pd.read_csv(file_path, encoding='utf-8', nrows=nrows)
+    except UnicodeDecodeError:
+        return pd.read_csv(file_path, encoding='latin-1', nrows=nrows)
+
+
+def index_existing_suppliers(genpact_sm_df: pd.DataFrame) -> Dict[str, Dict]:
+    """Existing master rows keyed by lower-cased Normalized_Supplier_Name (last row wins)."""
+    if len(genpact_sm_df) == 0 or 'Normalized_Supplier_Name' not in genpact_sm_df.columns:
+        return {}
+    keys = _str_column(genpact_sm_df['Normalized_Supplier_Name']).str.strip()
+    records = genpact_sm_df.to_dict('records')
+    return {key.lower(): record for key, record in zip(keys, records) if key}
+
+
+def build_category_list(categories_df: pd.DataFrame, l1_col: str, l2_col: str, l3_col: str) -> List[Dict]:
+    """Taxonomy rows as [{'l1', 'l2', 'l3'}] in file order."""
+    return [
+        {'l1': l1, 'l2': l2, 'l3': l3}
+        for l1, l2, l3 in zip(_str_column(categories_df[l1_col]),
+                              _str_column(categories_df[l2_col]),
+                              _str_column(categories_df[l3_col]))
+    ]
+
+
 ###########
 # Gemini API Functions
 ###########
+# Response-cache default for callers that pass use_cache=None; the engine passes config.use_cache
+LLM_CACHE_ENABLED = True
+
+
 def call_gemini_sync(
     model: str,
     api_key: str,
     system_text: str,
     user_text: str,
     temperature: float = 0.2,
-    use_grounding: bool = False
+    use_grounding: bool = False,
+    rate_limiter: Optional[RateLimiter] = None,
+    use_cache: Optional[bool] = None,
+    max_output_tokens: int = 1024,
+    stage: str = 'other',
+    retry_policy: Optional[RetryPolicy] = None
 ) -> Optional[Dict]:
-    """Synchronous Gemini API call"""
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent?key={api_key}"
+    """Synchronous Gemini API call (cached; the rate limiter is only waited on for real calls).
+
+    Each call is recorded under `stage` by the installed LLM telemetry (etl/llm_telemetry.py).
+    429/5xx and connection errors are retried with backoff under retry_policy (etl/llm_retry.py).
+    """
+    url = generate_content_url(model)
+    prompt_text = f"{system_text}\n\nIMPORTANT: You MUST return ONLY valid JSON, no markdown, no explanations.\n\n{user_text}" if use_grounding else f"{system_text}\n\n{user_text}"
     
     request_body = {
         "contents": [{
             "parts": [{
-                "text": f"{system_text}\n\nIMPORTANT: You MUST return ONLY valid JSON, no markdown, no explanations.\n\n{user_text}" if use_grounding else f"{system_text}\n\n{user_text}"
+                "text": prompt_text
             }]
         }],
         "generationConfig": {
             "temperature": temperature,
             "topP": 0.9,
-            "maxOutputTokens": 1024
+            "maxOutputTokens": max_output_tokens
         }
     }
     
@@ -845,18 +1209,47 @@ def call_gemini_sync(
         else:
             request_body["tools"] = [{"googleSearch": {}}]
     
+    telemetry = get_default_telemetry()
+    cache = get_default_cache() if (LLM_CACHE_ENABLED if use_cache is None else use_cache) else None
+    cache_key = None
+    if cache is not None:
+        cache_key = make_cache_key(model, prompt_text, temperature, use_grounding,
+                                   generation_config=request_body["generationConfig"])
+        cached = cache.get(cache_key)
+        if cached is not None:
+            if telemetry is not None:
+                telemetry.record(stage, model, cached=True)
+            return cached
+    
+    def send(attempt: int) -> Dict:
+        # Each attempt is admitted by the rate limiter and recorded separately
+        if rate_limiter is not None:
+            rate_limiter.wait_if_needed()
+        status = None
+        usage = None
+        error = None
+        started = time.perf_counter()
+        try:
+            response = post_json(url, request_body, timeout=60, api_key=api_key)
+            status = response.status_code
+
+            if not response.ok:
+                raise LLMHTTPError(response.status_code, f"API Error {response.status_code}: {response.text[:500]}",
+                                   retry_after_from_response(response))
+
+            data = response.json()
+            usage = data.get('usageMetadata')
+            return data
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            if telemetry is not None:
+                telemetry.record(stage, model, time.perf_counter() - started, status, usage,
+                                 retries=attempt, error=error)
+
     try:
-        response = requests.post(
-            url,
-            headers={"Content-Type": "application/json"},
-            json=request_body,
-            timeout=60
-        )
-        
-        if not response.ok:
-            raise Exception(f"API Error {response.status_code}: {response.text[:500]}")
-        
-        data = response.json()
+        data = call_with_retry(send, retry_policy)
         content = data.get('candidates', [{}])[0].get('content', {}).get('parts', [{}])[0].get('text', '')
         
         if not content:
@@ -865,6 +1258,8 @@ def call_gemini_sync(
         result = safe_extract_json(content)
         if result is None:
             return {"error": "Failed to parse JSON", "raw": content}
+        if cache is not None:
+            cache.put(cache_key, result, model)
         return result
     
     except Exception as e:
@@ -880,9 +1275,22 @@ def enrich_supplier(
     model: str,
     temperature: float,
     use_grounding: bool,
-    rate_limiter: RateLimiter
+    rate_limiter: RateLimiter,
+    store: Optional[Any] = None,
+    use_cache: Optional[bool] = None,
+    log_callback=None
 ) -> Dict[str, Any]:
-    """Enrich supplier with description, employee count, revenue, year established"""
+    """Enrich supplier with description, employee count, revenue, year established.
+
+    A fresh entry in the enrichment store (etl/enrichment_store.py) is returned
+    without calling the API; successful answers are written back to it. A failed
+    write is reported to log_callback and the answer is still returned.
+    """
+    if store is not None:
+        stored = store.get(supplier_name)
+        if stored is not None:
+            return stored
+
     system_prompt = """You are a business research analyst. Use Google Search to find accurate, current information about companies.
     
 Return ONLY valid JSON with these exact fields:
@@ -896,8 +1304,8 @@ Return ONLY valid JSON with these exact fields:
     
 Return JSON: {{"description": "...", "employee_count": "...", "revenue": "...", "year_established": "...", "confidence": 0.0}}"""
     
-    rate_limiter.wait_if_needed()
-    
+    not_available = {'description': 'Not available', 'employee_count': 'Unknown',
+                     'revenue': 'Unknown', 'year_established': 'Unknown', 'confidence': 0.0}
     try:
         result = call_gemini_sync(
             model=model,
@@ -905,23 +1313,33 @@ Return JSON: {{"description": "...", "employee_count": "...", "revenue": "...",
             system_text=system_prompt,
             user_text=user_prompt,
             temperature=temperature,
-            use_grounding=use_grounding
+            use_grounding=use_grounding,
+            rate_limiter=rate_limiter,
+            use_cache=use_cache,
+            stage='enrichment'
         )
         
-        if result and isinstance(result, dict) and not result.get('error'):
-            return {
-                'description': str(result.get('description', 'Not available') or 'Not available'),
-                'employee_count': str(result.get('employee_count', 'Unknown') or 'Unknown'),
-                'revenue': str(result.get('revenue', 'Unknown') or 'Unknown'),
-                'year_established': str(result.get('year_established', 'Unknown') or 'Unknown'),
-                'confidence': float(result.get('confidence', 0.0) or 0.0)
-            }
-        return {'description': 'Not available', 'employee_count': 'Unknown',
-                'revenue': 'Unknown', 'year_established': 'Unknown', 'confidence': 0.0}
+        if not (result and isinstance(result, dict) and not result.get('error')):
+            return not_available
+        enrichment = {
+            'description': str(result.get('description', 'Not available') or 'Not available'),
+            'employee_count': str(result.get('employee_count', 'Unknown') or 'Unknown'),
+            'revenue': str(result.get('revenue', 'Unknown') or 'Unknown'),
+            'year_established': str(result.get('year_established', 'Unknown') or 'Unknown'),
+            'confidence': float(result.get('confidence', 0.0) or 0.0)
+        }
     
     except Exception as e:
-        return {'description': 'Not available', 'employee_count': 'Unknown',
-                'revenue': 'Unknown', 'year_established': 'Unknown', 'confidence': 0.0}
+        return not_available
+
+    # A failed store write (locked DB, dropped connection) must not discard a paid answer
+    if store is not None:
+        try:
+            store.put(supplier_name, enrichment)
+        except Exception as e:
+            if log_callback:
+                log_callback(f"Could not save enrichment of {supplier_name} to the store: {e}")
+    return enrichment
 
 
 def generate_supplier_product_tags(
@@ -930,23 +1348,25 @@ def generate_supplier_product_tags(
     api_key: str,
     model: str,
     temperature: float,
-    rate_limiter: RateLimiter
+    rate_limiter: RateLimiter,
+    use_cache: Optional[bool] = None
 ) -> List[str]:
     """Generate consolidated product/service tags for a supplier"""
     if not item_descriptions:
         return []
     
-    clean_descriptions = list(set([
+    # Sorted, and sampled with a per-supplier seed, so the prompt (and its LLM cache key) is stable across runs
+    clean_descriptions = sorted(set(
         str(d).strip() for d in item_descriptions
         if d and str(d).strip() and str(d).strip().lower() != 'nan'
-    ]))
+    ))
     
     if not clean_descriptions:
         return []
     
     max_descriptions = 100
     if len(clean_descriptions) > max_descriptions:
-        clean_descriptions = random.sample(clean_descriptions, max_descriptions)
+        clean_descriptions = sorted(random.Random(supplier_name).sample(clean_descriptions, max_descriptions))
     
     system_prompt = """You are a procurement analyst. Analyze item descriptions to determine what products/services a supplier provides.
     
@@ -961,8 +1381,6 @@ Item descriptions:
 
 Return: {{"product_service_tags": ["tag1", "tag2", ...]}}"""
     
-    rate_limiter.wait_if_needed()
-    
     try:
         result = call_gemini_sync(
             model=model,
@@ -970,7 +1388,10 @@ Return: {{"product_service_tags": ["tag1", "tag2", ...]}}"""
             system_text=system_prompt,
             user_text=user_prompt,
             temperature=temperature,
-            use_grounding=False
+            use_grounding=False,
+            rate_limiter=rate_limiter,
+            use_cache=use_cache,
+            stage='product_tags'
         )
         
         if result and isinstance(result, dict) and not result.get('error'):
@@ -989,7 +1410,8 @@ def classify_supplier(
     api_key: str,
     model: str,
     temperature: float,
-    rate_limiter: RateLimiter
+    rate_limiter: RateLimiter,
+    use_cache: Optional[bool] = None
 ) -> Dict[str, Any]:
     """Classify a supplier into a category using L1/L2/L3 taxonomy"""
     candidates = prefilter_categories(f"{supplier_name} {description}", categories)
@@ -1011,8 +1433,6 @@ You MUST select an exact path from the list above. Do not invent or combine valu
 For confidence_reasoning, briefly explain what factors influenced your confidence score.
 For l3_token_probability, estimate the probability (0.0 to 1.0) that the L3 category you selected is the correct token/word choice given the context."""
     
-    rate_limiter.wait_if_needed()
-    
     try:
         result = call_gemini_sync(
             model=model,
@@ -1020,7 +1440,10 @@ For l3_token_probability, estimate the probability (0.0 to 1.0) that the L3 cate
             system_text=system_prompt,
             user_text=user_prompt,
             temperature=temperature,
-            use_grounding=False
+            use_grounding=False,
+            rate_limiter=rate_limiter,
+            use_cache=use_cache,
+            stage='classify_supplier'
         )
         
         if result and isinstance(result, dict) and not result.get('error'):
@@ -1045,7 +1468,8 @@ def classify_po_line(
     api_key: str,
     model: str,
     temperature: float,
-    rate_limiter: RateLimiter
+    rate_limiter: RateLimiter,
+    use_cache: Optional[bool] = None
 ) -> Dict[str, Any]:
     """Classify a single PO line item into a category using L1/L2/L3 taxonomy"""
     candidates = prefilter_categories(po_line_description, categories)
@@ -1068,8 +1492,6 @@ You MUST select exactly ONE path from the list above. Do not invent or combine v
 For confidence_reasoning, briefly explain what factors influenced your confidence score.
 For l3_token_probability, estimate the probability (0.0 to 1.0) that the L3 category you selected is the correct token/word choice given the context."""
     
-    rate_limiter.wait_if_needed()
-    
     try:
         result = call_gemini_sync(
             model=model,
@@ -1077,7 +1499,10 @@ For l3_token_probability, estimate the probability (0.0 to 1.0) that the L3 cate
             system_text=system_prompt,
             user_text=user_prompt,
             temperature=temperature,
-            use_grounding=False
+            use_grounding=False,
+            rate_limiter=rate_limiter,
+            use_cache=use_cache,
+            stage='classify_po_line'
         )
         
         if result and isinstance(result, dict) and not result.get('error'):
@@ -1095,6 +1520,202 @@ For l3_token_probability, estimate the probability (0.0 to 1.0) that the L3 cate
         return {'l1': 'Unclassified', 'l2': 'UNCLASSIFIED', 'l3': 'Unclassified', 'confidence': 0.0, 'confidence_reasoning': '', 'l3_token_probability': 0.0}
 
 
+# PO lines packed into one classification prompt (1 = one call per line)
+PO_LINE_BATCH_SIZE = 25
+
+
+def _salvage_line_results(raw: str) -> List[Dict]:
+    """Complete per-line objects from a truncated or malformed batch response"""
+    decoder = json.JSONDecoder()
+    found = []
+    for match in re.finditer(r'\{\s*"line_id"', raw or ''):
+        try:
+            obj, _ = decoder.raw_decode(raw, match.start())
+        except ValueError:
+            continue
+        if isinstance(obj, dict):
+            found.append(obj)
+    return found
+
+
+def classify_po_line_batch(
+    po_line_descriptions: List[str],
+    supplier_name: str,
+    categories: List[Dict],
+    api_key: str,
+    model: str,
+    temperature: float,
+    rate_limiter: RateLimiter,
+    use_cache: Optional[bool] = None
+) -> List[Optional[Dict[str, Any]]]:
+    """
+    Classify several PO lines in one Gemini call.
+    
+    Candidate categories of all lines go into one shared, numbered table and each
+    line lists the ids it may use. Returns one classification per line, or None for
+    lines the response did not cover (truncated / malformed output) or answered
+    with a category that was not among that line's candidates; the caller
+    re-asks for those lines.
+    """
+    table = []
+    table_ids = {}
+    line_candidates = []
+    for desc in po_line_descriptions:
+        ids = []
+        for cat in prefilter_categories(desc, categories):
+            path = (cat.get('l1', ''), cat.get('l2', ''), cat.get('l3', ''))
+            if path not in table_ids:
+                table_ids[path] = len(table)
+                table.append(path)
+            ids.append(table_ids[path])
+        line_candidates.append(ids)
+    
+    system_prompt = """You are a procurement classification expert. You must classify each purchase order line item into the correct taxonomy category.
+Each path has three levels: L1 (broad), L2 (mid), L3 (specific).
+Return ONLY valid JSON. Classify every line, using only the category ids listed for that line."""
+    
+    table_text = "\n".join(f"{i}: {l1} -> {l2} -> {l3}" for i, (l1, l2, l3) in enumerate(table))
+    lines_text = "\n".join(
+        json.dumps({"line_id": i, "description": desc, "candidates": ids}, ensure_ascii=False)
+        for i, (desc, ids) in enumerate(zip(po_line_descriptions, line_candidates))
+    )
+    user_prompt = f"""Supplier: "{supplier_name}"
+
+Taxonomy paths (id: L1 -> L2 -> L3):
+{table_text}
+
+Purchase order lines:
+{lines_text}
+
+Return: {{"results": [{{"line_id": 0, "category_id": 0, "confidence": 0.0, "confidence_reasoning": "...", "l3_token_probability": 0.0}}]}}
+
+Return exactly one result per line_id. category_id MUST be one of that line's candidates.
+Keep confidence_reasoning under 15 words (what influenced the confidence score).
+For l3_token_probability, estimate the probability (0.0 to 1.0) that the L3 category is the correct token/word choice given the context."""
+    
+    max_output_tokens = min(8192, 256 + 80 * len(po_line_descriptions))
+    result = call_gemini_sync(
+        model=model,
+        api_key=api_key,
+        system_text=system_prompt,
+        user_text=user_prompt,
+        temperature=temperature,
+        use_grounding=False,
+        rate_limiter=rate_limiter,
+        max_output_tokens=max_output_tokens,
+        use_cache=use_cache,
+        stage='classify_po_line_batch'
+    )
+    
+    if isinstance(result, dict) and isinstance(result.get('results'), list):
+        items = result['results']
+    elif isinstance(result, dict) and result.get('raw'):
+        items = _salvage_line_results(result['raw'])
+    else:
+        items = []
+    
+    allowed = [set(ids) for ids in line_candidates]
+    classified = [None] * len(po_line_descriptions)
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        try:
+            line_id = int(item.get('line_id'))
+            category_id = int(item.get('category_id'))
+            confidence = float(item.get('confidence', 0.0) or 0.0)
+            token_probability = float(item.get('l3_token_probability', 0.0) or 0.0)
+        except (TypeError, ValueError):
+            continue
+        if not 0 <= line_id < len(classified) or category_id not in allowed[line_id]:
+            continue
+        l1, l2, l3 = table[category_id]
+        classified[line_id] = {
+            'l1': str(l1 or 'Unclassified'),
+            'l2': str(l2 or 'UNCLASSIFIED'),
+            'l3': str(l3 or 'Unclassified'),
+            'confidence': confidence,
+            'confidence_reasoning': str(item.get('confidence_reasoning', '') or ''),
+            'l3_token_probability': token_probability
+        }
+    return classified
+
+
+def _classify_po_line_batches(
+    po_line_descriptions: List[str],
+    supplier_name: str,
+    categories: List[Dict],
+    api_key: str,
+    model: str,
+    temperature: float,
+    rate_limiter: RateLimiter,
+    log_callback=None,
+    batch_size: int = PO_LINE_BATCH_SIZE,
+    use_cache: Optional[bool] = None
+) -> List[Dict[str, Any]]:
+    """
+    Classify PO lines batch_size at a time; one classification dict per line.
+    
+    A batch whose response is truncated or malformed is retried for the missing
+    lines only; if nothing usable came back it is split in half. Single lines use
+    classify_po_line.
+    """
+    total = len(po_line_descriptions)
+    unclassified = {'l1': 'Unclassified', 'l2': 'UNCLASSIFIED', 'l3': 'Unclassified', 'confidence': 0.0, 'confidence_reasoning': '', 'l3_token_probability': 0.0}
+    classifications = [None] * total
+    
+    step = max(1, batch_size)
+    # Stack of index batches, first batch on top
+    pending = [list(range(start, min(start + step, total))) for start in range(0, total, step)]
+    pending.reverse()
+    done = 0
+    
+    while pending:
+        indices = pending.pop()
+        if log_callback and (len(indices) > 1 or done % 10 == 0):
+            log_callback(f"  Classifying PO lines {done+1}-{done+len(indices)}/{total}...")
+        
+        if len(indices) == 1:
+            i = indices[0]
+            classifications[i] = classify_po_line(
+                po_line_description=po_line_descriptions[i],
+                supplier_name=supplier_name,
+                categories=categories,
+                api_key=api_key,
+                model=model,
+                temperature=temperature,
+                rate_limiter=rate_limiter,
+                use_cache=use_cache
+            )
+            done += 1
+            continue
+        
+        try:
+            batch = classify_po_line_batch(
+                [po_line_descriptions[i] for i in indices], supplier_name, categories,
+                api_key, model, temperature, rate_limiter, use_cache
+            )
+        except Exception:
+            # API failure (not a bad response): same fallback as a failed single-line call
+            batch = [dict(unclassified) for _ in indices]
+        
+        missing = []
+        for i, classification in zip(indices, batch):
+            if classification is None:
+                missing.append(i)
+            else:
+                classifications[i] = classification
+        done += len(indices) - len(missing)
+        
+        if len(missing) == len(indices):
+            half = len(missing) // 2
+            pending.append(missing[half:])
+            pending.append(missing[:half])
+        elif missing:
+            pending.append(missing)
+    
+    return classifications
+
+
 def classify_po_lines_individually(
     po_line_descriptions: List[str],
     supplier_name: str,
@@ -1103,31 +1724,60 @@ def classify_po_lines_individually(
     model: str,
     temperature: float,
     rate_limiter: RateLimiter,
-    log_callback=None
+    log_callback=None,
+    batch_size: int = PO_LINE_BATCH_SIZE,
+    use_memo: Optional[bool] = None,
+    taxonomy_hash: Optional[str] = None,
+    use_cache: Optional[bool] = None
 ) -> List[Dict[str, Any]]:
     """
-    Classify each PO line individually.
+    Classify each PO line.
     Returns a list of classification results with descriptions.
+    
+    Lines are keyed by normalized description: duplicates are classified once,
+    and known keys come from the persistent classification memo (shared across
+    suppliers and runs, scoped to the taxonomy version) before any API call.
+    use_cache turns the response cache on or off for this call (None: the
+    module's LLM_CACHE_ENABLED); use_memo defaults to the same setting.
     """
     if not po_line_descriptions:
         return []
     
-    results = []
-    total = len(po_line_descriptions)
+    keys = [ClassificationMemo.normalize_description(desc) for desc in po_line_descriptions]
+    representative = {}
+    for key, desc in zip(keys, po_line_descriptions):
+        representative.setdefault(key, desc)
+    
+    if use_memo is None:
+        use_memo = LLM_CACHE_ENABLED if use_cache is None else use_cache
+    memo = get_default_classification_memo() if use_memo else None
+    version = None
+    known = {}
+    if memo is not None:
+        version = taxonomy_hash or taxonomy_version(categories)
+        known = memo.get_many(version, list(representative))
+    
+    todo = [key for key in representative if key not in known]
+    if log_callback and len(todo) < len(po_line_descriptions):
+        log_callback(f"  {len(po_line_descriptions) - len(todo)} of {len(po_line_descriptions)} PO lines "
+                     f"are duplicates or already classified")
+    
+    classified = _classify_po_line_batches(
+        [representative[key] for key in todo], supplier_name, categories,
+        api_key, model, temperature, rate_limiter, log_callback, batch_size, use_cache
+    )
+    learned = {}
+    for key, classification in zip(todo, classified):
+        known[key] = classification
+        # Failed calls come back as zero-confidence Unclassified; don't remember those
+        if classification['l1'] != 'Unclassified' or classification['confidence'] > 0:
+            learned[key] = classification
+    if memo is not None:
+        memo.put_many(version, learned)
     
-    for idx, desc in enumerate(po_line_descriptions):
-        if log_callback and idx % 10 == 0:
-            log_callback(f"  Classifying PO line {idx+1}/{total}...")
-        
-        classification = classify_po_line(
-            po_line_description=desc,
-            supplier_name=supplier_name,
-            categories=categories,
-            api_key=api_key,
-            model=model,
-            temperature=temperature,
-            rate_limiter=rate_limiter
-        )
+    results = []
+    for desc, key in zip(po_line_descriptions, keys):
+        classification = known[key]
         results.append({
             'description': desc,
             'l1': classification['l1'],
@@ -1148,7 +1798,8 @@ def consolidate_classifications(
     model: str,
     temperature: float,
     rate_limiter: RateLimiter,
-    confidence_threshold: float = 0.6
+    confidence_threshold: float = 0.6,
+    use_cache: Optional[bool] = None
 ) -> List[Dict[str, Any]]:
     """
     Review classifications and consolidate low-confidence items into better-fitting categories.
@@ -1258,8 +1909,6 @@ Return JSON:
 
 Remember: Only reassign if there's a genuine fit. It's OK to keep items in their original categories."""
     
-    rate_limiter.wait_if_needed()
-    
     try:
         result = call_gemini_sync(
             model=model,
@@ -1267,7 +1916,10 @@ Remember: Only reassign if there's a genuine fit. It's OK to keep items in their
             system_text=system_prompt,
             user_text=user_prompt,
             temperature=temperature,
-            use_grounding=False
+            use_grounding=False,
+            rate_limiter=rate_limiter,
+            use_cache=use_cache,
+            stage='consolidation'
         )
         
         if result and isinstance(result, dict) and 'reassignments' in result:
@@ -1336,1270 +1988,1644 @@ def _group_classified_lines(classified_lines: List[Dict]) -> List[Dict[str, Any]
 
 
 ###########
-# Main Application Class
+# Headless Engine
 ###########
-class SupplierMasterApp:
-    """Main Tkinter Application"""
-    
-    def __init__(self, root):
-        self.root = root
-        self.root.title(f"Supplier Master Generator v{APP_VERSION}")
-        self.root.geometry("1300x850")
-        self.root.minsize(1100, 700)
-        
-        # Data storage
-        self.po_data = None
-        self.client_sm_data = None
-        self.categories_data = None
-        self.results_data = None
-        self.po_file_path = ""
-        
-        # Column mappings
-        self.po_columns = {}
-        self.client_sm_columns = {}
-        self.category_columns = {}
-        
-        # Stats
-        self.stats = {
-            'new_suppliers': 0,
-            'updated_suppliers': 0,
-            'unchanged_suppliers': 0,
-            'total_in_master': 0
-        }
-        
-        # Processing state
-        self.processing = False
-        self.message_queue = queue.Queue()
-        
-        # Variables for form inputs
-        self.api_key_var = tk.StringVar()
-        self.model_var = tk.StringVar(value="gemini-2.0-flash")
-        self.rpm_var = tk.IntVar(value=30)
-        self.temp_var = tk.DoubleVar(value=0.2)
-        self.grounding_var = tk.BooleanVar(value=True)
-        
-        # Setup UI
-        self.setup_ui()
-        
-        # Start message queue processor
-        self.process_queue()
-    
-    def setup_ui(self):
-        """Setup the main UI"""
-        # Create main paned window (horizontal split)
-        self.main_paned = ttk.PanedWindow(self.root, orient=tk.HORIZONTAL)
-        self.main_paned.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        
-        # Sidebar (Settings)
-        self.sidebar = self.create_sidebar()
-        self.main_paned.add(self.sidebar, weight=0)
-        
-        # Main content area
-        self.main_content = self.create_main_content()
-        self.main_paned.add(self.main_content, weight=1)
-    
-    def create_sidebar(self) -> ttk.Frame:
-        """Create the sidebar with settings"""
-        sidebar = ttk.Frame(self.main_paned, width=300)
-        sidebar.pack_propagate(False)
-        
-        # Header
-        header = ttk.Label(sidebar, text="Settings", font=('Helvetica', 14, 'bold'))
-        header.pack(pady=(10, 15), padx=10, anchor='w')
-        
-        # API Settings Frame
-        api_frame = ttk.LabelFrame(sidebar, text="API Configuration", padding=10)
-        api_frame.pack(fill=tk.X, padx=10, pady=5)
-        
-        # API Key
-        ttk.Label(api_frame, text="API Key:").pack(anchor='w')
-        self.api_key_entry = ttk.Entry(api_frame, textvariable=self.api_key_var, show='*', width=30)
-        self.api_key_entry.pack(fill=tk.X, pady=(0, 10))
-        
-        # Model
-        ttk.Label(api_frame, text="Model:").pack(anchor='w')
-        model_combo = ttk.Combobox(api_frame, textvariable=self.model_var,
-                                  values=["gemini-2.0-flash", "gemini-1.5-flash", "gemini-1.5-pro"],
-                                  state='readonly', width=28)
-        model_combo.pack(fill=tk.X, pady=(0, 10))
-        
-        # RPM and Temperature in a row
-        rpm_temp_frame = ttk.Frame(api_frame)
-        rpm_temp_frame.pack(fill=tk.X, pady=(0, 10))
-        
-        ttk.Label(rpm_temp_frame, text="RPM:").pack(side=tk.LEFT)
-        rpm_spin = ttk.Spinbox(rpm_temp_frame, from_=1, to=100, textvariable=self.rpm_var, width=5)
-        rpm_spin.pack(side=tk.LEFT, padx=(5, 15))
-        
-        ttk.Label(rpm_temp_frame, text="Temp:").pack(side=tk.LEFT)
-        temp_spin = ttk.Spinbox(rpm_temp_frame, from_=0.0, to=1.0, increment=0.1,
-                               textvariable=self.temp_var, width=5, format="%.1f")
-        temp_spin.pack(side=tk.LEFT, padx=5)
-        
-        # Grounding checkbox
-        grounding_check = ttk.Checkbutton(api_frame, text="Enable Google Search Grounding",
-                                         variable=self.grounding_var)
-        grounding_check.pack(anchor='w')
-        
-        # Test API Button
-        self.test_btn = ttk.Button(sidebar, text="Test API Connection", command=self.test_api)
-        self.test_btn.pack(fill=tk.X, padx=10, pady=10)
-        
-        # Output File Frame
-        output_frame = ttk.LabelFrame(sidebar, text="Output File", padding=10)
-        output_frame.pack(fill=tk.X, padx=10, pady=5)
-        
-        self.output_path_label = ttk.Label(output_frame, text="Auto-save to input directory",
-                                          wraplength=250)
-        self.output_path_label.pack(anchor='w')
-        
-        self.output_status_label = ttk.Label(output_frame, text="No output file yet",
-                                            foreground='gray')
-        self.output_status_label.pack(anchor='w', pady=(5, 0))
-        
-        self.delete_btn = ttk.Button(output_frame, text="Reset/Delete Output File",
-                                    command=self.delete_output_file, state='disabled')
-        self.delete_btn.pack(fill=tk.X, pady=(10, 0))
-        
-        # Spacer
-        ttk.Frame(sidebar).pack(fill=tk.BOTH, expand=True)
-        
-        # Version info
-        version_label = ttk.Label(sidebar, text=f"Build: {APP_BUILD}\nPO line classification flow",
-                                 foreground='gray', font=('Helvetica', 9))
-        version_label.pack(pady=10, padx=10, anchor='w')
-        
-        return sidebar
-    
-    def create_main_content(self) -> ttk.Frame:
-        """Create the main content area with tabs"""
-        main_frame = ttk.Frame(self.main_paned)
-        
-        # Header
-        header_frame = ttk.Frame(main_frame)
-        header_frame.pack(fill=tk.X, padx=10, pady=(10, 5))
-        
-        title_label = ttk.Label(header_frame, text="Supplier Master Generator",
-                               font=('Helvetica', 18, 'bold'))
-        title_label.pack(side=tk.LEFT)
-        
-        # Version badge (using a label with background)
-        version_frame = tk.Frame(header_frame, bg='#27ae60', padx=8, pady=2)
-        version_frame.pack(side=tk.LEFT, padx=10)
-        tk.Label(version_frame, text=f"v{APP_VERSION}", bg='#27ae60', fg='white',
-                font=('Helvetica', 10)).pack()
-        
-        # Description
-        desc_label = ttk.Label(main_frame,
-                              text="AI-powered Genpact Supplier Master maintenance with automatic incremental updates.",
-                              foreground='gray')
-        desc_label.pack(anchor='w', padx=10, pady=(0, 10))
-        
-        # Feature highlight box
-        feature_frame = tk.Frame(main_frame, bg='#e8f8f5', padx=15, pady=10)
-        feature_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
-        
-        # Left border effect
-        border = tk.Frame(feature_frame, bg='#27ae60', width=4)
-        border.pack(side=tk.LEFT, fill=tk.Y, padx=(0, 10))
-        
-        feature_text = tk.Label(feature_frame, bg='#e8f8f5', justify=tk.LEFT,
-                               text="Inputs: PO File + Taxonomy (L1/L2/L3) + Client Supplier Master (optional)\n"
-                                    "Output: Automatically updates GenpactSupplierMaster.csv (adds new, updates existing)")
-        feature_text.pack(side=tk.LEFT, anchor='w')
-        
-        # Tab notebook
-        self.notebook = ttk.Notebook(main_frame)
-        self.notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
-        
-        # Create tabs
-        self.upload_tab = self.create_upload_tab()
-        self.notebook.add(self.upload_tab, text="📁 Upload Inputs")
-        
-        self.mapping_tab = self.create_mapping_tab()
-        self.notebook.add(self.mapping_tab, text="🔧 Column Mapping")
-
-        self.process_tab = self.create_process_tab()
-        self.notebook.add(self.process_tab, text="⚙️ Process")
-
-        self.results_tab = self.create_results_tab()
-        self.notebook.add(self.results_tab, text="📊 Results")
-
-        return main_frame
-
-    def create_upload_tab(self) -> ttk.Frame:
-        """Create the file upload tab"""
-        tab = ttk.Frame(self.notebook, padding=10)
-
-        # Header
-        ttk.Label(tab, text="Upload Input Files", font=('Helvetica', 14, 'bold')).pack(anchor='w', pady=(0, 10))
-
-        # Files frame (3 columns) - use pack with side=LEFT for horizontal layout
-        files_frame = ttk.Frame(tab)
-        files_frame.pack(fill=tk.X, expand=False, pady=(0, 10))
-
-        # PO File
-        po_frame = ttk.LabelFrame(files_frame, text="1️⃣ PO File", padding=10)
-        po_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 5))
-
-        ttk.Label(po_frame, text="Supplier Number, Supplier Name, Item Description",
-                 foreground='gray', font=('Helvetica', 9)).pack(anchor='w')
-
-        ttk.Button(po_frame, text="Browse PO CSV...",
-                  command=lambda: self.load_file('po')).pack(fill=tk.X, pady=(10, 5))
+@dataclass
+class SupplierMasterConfig:
+    """Run settings for SupplierMasterEngine (the GUI sidebar, or CLI flags)."""
+    api_key: str = ''
+    model: str = 'gemini-2.0-flash'
+    temperature: float = 0.2
+    use_grounding: bool = True
+    rpm_limit: int = 30
+    max_workers: int = 4
+    use_cache: bool = True
+    # Reuse stored supplier enrichments (local SQLite, or ref.global_supplier_data_master
+    # when DB_* env is set) younger than enrichment_max_age_days instead of calling the API
+    use_enrichment_store: bool = True
+    enrichment_max_age_days: float = DEFAULT_MAX_AGE_DAYS
+    # Per-call LLM telemetry JSONL (None: logs/llm_calls_<timestamp>.jsonl)
+    telemetry: bool = True
+    telemetry_path: Optional[str] = None
+    # Replay <master>.journal.jsonl from an interrupted run instead of starting over
+    resume: bool = False
+    # Rows per chunk when the PO file is streamed (engine po_path)
+    po_chunksize: int = PO_CHUNK_ROWS
+    # Logical field -> input column, e.g. {'supplier_name': 'Vendor Name'}
+    po_columns: Dict[str, str] = field(default_factory=dict)
+    client_sm_columns: Dict[str, str] = field(default_factory=dict)
+    category_columns: Dict[str, str] = field(default_factory=dict)
+
+
+class SupplierMasterEngine:
+    """
+    GUI-free Supplier Master pipeline.
 
-        self.po_status_label = ttk.Label(po_frame, text="No file loaded", foreground='gray')
-        self.po_status_label.pack(anchor='w')
+    Progress and log lines go to the on_progress(fraction, status) and
+    on_log(message, level) callbacks. They are called from worker threads
+    while suppliers are processed in parallel, so they must be thread-safe.
+    """
 
-        # PO Preview - fixed height
-        self.po_preview_tree = self.create_preview_tree(po_frame)
+    def __init__(self, config: SupplierMasterConfig, po_data: Optional[pd.DataFrame], categories_data: pd.DataFrame,
+                 client_sm_data: Optional[pd.DataFrame] = None,
+                 on_log: Optional[Callable[[str, str], None]] = None,
+                 on_progress: Optional[Callable[[float, str], None]] = None,
+                 po_path: Optional[str] = None):
+        if po_data is None and not po_path:
+            raise ValueError("SupplierMasterEngine needs po_data or po_path")
+        self.config = config
+        # po_data=None: stream po_path in chunks instead of holding the PO file in memory
+        self.po_data = po_data
+        self.po_path = po_path
+        self.categories_data = categories_data
+        self.client_sm_data = client_sm_data
+        self.on_log = on_log
+        self.on_progress = on_progress
+        # Opened by process_all_data() when config.use_enrichment_store is set
+        self.enrichment_store = None
+        # Per-stage summary of the last run's LLM calls (etl/llm_telemetry.py), when telemetry is on
+        self.telemetry_summary = None
+        self.telemetry_path = None
+
+    def emit_progress(self, progress: float, status: str):
+        if self.on_progress is not None:
+            self.on_progress(progress, status)
+
+    def emit_log(self, message: str, level: str = 'info'):
+        if self.on_log is not None:
+            self.on_log(message, level)
+
+    def log_step_time(self, step: str, started: float):
+        """Log how long a processing step took (started from time.perf_counter())."""
+        self.emit_log(f"{step} took {time.perf_counter() - started:.2f}s", 'info')
+
+    def normalize_supplier_names(self, supplier_names: List[str], rate_limiter: RateLimiter) -> Dict[str, str]:
+        """Normalize supplier names using hybrid approach"""
+        if not supplier_names:
+            return {}
+
+        # First-seen order, so clustering and the confirmation prompts are the same on every run
+        unique_names = list(dict.fromkeys(str(n).strip() for n in supplier_names if n and str(n).strip()))
+
+        if len(unique_names) == 0:
+            return {}
+
+        if len(unique_names) == 1:
+            return {unique_names[0]: unique_names[0]}
+
+        self.emit_log(f"Clustering {len(unique_names)} unique supplier names...", 'info')
+        self.emit_progress(0.1, "Pre-clustering supplier names algorithmically...")
+
+        clusters = cluster_suppliers_algorithmic(unique_names, threshold=0.65)
+
+        confirmed_clusters = []
+        ambiguous_clusters = []
+        singleton_names = []
+
+        for cluster in clusters:
+            if len(cluster) == 1:
+                singleton_names.append(cluster[0])
+            elif len(cluster) > 1:
+                scores = []
+                for i, n1 in enumerate(cluster):
+                    for n2 in cluster[i+1:]:
+                        scores.append(company_similarity(n1, n2))
+                avg_score = sum(scores) / len(scores) if scores else 0
+
+                if avg_score >= 0.85:
+                    confirmed_clusters.append(cluster)
+                else:
+                    ambiguous_clusters.append(cluster)
+
+        self.emit_log(f"Pre-clustering: {len(confirmed_clusters)} confirmed, {len(ambiguous_clusters)} ambiguous, {len(singleton_names)} singletons", 'info')
+
+        for cluster in confirmed_clusters[:5]:
+            self.emit_log(f"Auto-grouped: {cluster}", 'success')
+
+        name_map = {}
+
+        for cluster in confirmed_clusters:
+            canonical = pick_canonical_name(cluster)
+            for name in cluster:
+                name_map[name] = canonical
+            if len(cluster) > 1:
+                self.emit_log(f"Canonical selected: '{canonical}' from {cluster}", 'success')
+
+        for name in singleton_names:
+            name_map[name] = name
+
+        # Process ambiguous clusters with LLM
+        if ambiguous_clusters:
+            self.emit_progress(0.4, f"LLM confirming {len(ambiguous_clusters)} ambiguous clusters...")
+            self.emit_log(f"Sending {len(ambiguous_clusters)} ambiguous clusters to LLM for confirmation...", 'info')
+
+            system_prompt = """You are a supplier data expert. For each cluster of company names, determine:
+1. Are these names referring to the SAME company? (Yes/No)
+2. If Yes, what is the best canonical name?
 
-        # Client SM File
-        csm_frame = ttk.LabelFrame(files_frame, text="2️⃣ Client Supplier Master (Optional)", padding=10)
-        csm_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5)
+Return ONLY valid JSON."""
 
-        ttk.Label(csm_frame, text="Supplier Number, Country",
-                 foreground='gray', font=('Helvetica', 9)).pack(anchor='w')
+            batch_size = 10
+            for batch_idx in range(0, len(ambiguous_clusters), batch_size):
+                batch = ambiguous_clusters[batch_idx:batch_idx + batch_size]
 
-        ttk.Button(csm_frame, text="Browse Client SM CSV...",
-                  command=lambda: self.load_file('csm')).pack(fill=tk.X, pady=(10, 5))
+                clusters_for_llm = [{"cluster_id": idx, "names": cluster} for idx, cluster in enumerate(batch)]
 
-        self.csm_status_label = ttk.Label(csm_frame, text="No file loaded", foreground='gray')
-        self.csm_status_label.pack(anchor='w')
+                user_prompt = f"""Analyze these {len(batch)} clusters:
 
-        # CSM Preview - fixed height
-        self.csm_preview_tree = self.create_preview_tree(csm_frame)
+{json.dumps(clusters_for_llm, indent=2)}
 
-        # Categories File
-        cat_frame = ttk.LabelFrame(files_frame, text="3️⃣ Taxonomy", padding=10)
-        cat_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(5, 0))
+Return JSON:
+{{
+    "results": [
+        {{"cluster_id": 0, "same_company": true, "canonical_name": "Best Name Inc"}},
+        {{"cluster_id": 1, "same_company": false, "reason": "Different companies"}}
+    ]
+}}"""
 
-        ttk.Label(cat_frame, text="Genpact Level 1, Level 2, Level 3",
-                 foreground='gray', font=('Helvetica', 9)).pack(anchor='w')
+                try:
+                    result = call_gemini_sync(
+                        model=self.config.model,
+                        api_key=self.config.api_key,
+                        system_text=system_prompt,
+                        user_text=user_prompt,
+                        temperature=self.config.temperature,
+                        use_grounding=False,
+                        rate_limiter=rate_limiter,
+                        use_cache=self.config.use_cache,
+                        stage='name_confirmation'
+                    )
 
-        ttk.Button(cat_frame, text="Browse Categories CSV...",
-                  command=lambda: self.load_file('cat')).pack(fill=tk.X, pady=(10, 5))
+                    if result and isinstance(result, dict) and 'results' in result:
+                        for item in result['results']:
+                            if not isinstance(item, dict):
+                                continue
+                            cluster_id = item.get('cluster_id', -1)
+                            if cluster_id < 0 or cluster_id >= len(batch):
+                                continue
 
-        self.cat_status_label = ttk.Label(cat_frame, text="No file loaded", foreground='gray')
-        self.cat_status_label.pack(anchor='w')
+                            cluster = batch[cluster_id]
 
-        # Taxonomy Preview - fixed height
-        self.cat_preview_tree = self.create_preview_tree(cat_frame)
+                            if item.get('same_company', False):
+                                canonical = pick_canonical_name(cluster)
+                                for name in cluster:
+                                    name_map[name] = canonical
+                                self.emit_log(f"LLM confirmed: {cluster} -> {canonical}", 'success')
+                            else:
+                                for name in cluster:
+                                    name_map[name] = name
+                                self.emit_log(f"↔ LLM separated: {cluster}", 'info')
+                    else:
+                        for cluster in batch:
+                            canonical = pick_canonical_name(cluster)
+                            for name in cluster:
+                                name_map[name] = canonical
 
-        # Output info box
-        output_frame = tk.Frame(tab, bg='#fef9e7', padx=15, pady=10)
-        output_frame.pack(fill=tk.X, pady=(10, 0), side=tk.BOTTOM)
+                except Exception as e:
+                    self.emit_log(f"LLM confirmation error: {str(e)}", 'warning')
+                    for cluster in batch:
+                        canonical = pick_canonical_name(cluster)
+                        for name in cluster:
+                            name_map[name] = canonical
 
-        border = tk.Frame(output_frame, bg='#f39c12', width=4)
-        border.pack(side=tk.LEFT, fill=tk.Y, padx=(0, 10))
+                progress = 0.4 + ((batch_idx + batch_size) / len(ambiguous_clusters)) * 0.5
+                self.emit_progress(min(progress, 0.9), f"LLM confirming clusters... ({min(batch_idx + batch_size, len(ambiguous_clusters))}/{len(ambiguous_clusters)})")
 
-        self.output_info_label = tk.Label(output_frame, bg='#fef9e7',
-                                         text="Output: Results will be saved to the same directory as the PO file")
-        self.output_info_label.pack(side=tk.LEFT, anchor='w')
+        for name in unique_names:
+            if name not in name_map:
+                name_map[name] = name
 
-        return tab
+        unique_canonical = set(name_map.values())
+        dedup_count = len(unique_names) - len(unique_canonical)
 
-    def create_preview_tree(self, parent) -> ttk.Treeview:
-        """Create a preview treeview for CSV data - with FIXED height"""
-        tree_frame = ttk.Frame(parent, height=120)
-        tree_frame.pack(fill=tk.X, expand=False, pady=(10, 0))
-        tree_frame.pack_propagate(False)  # Prevent frame from shrinking/expanding
+        if dedup_count > 0:
+            self.emit_log(f"Deduplicated {len(unique_names)} names -> {len(unique_canonical)} unique suppliers ({dedup_count} duplicates merged)", 'success')
+        else:
+            self.emit_log(f"All {len(unique_names)} supplier names are unique", 'info')
 
-        # Treeview with fixed height of 4 rows
-        tree = ttk.Treeview(tree_frame, height=4, show='headings')
+        return name_map
 
-        # Horizontal scrollbar
-        x_scroll = ttk.Scrollbar(tree_frame, orient=tk.HORIZONTAL, command=tree.xview)
-        x_scroll.pack(side=tk.BOTTOM, fill=tk.X)
+    def process_all_data(self, genpact_sm_path: str) -> Tuple[pd.DataFrame, dict]:
+        """Main processing orchestrator: builds the master from the inputs and saves it to genpact_sm_path"""
+        telemetry = LLMTelemetry(self.config.telemetry_path) if self.config.telemetry else None
+        set_default_telemetry(telemetry)
+        # One AIMD limit for the whole worker pool: a 429 backs every worker off
+        controller = AIMDController(self.config.max_workers)
+        set_default_controller(controller)
+        try:
+            return self._process_all_data(genpact_sm_path)
+        finally:
+            set_default_controller(None)
+            if controller.throttles:
+                self.emit_log(controller.summary(), 'warning')
+            if telemetry is not None:
+                set_default_telemetry(None)
+                telemetry.close()
+                self.telemetry_summary = telemetry.summary()
+                self.telemetry_path = str(telemetry.path)
+                if self.telemetry_summary:
+                    self.emit_log(f"LLM calls by stage (details in {telemetry.path}):\n"
+                                  f"{format_summary(self.telemetry_summary)}")
+
+    def _process_all_data(self, genpact_sm_path: str) -> Tuple[pd.DataFrame, dict]:
+        config = self.config
+        api_key, model, temperature = config.api_key, config.model, config.temperature
+        use_grounding, max_workers = config.use_grounding, config.max_workers
+        rate_limiter = RateLimiter(max_rpm=config.rpm_limit)
+        stats = {'new_suppliers': 0, 'updated_suppliers': 0, 'unchanged_suppliers': 0, 'total_in_master': 0}
 
-        # Vertical scrollbar
-        y_scroll = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=tree.yview)
-        y_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        po_supplier_num_col = config.po_columns.get('supplier_number')
+        po_supplier_name_col = config.po_columns.get('supplier_name')
+        po_item_col = config.po_columns.get('item_description')
 
-        tree.configure(yscrollcommand=y_scroll.set, xscrollcommand=x_scroll.set)
-        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        csm_supplier_num_col = config.client_sm_columns.get('supplier_number')
+        csm_country_col = config.client_sm_columns.get('country')
 
-        return tree
+        # Updated for L1/L2/L3 taxonomy
+        cat_l1_col = config.category_columns.get('l1')
+        cat_l2_col = config.category_columns.get('l2')
+        cat_l3_col = config.category_columns.get('l3')
 
-    def create_mapping_tab(self) -> ttk.Frame:
-        """Create the column mapping tab"""
-        tab = ttk.Frame(self.notebook, padding=10)
+        # STEP 1: Build Country lookup (optional - only if Client SM provided)
+        self.emit_log("Step 1: Building country lookup from Client Supplier Master...", 'info')
+        self.emit_progress(0.05, "Building country lookup...")
 
-        ttk.Label(tab, text="Column Mapping", font=('Helvetica', 14, 'bold')).pack(anchor='w', pady=(0, 15))
+        step_started = time.perf_counter()
+        country_lookup = {}
+        if self.client_sm_data is not None and csm_supplier_num_col and csm_country_col:
+            country_lookup = build_country_lookup(self.client_sm_data, csm_supplier_num_col, csm_country_col)
+            self.emit_log(f"Built country lookup for {len(country_lookup)} suppliers", 'info')
+        else:
+            self.emit_log("No Client Supplier Master provided - country data will be 'Unknown'", 'info')
+        self.log_step_time("Step 1", step_started)
 
-        # Mapping frames
-        mapping_frame = ttk.Frame(tab)
-        mapping_frame.pack(fill=tk.X)
-        mapping_frame.columnconfigure(0, weight=1)
-        mapping_frame.columnconfigure(1, weight=1)
-        mapping_frame.columnconfigure(2, weight=1)
+        # STEP 2: Extract supplier data from PO file
+        self.emit_log("Step 2: Extracting suppliers from PO file...", 'info')
+        step_started = time.perf_counter()
 
-        # PO Mapping
-        po_map_frame = ttk.LabelFrame(mapping_frame, text="PO File Columns", padding=10)
-        po_map_frame.grid(row=0, column=0, sticky='nsew', padx=5, pady=5)
+        if self.po_data is not None:
+            po_suppliers = extract_po_suppliers(self.po_data, po_supplier_num_col, po_supplier_name_col,
+                                                po_item_col, country_lookup)
+        else:
+            po_suppliers, rows_read = stream_po_suppliers(
+                self.po_path, po_supplier_num_col, po_supplier_name_col, po_item_col, country_lookup,
+                chunksize=config.po_chunksize,
+                on_chunk=lambda rows: self.emit_progress(0.05, f"Reading PO file... {rows:,} rows"))
+            self.emit_log(f"Streamed {rows_read:,} PO lines from {os.path.basename(self.po_path)}", 'info')
 
-        ttk.Label(po_map_frame, text="Supplier Number:").pack(anchor='w')
-        self.po_num_combo = ttk.Combobox(po_map_frame, state='readonly', width=25)
-        self.po_num_combo.pack(fill=tk.X, pady=(0, 10))
+        self.emit_log(f"Found {len(po_suppliers)} unique supplier names in PO file", 'info')
+        self.log_step_time("Step 2", step_started)
 
-        ttk.Label(po_map_frame, text="Supplier Name:").pack(anchor='w')
-        self.po_name_combo = ttk.Combobox(po_map_frame, state='readonly', width=25)
-        self.po_name_combo.pack(fill=tk.X, pady=(0, 10))
+        # STEP 3: Normalize supplier names
+        self.emit_log("Step 3: Normalizing supplier names...", 'info')
+        self.emit_progress(0.10, "Normalizing supplier names...")
+        step_started = time.perf_counter()
 
-        ttk.Label(po_map_frame, text="Item Description:").pack(anchor='w')
-        self.po_item_combo = ttk.Combobox(po_map_frame, state='readonly', width=25)
-        self.po_item_combo.pack(fill=tk.X)
+        all_supplier_names = list(po_suppliers.keys())
+        name_normalization_map = self.normalize_supplier_names(all_supplier_names, rate_limiter)
 
-        # CSM Mapping
-        csm_map_frame = ttk.LabelFrame(mapping_frame, text="Client Supplier Master Columns", padding=10)
-        csm_map_frame.grid(row=0, column=1, sticky='nsew', padx=5, pady=5)
+        self.emit_log(f"Normalized {len(name_normalization_map)} supplier names", 'success')
 
-        ttk.Label(csm_map_frame, text="Supplier Number:").pack(anchor='w')
-        self.csm_num_combo = ttk.Combobox(csm_map_frame, state='readonly', width=25)
-        self.csm_num_combo.pack(fill=tk.X, pady=(0, 10))
+        # Regroup by normalized name
+        normalized_suppliers = defaultdict(lambda: {'items': [], 'countries': set(), 'original_names': set()})
 
-        ttk.Label(csm_map_frame, text="Country:").pack(anchor='w')
-        self.csm_country_combo = ttk.Combobox(csm_map_frame, state='readonly', width=25)
-        self.csm_country_combo.pack(fill=tk.X)
+        for original_name, data in po_suppliers.items():
+            normalized_name = name_normalization_map.get(original_name, original_name)
+            if not normalized_name or not str(normalized_name).strip():
+                normalized_name = original_name
+            if not normalized_name or not str(normalized_name).strip():
+                continue
+            normalized_suppliers[normalized_name]['items'].extend(data['items'])
+            normalized_suppliers[normalized_name]['countries'].update(data['countries'])
+            normalized_suppliers[normalized_name]['original_names'].add(original_name)
 
-        # Category Mapping - Updated for L1/L2/L3
-        cat_map_frame = ttk.LabelFrame(mapping_frame, text="Taxonomy Columns", padding=10)
-        cat_map_frame.grid(row=0, column=2, sticky='nsew', padx=5, pady=5)
+        self.emit_log(f"After normalization: {len(normalized_suppliers)} unique suppliers", 'info')
+        self.log_step_time("Step 3", step_started)
 
-        ttk.Label(cat_map_frame, text="Genpact Level 1:").pack(anchor='w')
-        self.cat_l1_combo = ttk.Combobox(cat_map_frame, state='readonly', width=25)
-        self.cat_l1_combo.pack(fill=tk.X, pady=(0, 10))
+        # STEP 4: Load existing Genpact Supplier Master
+        self.emit_log(f"Step 4: Loading Genpact Supplier Master from {genpact_sm_path}...", 'info')
+        self.emit_progress(0.25, "Loading Genpact Supplier Master...")
 
-        ttk.Label(cat_map_frame, text="Genpact Level 2 (Category Code):").pack(anchor='w')
-        self.cat_l2_combo = ttk.Combobox(cat_map_frame, state='readonly', width=25)
-        self.cat_l2_combo.pack(fill=tk.X, pady=(0, 10))
+        step_started = time.perf_counter()
+        # .sqlite/.db master: indexed lookups of this run's suppliers only
+        master_store = open_master_store(genpact_sm_path)
+        if master_store is not None:
+            existing_suppliers = master_store.fetch(normalized_suppliers.keys())
+            self.emit_log(f"Matched {len(existing_suppliers)} of {len(normalized_suppliers)} suppliers in master store "
+                          f"({master_store.supplier_count()} stored)", 'info')
+        else:
+            genpact_sm_df = load_genpact_supplier_master(genpact_sm_path)
 
-        ttk.Label(cat_map_frame, text="Genpact Level 3 (Category Name):").pack(anchor='w')
-        self.cat_l3_combo = ttk.Combobox(cat_map_frame, state='readonly', width=25)
-        self.cat_l3_combo.pack(fill=tk.X)
+            existing_suppliers = index_existing_suppliers(genpact_sm_df)
+            if existing_suppliers:
+                self.emit_log(f"Loaded {len(existing_suppliers)} existing suppliers", 'info')
+            else:
+                self.emit_log("No existing Genpact Supplier Master - will create new", 'info')
+        self.log_step_time("Step 4", step_started)
 
-        return tab
+        # STEP 5: Identify new vs existing
+        self.emit_log("Step 5: Identifying new vs existing suppliers...", 'info')
+        step_started = time.perf_counter()
 
-    def create_process_tab(self) -> ttk.Frame:
-    """Create the processing tab"""
-    tab = ttk.Frame(self.notebook, padding=10)
+        new_suppliers = []
+        existing_to_update = []
 
-    ttk.Label(tab, text="Run Processing", font=('Helvetica', 14, 'bold')).pack(anchor='w', pady=(0, 10))
+        for norm_name in normalized_suppliers.keys():
+            if not norm_name or not str(norm_name).strip():
+                continue
+            if str(norm_name).lower() in existing_suppliers:
+                existing_to_update.append(norm_name)
+            else:
+                new_suppliers.append(norm_name)
 
-    # Readiness status
-    self.readiness_label = ttk.Label(tab, text="Checking readiness...", foreground='orange')
-    self.readiness_label.pack(anchor='w', pady=(0, 10))
+        self.emit_log(f"New suppliers to add: {len(new_suppliers)}", 'info')
+        self.emit_log(f"Existing suppliers to update: {len(existing_to_update)}", 'update')
+        self.log_step_time("Step 5", step_started)
 
-    # Process button
-    self.process_btn = ttk.Button(tab, text="▶ Start Processing", command=self.start_processing)
-    self.process_btn.pack(fill=tk.X, pady=(0, 15), ipady=10)
+        # Build categories list - Updated for L1/L2/L3
+        step_started = time.perf_counter()
+        categories = build_category_list(self.categories_data, cat_l1_col, cat_l2_col, cat_l3_col)
+
+        taxonomy_hash = taxonomy_version(categories)
+        taxonomy_index = get_taxonomy_index(categories, cache_dir=str(DEFAULT_CACHE_PATH.parent))
+        self.emit_log(f"Taxonomy index ready: {len(taxonomy_index)} categories, "
+                      f"{len(taxonomy_index.postings)} tokens (version {taxonomy_hash})", 'info')
+        self.log_step_time("Category list", step_started)
+
+        # Checkpoint journal: one durable record per finished supplier
+        journal = SupplierJournal(str(journal_path_for(genpact_sm_path)),
+                                  run_key=f"{taxonomy_hash}:{model}", resume=config.resume)
+        if len(journal):
+            self.emit_log(f"Resuming: {len(journal)} suppliers restored from {journal.path.name}", 'success')
+        elif journal.discarded:
+            self.emit_log(f"Previous journal with {journal.discarded} suppliers not replayed "
+                          f"({'different taxonomy or model' if config.resume else 'resume not enabled'}); "
+                          f"kept as {journal.backup_path.name}", 'warning')
+
+        if config.use_enrichment_store and new_suppliers:
+            self.enrichment_store = open_enrichment_store(max_age_days=config.enrichment_max_age_days)
+            backend = ('ref.global_supplier_data_master' if isinstance(self.enrichment_store, PostgresEnrichmentStore)
+                       else self.enrichment_store.path.name)
+            max_age = config.enrichment_max_age_days
+            self.emit_log(f"Enrichment store: {backend} (reusing entries "
+                          f"{f'younger than {max_age:g} days' if max_age > 0 else 'of any age'})", 'info')
 
-    # Progress frame
-    progress_frame = ttk.LabelFrame(tab, text="Progress", padding=10)
-    progress_frame.pack(fill=tk.X, pady=(0, 10))
+        # STEP 6: Process NEW suppliers
+        self.emit_log("Step 6: Processing new suppliers...", 'info')
+        step_started = time.perf_counter()
 
-    self.progress_var = tk.DoubleVar(value=0)
-    self.progress_bar = ttk.Progressbar(progress_frame, variable=self.progress_var, maximum=100)
-    self.progress_bar.pack(fill=tk.X, pady=(0, 5))
+        new_rows = []
+        total_new = len(new_suppliers)
 
-    self.status_label = ttk.Label(progress_frame, text="Ready")
-    self.status_label.pack(anchor='w')
+        # Track flow statistics
+        description_flow_count = 0
+        po_line_flow_count = 0
 
-    # Log frame
-    log_frame = ttk.LabelFrame(tab, text="Processing Log", padding=10)
-    log_frame.pack(fill=tk.BOTH, expand=True)
+        def run_new_supplier(norm_name: str) -> Tuple[List[Dict], bool]:
+            rows, use_description_flow = self.process_new_supplier(
+                norm_name, normalized_suppliers[norm_name], categories, api_key, model, temperature,
+                use_grounding, rate_limiter, taxonomy_hash)
+            journal.record('new', norm_name, rows=rows, description_flow=use_description_flow)
+            return rows, use_description_flow
+
+        with LLMExecutor(max_workers=max_workers, bucket=rate_limiter) as executor:
+            futures = [
+                None if journal.completed('new', norm_name) else executor.submit(run_new_supplier, norm_name)
+                for norm_name in new_suppliers
+            ]
+            for idx, (norm_name, future) in enumerate(zip(new_suppliers, futures)):
+                self.emit_progress(0.30 + (idx / max(total_new, 1)) * 0.35,
+                                f"Processing new supplier {idx+1}/{total_new}: {norm_name[:30]}...")
+                if future is None:
+                    record = journal.completed('new', norm_name)
+                    rows, use_description_flow = record['rows'], record['description_flow']
+                else:
+                    rows, use_description_flow = future.result()
+                new_rows.extend(rows)
+                if use_description_flow:
+                    description_flow_count += 1
+                else:
+                    po_line_flow_count += 1
+                stats['new_suppliers'] += 1
 
-    self.log_text = scrolledtext.ScrolledText(log_frame, height=15, wrap=tk.WORD,
-                                             bg='#2c3e50', fg='#ecf0f1',
-                                             font=('Consolas', 10))
-    self.log_text.pack(fill=tk.BOTH, expand=True)
+        # Log flow statistics
+        self.emit_log(f"Flow summary: {description_flow_count} suppliers used DESCRIPTION flow, {po_line_flow_count} would use PO LINE flow", 'info')
+        self.log_step_time("Step 6", step_started)
 
-    # Configure log tags for colors
-    self.log_text.tag_configure('success', foreground='#27ae60')
-    self.log_text.tag_configure('error', foreground='#e74c3c')
-    self.log_text.tag_configure('warning', foreground='#f39c12')
-    self.log_text.tag_configure('grounding', foreground='#3498db')
-    self.log_text.tag_configure('update', foreground='#9b59b6')
-    self.log_text.tag_configure('info', foreground='#ecf0f1')
+        # STEP 7: Update EXISTING suppliers
+        self.emit_log("Step 7: Updating existing suppliers...", 'info')
+        step_started = time.perf_counter()
 
-    return tab
+        updated_rows = {}
+        total_existing = len(existing_to_update)
 
-def create_results_tab(self) -> ttk.Frame:
-    """Create the results tab"""
-    tab = ttk.Frame(self.notebook, padding=10)
+        def run_existing_supplier(norm_name: str) -> Dict:
+            row = self.update_existing_supplier(
+                norm_name, normalized_suppliers[norm_name], existing_suppliers[norm_name.lower()].copy(),
+                api_key, model, temperature, rate_limiter)
+            journal.record('update', norm_name, row=row)
+            return row
+
+        with LLMExecutor(max_workers=max_workers, bucket=rate_limiter) as executor:
+            futures = [
+                None if journal.completed('update', norm_name) else executor.submit(run_existing_supplier, norm_name)
+                for norm_name in existing_to_update
+            ]
+            for idx, (norm_name, future) in enumerate(zip(existing_to_update, futures)):
+                self.emit_progress(0.65 + (idx / max(total_existing, 1)) * 0.20,
+                                f"Updating {idx+1}/{total_existing}: {norm_name[:30]}...")
+                if future is None:
+                    updated_rows[norm_name.lower()] = journal.completed('update', norm_name)['row']
+                else:
+                    updated_rows[norm_name.lower()] = future.result()
+                stats['updated_suppliers'] += 1
+        self.log_step_time("Step 7", step_started)
 
-    ttk.Label(tab, text="Genpact Supplier Master", font=('Helvetica', 14, 'bold')).pack(anchor='w', pady=(0, 10))
+        # STEP 8: Build final DataFrame
+        self.emit_log("Step 8: Building and saving Genpact Supplier Master...", 'info')
+        self.emit_progress(0.90, "Saving Genpact Supplier Master...")
+        step_started = time.perf_counter()
 
-    # Stats frame
-    stats_frame = ttk.Frame(tab)
-    stats_frame.pack(fill=tk.X, pady=(0, 15))
+        final_rows = []
 
-    self.stat_labels = {}
-    for i, (key, label) in enumerate([('new', 'New'), ('updated', 'Updated'),
-                                      ('unchanged', 'Unchanged'), ('total', 'Total')]):
-        stat_box = ttk.Frame(stats_frame, relief='solid', borderwidth=1)
-        stat_box.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        if master_store is None:
+            for norm_name_lower, row_data in existing_suppliers.items():
+                if norm_name_lower not in updated_rows:
+                    final_rows.append(row_data)
+                    stats['unchanged_suppliers'] += 1
 
-        value_label = ttk.Label(stat_box, text="0", font=('Helvetica', 24, 'bold'))
-        value_label.pack(pady=(10, 0))
+        for row_data in updated_rows.values():
+            final_rows.append(row_data)
 
-        name_label = ttk.Label(stat_box, text=label, foreground='gray')
-        name_label.pack(pady=(0, 10))
+        final_rows.extend(new_rows)
 
-        self.stat_labels[key] = value_label
+        results_df = pd.DataFrame(final_rows)
 
-    # Results treeview
-    tree_frame = ttk.Frame(tab)
-    tree_frame.pack(fill=tk.BOTH, expand=True)
+        desired_columns = MASTER_COLUMNS
 
-    # Create treeview with scrollbars
-    self.results_tree = ttk.Treeview(tree_frame, show='headings')
+        for col in desired_columns:
+            if col not in results_df.columns:
+                results_df[col] = ''
 
-    y_scroll = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.results_tree.yview)
-    x_scroll = ttk.Scrollbar(tree_frame, orient=tk.HORIZONTAL, command=self.results_tree.xview)
-    self.results_tree.configure(yscrollcommand=y_scroll.set, xscrollcommand=x_scroll.set)
+        results_df = results_df[[c for c in desired_columns if c in results_df.columns]]
+        results_df = results_df.sort_values('Normalized_Supplier_Name', key=lambda x: x.astype(str)).reset_index(drop=True)
 
-    self.results_tree.grid(row=0, column=0, sticky='nsew')
-    y_scroll.grid(row=0, column=1, sticky='ns')
-    x_scroll.grid(row=1, column=0, sticky='ew')
+        if master_store is not None:
+            # Only new and updated suppliers are written; results_df holds just those rows
+            changed = defaultdict(list)
+            for row_data in final_rows:
+                changed[name_key(row_data['Normalized_Supplier_Name'])].append(row_data)
+            written = master_store.upsert_suppliers(changed)
+            stats['unchanged_suppliers'] = master_store.supplier_count() - len(changed)
+            stats['total_in_master'] = master_store.row_count()
+            master_store.close()
+            journal.finish()
+            self.emit_log(f"Upserted {len(changed)} suppliers ({written} rows) into {genpact_sm_path}", 'success')
+        else:
+            save_genpact_supplier_master(results_df, genpact_sm_path)
+            journal.finish()
+            self.emit_log(f"Saved Genpact Supplier Master to: {genpact_sm_path}", 'success')
 
-    tree_frame.columnconfigure(0, weight=1)
-    tree_frame.rowconfigure(0, weight=1)
+            stats['total_in_master'] = len(results_df)
+        self.log_step_time("Step 8", step_started)
 
-    # Export buttons
-    export_frame = ttk.Frame(tab)
-    export_frame.pack(fill=tk.X, pady=(10, 0))
+        self.emit_progress(1.0, "Processing complete!")
+        self.emit_log(f"Complete! New: {stats['new_suppliers']}, Updated: {stats['updated_suppliers']}, "
+                    f"Unchanged: {stats['unchanged_suppliers']}, Total: {stats['total_in_master']}", 'success')
+        cache = get_default_cache() if config.use_cache else None
+        if cache is not None:
+            self.emit_log(cache.summary())
+        memo = get_default_classification_memo() if config.use_cache else None
+        if memo is not None:
+            self.emit_log(memo.summary())
+        if self.enrichment_store is not None:
+            self.emit_log(f"Enrichment store: {self.enrichment_store.hits} reused, "
+                          f"{self.enrichment_store.misses} looked up via API")
+            self.enrichment_store.close()
+            self.enrichment_store = None
 
-    self.export_btn = ttk.Button(export_frame, text="💾 Export CSV", command=self.export_results,
-                                state='disabled')
-    self.export_btn.pack(side=tk.LEFT)
+        return results_df, stats
 
-    self.saved_path_label = ttk.Label(export_frame, text="", foreground='green')
-    self.saved_path_label.pack(side=tk.LEFT, padx=10)
+    def process_new_supplier(self, norm_name: str, supplier_data: Dict, categories: List[Dict],
+                             api_key: str, model: str, temperature: float, use_grounding: bool,
+                             rate_limiter: RateLimiter,
+                             taxonomy_hash: Optional[str] = None) -> Tuple[List[Dict], bool]:
+        """Enrich and classify one new supplier; returns (master rows, used description flow)"""
+        rows = []
 
-    return tab
+        # Assess PO line quality for this supplier
+        passing_items, failing_items, pass_rate = assess_supplier_po_quality(supplier_data['items'])
 
-def find_col_index(self, columns: list, keywords: list) -> int:
-    """Find column index matching keywords"""
-    for i, c in enumerate(columns):
-        if any(k in c.lower() for k in keywords):
-            return i
-    return 0
+        # Determine which classification flow to use
+        # If >50% fail quality check, use description-based flow
+        use_description_flow = pass_rate < 0.5
 
-def update_preview_tree(self, tree: ttk.Treeview, df: pd.DataFrame):
-    """Update a preview treeview with dataframe data"""
-    # Clear existing
-    tree.delete(*tree.get_children())
-    for col in tree['columns']:
-        tree.heading(col, text='')
-
-    # Set columns
-    columns = list(df.columns)
-    tree['columns'] = columns
-
-    for col in columns:
-        tree.heading(col, text=col)
-        tree.column(col, width=100, minwidth=50)
-
-    # Add rows (first 3)
-    for idx, row in df.head(3).iterrows():
-        values = [str(v)[:50] for v in row.values]
-        tree.insert('', tk.END, values=values)
-
-def load_file(self, file_type: str):
-    """Load a CSV file"""
-    file_path = filedialog.askopenfilename(
-        title=f"Open {file_type.upper()} CSV",
-        filetypes=[("CSV Files", "*.csv"), ("All Files", "*.*")]
-    )
+        if use_description_flow:
+            flow_reason = f"PO quality: {pass_rate:.0%} pass rate ({len(passing_items)}/{len(supplier_data['items'])} good lines)"
+            self.emit_log(f"📝 {norm_name}: Using DESCRIPTION flow - {flow_reason}", 'info')
+        else:
+            flow_reason = f"PO quality: {pass_rate:.0%} pass rate ({len(passing_items)}/{len(supplier_data['items'])} good lines)"
+            self.emit_log(f"📦 {norm_name}: Using PO LINE flow - {flow_reason}", 'info')
 
-    if not file_path:
-        return
+        # Enrich supplier (same for both flows)
+        use_cache = self.config.use_cache
+        enrichment = enrich_supplier(norm_name, api_key, model, temperature, use_grounding, rate_limiter,
+                                     store=self.enrichment_store, use_cache=use_cache,
+                                     log_callback=lambda msg: self.emit_log(msg, 'warning'))
 
-    try:
-        try:
-            df = pd.read_csv(file_path, encoding='utf-8')
-        except:
-            df = pd.read_csv(file_path, encoding='latin-1')
-
-        columns = df.columns.tolist()
-
-        if file_type == 'po':
-            self.po_data = df
-            self.po_file_path = file_path
-            self.po_status_label.configure(text=f"✓ {len(df)} rows loaded", foreground='green')
-            self.update_preview_tree(self.po_preview_tree, df)
-
-            # Update column combos
-            self.po_num_combo['values'] = columns
-            self.po_num_combo.current(self.find_col_index(columns,
-                                 ['supplier_number', 'supplier_num', 'vendor_number', 'vendor_id']))
-
-            self.po_name_combo['values'] = columns
-            self.po_name_combo.current(self.find_col_index(columns,
-                                  ['supplier_name', 'vendor_name', 'supplier']))
-
-            self.po_item_combo['values'] = columns
-            self.po_item_combo.current(self.find_col_index(columns,
-                                  ['item_desc', 'description', 'item']))
-
-            # Update output path
-            output_dir = os.path.dirname(file_path)
-            output_file = os.path.join(output_dir, "GenpactSupplierMaster.csv")
-            self.output_info_label.configure(text=f"Output: {output_file}")
-            self.update_output_status(output_file)
-
-        elif file_type == 'csm':
-            self.client_sm_data = df
-            self.csm_status_label.configure(text=f"✓ {len(df)} rows loaded", foreground='green')
-            self.update_preview_tree(self.csm_preview_tree, df)
-
-            self.csm_num_combo['values'] = columns
-            self.csm_num_combo.current(self.find_col_index(columns,
-                ['supplier_number', 'supplier_num', 'vendor_number']))
-
-            self.csm_country_combo['values'] = columns
-            self.csm_country_combo.current(self.find_col_index(columns,
-                ['country', 'country_code']))
-
-        elif file_type == 'cat':
-            self.categories_data = df
-            self.cat_status_label.configure(text=f"✓ {len(df)} categories loaded", foreground='green')
-            self.update_preview_tree(self.cat_preview_tree, df)
-
-            # Updated for L1/L2/L3 taxonomy
-            self.cat_l1_combo['values'] = columns
-            self.cat_l1_combo.current(self.find_col_index(columns,
-                ['genpact level 1', 'level 1', 'l1']))
-
-            self.cat_l2_combo['values'] = columns
-            self.cat_l2_combo.current(self.find_col_index(columns,
-                ['genpact level 2', 'level 2', 'l2', 'category_code', 'code']))
-
-            self.cat_l3_combo['values'] = columns
-            self.cat_l3_combo.current(self.find_col_index(columns,
-                ['genpact level 3', 'level 3', 'l3', 'category_name', 'name']))
+        if use_grounding and enrichment['description'] != 'Not available':
+            self.emit_log(f"Found {norm_name} via search", 'grounding')
 
-            self.update_readiness()
+        # Classification - currently both flows use description-based
+        # Phase 3 will implement the PO line flow alternative
+        if use_description_flow:
+            # ORIGINAL FLOW: Classify by supplier name + description
+            classification = classify_supplier(norm_name, enrichment['description'], categories,
+                                            api_key, model, temperature, rate_limiter, use_cache)
 
-    except Exception as e:
-        messagebox.showerror("Error", f"Failed to load file:\n{str(e)}")
+            product_tags = generate_supplier_product_tags(norm_name, supplier_data['items'],
+                                                        api_key, model, temperature, rate_limiter, use_cache)
 
-def update_output_status(self, file_path: str):
-    """Update output file status"""
-    if os.path.exists(file_path):
-        file_size = os.path.getsize(file_path)
-        self.output_status_label.configure(text=f"✓ File exists ({file_size} bytes)", foreground='green')
-        self.delete_btn.configure(state='normal')
-        self.output_path_label.configure(text=file_path)
-    else:
-        self.output_status_label.configure(text="File will be created", foreground='gray')
-        self.delete_btn.configure(state='disabled')
-        self.output_path_label.configure(text=file_path)
+            country_names = []
+            country_codes = []
+            for country in supplier_data['countries']:
+                name, code = normalize_country(country)
+                if name != 'Unknown':
+                    country_names.append(name)
+                    country_codes.append(code)
+
+            rows.append({
+                'Normalized_Supplier_Name': norm_name,
+                'Original_Name_Variants': '; '.join(supplier_data['original_names']),
+                'Supplier_Description': enrichment['description'],
+                'Employee_Count': enrichment['employee_count'],
+                'Revenue': enrichment['revenue'],
+                'Year_Established': enrichment['year_established'],
+                'Overall_Category': classification['l1'],
+                'Category_Code': classification['category_code'],
+                'Category_Name': classification['category_name'],
+                'Category_Confidence': f"{classification['confidence']:.0%}",
+                'L3_Token_Probability': f"{classification.get('l3_token_probability', 0.0):.0%}",
+                'Confidence_Reasoning': classification.get('confidence_reasoning', ''),
+                'Product_Service_Tags': ', '.join(product_tags) if product_tags else '',
+                'Total_PO_Items': len(supplier_data['items']),
+                'Ship_To_Countries': ', '.join(country_names) if country_names else 'Unknown',
+                'Country_Codes': ', '.join(country_codes) if country_codes else 'XX',
+                'Last_Updated': datetime.now().strftime('%Y-%m-%d')
+            })
 
-def delete_output_file(self):
-    """Delete the output file"""
-    if not self.po_file_path:
-        return
+            self.emit_log(f"✓ NEW: {norm_name} -> {classification['l1']} / {classification['category_code']}", 'success')
+        else:
+            # PO LINE FLOW: Hybrid approach
+            # Step 1: Classify each PO line individually
+            # Step 2: Consolidate low-confidence items into better-fitting categories
 
-    output_file = os.path.join(os.path.dirname(self.po_file_path), "GenpactSupplierMaster.csv")
+            self.emit_log(f"  Step 1: Classifying {len(passing_items)} PO lines individually for {norm_name}...", 'info')
 
-    if os.path.exists(output_file):
-        if messagebox.askyesno("Confirm Delete", f"Delete {output_file}?"):
-            try:
-                os.remove(output_file)
-                self.update_output_status(output_file)
-                messagebox.showinfo("Success", "File deleted. Will create new on next run.")
-            except Exception as e:
-                messagebox.showerror("Error", f"Could not delete: {e}")
-
-def update_readiness(self):
-    """Update the readiness status"""
-    missing = []
-
-    if not self.api_key_var.get():
-        missing.append("API Key")
-    if self.po_data is None:
-        missing.append("PO File")
-    # Client SM is optional - only used for country lookup
-    if self.categories_data is None:
-        missing.append("Taxonomy")
-
-    if missing:
-        self.readiness_label.configure(text=f"❌ Missing: {', '.join(missing)}", foreground='red')
-        self.process_btn.configure(state='disabled')
-    else:
-        self.readiness_label.configure(text="✓ Ready to process", foreground='green')
-        self.process_btn.configure(state='normal' if not self.processing else 'disabled')
+            # Step 1: Classify each passing PO line individually
+            classified_lines = classify_po_lines_individually(
+                po_line_descriptions=passing_items,
+                supplier_name=norm_name,
+                categories=categories,
+                api_key=api_key,
+                model=model,
+                temperature=temperature,
+                rate_limiter=rate_limiter,
+                log_callback=lambda msg: self.emit_log(msg, 'info'),
+                taxonomy_hash=taxonomy_hash,
+                use_cache=use_cache
+            )
 
-def test_api(self):
-    """Test the API connection"""
-    api_key = self.api_key_var.get()
-    if not api_key:
-        messagebox.showwarning("Warning", "Please enter an API key")
-        return
+            # Count initial categories
+            initial_categories = set([(l['l1'], l['l2'], l['l3']) for l in classified_lines])
+            low_conf_count = sum(1 for l in classified_lines if l['confidence'] < 0.6)
+            self.emit_log(f"    Initial: {len(initial_categories)} categories, {low_conf_count} low-confidence items", 'info')
 
-    self.test_btn.configure(state='disabled', text="Testing...")
-    self.root.update()
+            # Step 2: Consolidate low-confidence classifications
+            self.emit_log("  Step 2: Consolidating low-confidence classifications...", 'info')
 
-    try:
-        model = self.model_var.get()
-        result = call_gemini_sync(model, api_key, "Test.", 'Return: {"status": "ok"}', 0.2, False)
+            category_groups = consolidate_classifications(
+                classified_lines=classified_lines,
+                supplier_name=norm_name,
+                api_key=api_key,
+                model=model,
+                temperature=temperature,
+                rate_limiter=rate_limiter,
+                confidence_threshold=0.6,
+                use_cache=use_cache
+            )
 
-        if result and result.get('status') == 'ok':
-            messagebox.showinfo("Success", "API connection successful!")
-        else:
-            messagebox.showwarning("Warning", f"API responded but unexpected result: {result}")
-    except Exception as e:
-        messagebox.showerror("Error", f"API test failed:\n{str(e)[:200]}")
-    finally:
-        self.test_btn.configure(state='normal', text="Test API Connection")
-        self.update_readiness()
-
-def log_message(self, message: str, msg_type: str = 'info'):
-    """Add a log message"""
-    timestamp = datetime.now().strftime('%H:%M:%S')
-    self.log_text.insert(tk.END, f"[{timestamp}] {message}\n", msg_type)
-    self.log_text.see(tk.END)
-
-def process_queue(self):
-    """Process messages from the worker thread"""
-    try:
-        while True:
-            msg = self.message_queue.get_nowait()
-            msg_type = msg.get('type')
-
-            if msg_type == 'progress':
-                self.progress_var.set(msg['value'] * 100)
-                self.status_label.configure(text=msg['status'])
-            elif msg_type == 'log':
-                self.log_message(msg['message'], msg['level'])
-            elif msg_type == 'complete':
-                self.on_processing_complete(msg['results'], msg['stats'])
-            elif msg_type == 'error':
-                self.on_processing_error(msg['error'])
+            self.emit_log(f"  Final: {len(category_groups)} category groupings for {norm_name}", 'info')
 
-    except queue.Empty:
-        pass
+            # Prepare country data (same for all rows of this supplier)
+            country_names = []
+            country_codes = []
+            for country in supplier_data['countries']:
+                name, code = normalize_country(country)
+                if name != 'Unknown':
+                    country_names.append(name)
+                    country_codes.append(code)
 
-    # Schedule next check
-    self.root.after(100, self.process_queue)
+            # Create one row per category group
+            for cat_group in category_groups:
+                l1_category = cat_group['l1']
+                l2_code = cat_group['l2']
+                l3_name = cat_group['l3']
+                confidence = cat_group['confidence']
+                group_po_lines = cat_group['po_lines']
 
-def start_processing(self):
-    """Start the processing in a background thread"""
-    if self.processing:
-        return
+                # Generate product tags only from this group's PO lines
+                group_tags = generate_supplier_product_tags(
+                    norm_name,
+                    group_po_lines,
+                    api_key, model, temperature, rate_limiter, use_cache
+                )
 
-    # Collect column mappings
-    self.po_columns = {
-        'supplier_number': self.po_num_combo.get(),
-        'supplier_name': self.po_name_combo.get(),
-        'item_description': self.po_item_combo.get()
-    }
+                rows.append({
+                    'Normalized_Supplier_Name': norm_name,
+                    'Original_Name_Variants': '; '.join(supplier_data['original_names']),
+                    'Supplier_Description': enrichment['description'],
+                    'Employee_Count': enrichment['employee_count'],
+                    'Revenue': enrichment['revenue'],
+                    'Year_Established': enrichment['year_established'],
+                    'Overall_Category': l1_category,
+                    'Category_Code': l2_code,
+                    'Category_Name': l3_name,
+                    'Category_Confidence': f"{confidence:.0%}",
+                    'L3_Token_Probability': f"{cat_group.get('l3_token_probability', 0.0):.0%}",
+                    'Confidence_Reasoning': cat_group.get('confidence_reasoning', ''),
+                    'Product_Service_Tags': ', '.join(group_tags) if group_tags else '',
+                    'Total_PO_Items': len(group_po_lines),
+                    'Ship_To_Countries': ', '.join(country_names) if country_names else 'Unknown',
+                    'Country_Codes': ', '.join(country_codes) if country_codes else 'XX',
+                    'Last_Updated': datetime.now().strftime('%Y-%m-%d')
+                })
 
-    self.client_sm_columns = {
-        'supplier_number': self.csm_num_combo.get(),
-        'country': self.csm_country_combo.get()
-    }
+                self.emit_log(f"  ✓ NEW ROW: {norm_name} -> {l1_category} / {l2_code} / {l3_name} ({len(group_po_lines)} items, {confidence:.0%} conf)", 'success')
 
-    # Updated for L1/L2/L3 taxonomy
-    self.category_columns = {
-        'l1': self.cat_l1_combo.get(),
-        'l2': self.cat_l2_combo.get(),
-        'l3': self.cat_l3_combo.get()
-    }
+            self.emit_log(f"✓ NEW: {norm_name} -> {len(category_groups)} category rows created", 'success')
 
-    # Clear log
-    self.log_text.delete(1.0, tk.END)
-    self.progress_var.set(0)
-    self.status_label.configure(text="Starting...")
+        return rows, use_description_flow
 
-    # Start processing thread
-    self.processing = True
-    self.process_btn.configure(state='disabled', text="Processing...")
+    def update_existing_supplier(self, norm_name: str, supplier_data: Dict, existing_row: Dict,
+                                 api_key: str, model: str, temperature: float,
+                                 rate_limiter: RateLimiter) -> Dict:
+        """Merge new PO data (tags, countries, counts, name variants) into an existing master row"""
+        new_tags = generate_supplier_product_tags(norm_name, supplier_data['items'],
+                                                api_key, model, temperature, rate_limiter,
+                                                self.config.use_cache)
 
-    thread = threading.Thread(target=self.run_processing, daemon=True)
-    thread.start()
+        existing_tags = existing_row.get('Product_Service_Tags', '')
+        merged_tags = merge_tags(existing_tags, new_tags)
 
-def run_processing(self):
-    """Run the processing in background thread"""
-    try:
-        output_dir = os.path.dirname(self.po_file_path)
-        genpact_sm_path = os.path.join(output_dir, "GenpactSupplierMaster.csv")
+        new_country_names = []
+        new_country_codes = []
+        for country in supplier_data['countries']:
+            name, code = normalize_country(country)
+            if name != 'Unknown':
+                new_country_names.append(name)
+                new_country_codes.append(code)
 
-        results_df, stats = self.process_all_data(
-            genpact_sm_path=genpact_sm_path,
-            api_key=self.api_key_var.get(),
-            model=self.model_var.get(),
-            temperature=self.temp_var.get(),
-            use_grounding=self.grounding_var.get(),
-            rpm_limit=self.rpm_var.get()
-        )
+        merged_countries = merge_locations(existing_row.get('Ship_To_Countries', ''), new_country_names)
+        merged_codes = merge_locations(existing_row.get('Country_Codes', ''), new_country_codes)
 
-        self.message_queue.put({
-            'type': 'complete',
-            'results': results_df,
-            'stats': stats
-        })
+        existing_row['Product_Service_Tags'] = merged_tags
+        existing_row['Ship_To_Countries'] = merged_countries
+        existing_row['Country_Codes'] = merged_codes
 
-    except Exception as e:
-        self.message_queue.put({
-            'type': 'error',
-            'error': str(e)
-        })
+        try:
+            existing_count = int(float(str(existing_row.get('Total_PO_Items', 0) or 0).replace(',', '')))
+        except (ValueError, TypeError):
+            existing_count = 0
+        existing_row['Total_PO_Items'] = existing_count + len(supplier_data['items'])
 
-def emit_progress(self, progress: float, status: str):
-    """Emit progress update to main thread"""
-    self.message_queue.put({
-        'type': 'progress',
-        'value': progress,
-        'status': status
-    })
-
-def emit_log(self, message: str, level: str = 'info'):
-    """Emit log message to main thread"""
-    self.message_queue.put({
-        'type': 'log',
-        'message': message,
-        'level': level
-    })
-
-def normalize_supplier_names(self, supplier_names: List[str], rate_limiter: RateLimiter) -> Dict[str, str]:
-    """Normalize supplier names using hybrid approach"""
-    if not supplier_names:
-        return {}
+        existing_row['Last_Updated'] = datetime.now().strftime('%Y-%m-%d')
 
-    unique_names = list(set([str(n).strip() for n in supplier_names if n and str(n).strip()]))
+        existing_variants = str(existing_row.get('Original_Name_Variants', '')).split('; ')
+        new_variants = supplier_data['original_names'] - set(existing_variants)
+        if new_variants:
+            all_variants = set(existing_variants) | supplier_data['original_names']
+            existing_row['Original_Name_Variants'] = '; '.join([v for v in all_variants if v])
 
-    if len(unique_names) == 0:
-        return {}
 
-    if len(unique_names) == 1:
-        return {unique_names[0]: unique_names[0]}
+        self.emit_log(f"✓ UPDATED: {norm_name} (+{len(new_tags)} tags)", 'update')
+        return existing_row
 
-    self.emit_log(f"Clustering {len(unique_names)} unique supplier names...", 'info')
-    self.emit_progress(0.1, "Pre-clustering supplier names algorithmically...")
 
-    clusters = cluster_suppliers_algorithmic(unique_names, threshold=0.65)
+###########
+# Results Paging
+###########
+RESULTS_PAGE_SIZE = 200
+RESULTS_CELL_WIDTH = 100
+RESULTS_SEARCH_COLUMNS = ['Normalized_Supplier_Name', 'Overall_Category', 'Category_Code', 'Category_Name']
 
-    confirmed_clusters = []
-    ambiguous_clusters = []
-    singleton_names = []
 
-    for cluster in clusters:
-        if len(cluster) == 1:
-            singleton_names.append(cluster[0])
-        elif len(cluster) > 1:
-            scores = []
-            for i, n1 in enumerate(cluster):
-                for n2 in cluster[i+1:]:
-                    scores.append(company_similarity(n1, n2))
-            avg_score = sum(scores) / len(scores) if scores else 0
+class ResultsPager:
+    """
+    Page-at-a-time view over a results DataFrame (no Tk dependency).
 
-            if avg_score >= 0.85:
-                confirmed_clusters.append(cluster)
-            else:
-                ambiguous_clusters.append(cluster)
+    Search text is built once per DataFrame from the normalized name and
+    category columns, lower-cased, so filtering is a vectorized substring scan.
+    A query that extends the previous one only rescans the previous matches.
+    Cells are converted to text only for the page being shown.
+    """
 
-    self.emit_log(f"Pre-clustering: {len(confirmed_clusters)} confirmed, {len(ambiguous_clusters)} ambiguous, {len(singleton_names)} singletons", 'info')
+    def __init__(self, df: pd.DataFrame, page_size: int = RESULTS_PAGE_SIZE):
+        self.df = df.reset_index(drop=True)
+        self.page_size = page_size
+        self.columns = list(self.df.columns)
+        search_cols = [col for col in RESULTS_SEARCH_COLUMNS if col in self.df.columns]
+        if search_cols:
+            haystack = self.df[search_cols[0]].fillna('').astype(str)
+            for col in search_cols[1:]:
+                haystack = haystack + '\x1f' + self.df[col].fillna('').astype(str)
+            self._haystack = haystack.str.lower()
+        else:
+            self._haystack = pd.Series([''] * len(self.df), dtype=object)
+        self.query = ''
+        self.matches = self.df.index
+        self.page = 0
+
+    def set_query(self, query: str) -> int:
+        """Filter to rows containing every word of query; returns the match count."""
+        query = ' '.join(str(query or '').lower().split())
+        if query == self.query:
+            return len(self.matches)
+        if not query:
+            self.matches = self.df.index
+        else:
+            # Narrowing the previous query can only drop rows
+            base = self.matches if self.query and query.startswith(self.query) else self.df.index
+            candidates = self._haystack.loc[base]
+            mask = pd.Series(True, index=candidates.index)
+            for word in query.split():
+                mask &= candidates.str.contains(word, regex=False)
+            self.matches = candidates.index[mask.to_numpy()]
+        self.query = query
+        self.page = 0
+        return len(self.matches)
+
+    @property
+    def page_count(self) -> int:
+        return max(1, -(-len(self.matches) // self.page_size))
+
+    def go_to(self, page: int) -> int:
+        self.page = min(max(page, 0), self.page_count - 1)
+        return self.page
+
+    def page_rows(self) -> List[List[str]]:
+        """Display values for the current page (missing cells blank, long cells cut)."""
+        start = self.page * self.page_size
+        window = self.df.loc[self.matches[start:start + self.page_size]]
+        return [
+            ['' if pd.isna(v) else str(v)[:RESULTS_CELL_WIDTH] for v in row]
+            for row in window.itertuples(index=False, name=None)
+        ]
 
-    for cluster in confirmed_clusters[:5]:
-        self.emit_log(f"Auto-grouped: {cluster}", 'success')
 
-    name_map = {}
+###########
+# Main Application Class
+###########
+# Lines kept in the on-screen log (oldest dropped first); the log file keeps everything
+LOG_VIEW_MAX_LINES = 5000
+# Worker messages handled per UI tick
+QUEUE_DRAIN_MAX = 5000
+LOG_DIR = Path(__file__).resolve().parent / "logs"
 
-    for cluster in confirmed_clusters:
-        canonical = pick_canonical_name(cluster)
-        for name in cluster:
-            name_map[name] = canonical
-        if len(cluster) > 1:
-            self.emit_log(f"Canonical selected: '{canonical}' from {cluster}", 'success')
 
-    for name in singleton_names:
-        name_map[name] = name
+class SupplierMasterApp:
+    """Main Tkinter Application"""
+    
+    def __init__(self, root):
+        self.root = root
+        self.root.title(f"Supplier Master Generator v{APP_VERSION}")
+        self.root.geometry("1300x850")
+        self.root.minsize(1100, 700)
+        
+        # Data storage
+        self.po_data = None
+        self.client_sm_data = None
+        self.categories_data = None
+        self.results_data = None
+        self.po_file_path = ""
+        
+        # Column mappings
+        self.po_columns = {}
+        self.client_sm_columns = {}
+        self.category_columns = {}
+        
+        # Stats
+        self.stats = {
+            'new_suppliers': 0,
+            'updated_suppliers': 0,
+            'unchanged_suppliers': 0,
+            'total_in_master': 0
+        }
+        
+        # Processing state
+        self.processing = False
+        self.message_queue = queue.Queue()
+        self.log_file = None
+        self.log_file_lock = threading.Lock()
+        
+        # Variables for form inputs
+        self.api_key_var = tk.StringVar()
+        self.model_var = tk.StringVar(value="gemini-2.0-flash")
+        self.rpm_var = tk.IntVar(value=30)
+        self.workers_var = tk.IntVar(value=4)
+        self.temp_var = tk.DoubleVar(value=0.2)
+        self.grounding_var = tk.BooleanVar(value=True)
+        self.cache_var = tk.BooleanVar(value=True)
+        self.resume_var = tk.BooleanVar(value=False)
+        
+        # Setup UI
+        self.setup_ui()
+        
+        # Start message queue processor
+        self.process_queue()
+    
+    def setup_ui(self):
+        """Setup the main UI"""
+        # Create main paned window (horizontal split)
+        self.main_paned = ttk.PanedWindow(self.root, orient=tk.HORIZONTAL)
+        self.main_paned.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        
+        # Sidebar (Settings)
+        self.sidebar = self.create_sidebar()
+        self.main_paned.add(self.sidebar, weight=0)
+        
+        # Main content area
+        self.main_content = self.create_main_content()
+        self.main_paned.add(self.main_content, weight=1)
+    
+    def create_sidebar(self) -> 'ttk.Frame':
+        """Create the sidebar with settings"""
+        sidebar = ttk.Frame(self.main_paned, width=300)
+        sidebar.pack_propagate(False)
+        
+        # Header
+        header = ttk.Label(sidebar, text="Settings", font=('Helvetica', 14, 'bold'))
+        header.pack(pady=(10, 15), padx=10, anchor='w')
+        
+        # API Settings Frame
+        api_frame = ttk.LabelFrame(sidebar, text="API Configuration", padding=10)
+        api_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        # API Key
+        ttk.Label(api_frame, text="API Key:").pack(anchor='w')
+        self.api_key_entry = ttk.Entry(api_frame, textvariable=self.api_key_var, show='*', width=30)
+        self.api_key_entry.pack(fill=tk.X, pady=(0, 10))
+        
+        # Model
+        ttk.Label(api_frame, text="Model:").pack(anchor='w')
+        model_combo = ttk.Combobox(api_frame, textvariable=self.model_var,
+                                  values=["gemini-2.0-flash", "gemini-1.5-flash", "gemini-1.5-pro"],
+                                  state='readonly', width=28)
+        model_combo.pack(fill=tk.X, pady=(0, 10))
+        
+        # RPM and Temperature in a row
+        rpm_temp_frame = ttk.Frame(api_frame)
+        rpm_temp_frame.pack(fill=tk.X, pady=(0, 10))
+        
+        ttk.Label(rpm_temp_frame, text="RPM:").pack(side=tk.LEFT)
+        rpm_spin = ttk.Spinbox(rpm_temp_frame, from_=1, to=100, textvariable=self.rpm_var, width=5)
+        rpm_spin.pack(side=tk.LEFT, padx=(5, 15))
+        
+        ttk.Label(rpm_temp_frame, text="Temp:").pack(side=tk.LEFT)
+        temp_spin = ttk.Spinbox(rpm_temp_frame, from_=0.0, to=1.0, increment=0.1,
+                               textvariable=self.temp_var, width=5, format="%.1f")
+        temp_spin.pack(side=tk.LEFT, padx=5)
+        
+        # Concurrent requests
+        workers_frame = ttk.Frame(api_frame)
+        workers_frame.pack(fill=tk.X, pady=(0, 10))
+        
+        ttk.Label(workers_frame, text="Parallel requests:").pack(side=tk.LEFT)
+        workers_spin = ttk.Spinbox(workers_frame, from_=1, to=16, textvariable=self.workers_var, width=5)
+        workers_spin.pack(side=tk.LEFT, padx=5)
+        
+        # Grounding checkbox
+        grounding_check = ttk.Checkbutton(api_frame, text="Enable Google Search Grounding",
+                                         variable=self.grounding_var)
+        grounding_check.pack(anchor='w')
+        
+        # Response cache checkbox
+        cache_check = ttk.Checkbutton(api_frame, text="Reuse cached API responses",
+                                     variable=self.cache_var)
+        cache_check.pack(anchor='w')
+        
+        # Test API Button
+        self.test_btn = ttk.Button(sidebar, text="Test API Connection", command=self.test_api)
+        self.test_btn.pack(fill=tk.X, padx=10, pady=10)
+        
+        # Output File Frame
+        output_frame = ttk.LabelFrame(sidebar, text="Output File", padding=10)
+        output_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        self.output_path_label = ttk.Label(output_frame, text="Auto-save to input directory",
+                                          wraplength=250)
+        self.output_path_label.pack(anchor='w')
+        
+        self.output_status_label = ttk.Label(output_frame, text="No output file yet",
+                                            foreground='gray')
+        self.output_status_label.pack(anchor='w', pady=(5, 0))
+        
+        self.delete_btn = ttk.Button(output_frame, text="Reset/Delete Output File",
+                                    command=self.delete_output_file, state='disabled')
+        self.delete_btn.pack(fill=tk.X, pady=(10, 0))
+        
+        # Resume from checkpoint journal
+        resume_check = ttk.Checkbutton(output_frame, text="Resume interrupted run",
+                                      variable=self.resume_var)
+        resume_check.pack(anchor='w', pady=(5, 0))
+        
+        # Spacer
+        ttk.Frame(sidebar).pack(fill=tk.BOTH, expand=True)
+        
+        # Version info
+        version_label = ttk.Label(sidebar, text=f"Build: {APP_BUILD}\nPO line classification flow",
+                                 foreground='gray', font=('Helvetica', 9))
+        version_label.pack(pady=10, padx=10, anchor='w')
+        
+        return sidebar
+    
+    def create_main_content(self) -> 'ttk.Frame':
+        """Create the main content area with tabs"""
+        main_frame = ttk.Frame(self.main_paned)
+        
+        # Header
+        header_frame = ttk.Frame(main_frame)
+        header_frame.pack(fill=tk.X, padx=10, pady=(10, 5))
+        
+        title_label = ttk.Label(header_frame, text="Supplier Master Generator",
+                               font=('Helvetica', 18, 'bold'))
+        title_label.pack(side=tk.LEFT)
+        
+        # Version badge (using a label with background)
+        version_frame = tk.Frame(header_frame, bg='#27ae60', padx=8, pady=2)
+        version_frame.pack(side=tk.LEFT, padx=10)
+        tk.Label(version_frame, text=f"v{APP_VERSION}", bg='#27ae60', fg='white',
+                font=('Helvetica', 10)).pack()
+        
+        # Description
+        desc_label = ttk.Label(main_frame,
+                              text="AI-powered Genpact Supplier Master maintenance with automatic incremental updates.",
+                              foreground='gray')
+        desc_label.pack(anchor='w', padx=10, pady=(0, 10))
+        
+        # Feature highlight box
+        feature_frame = tk.Frame(main_frame, bg='#e8f8f5', padx=15, pady=10)
+        feature_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
+        
+        # Left border effect
+        border = tk.Frame(feature_frame, bg='#27ae60', width=4)
+        border.pack(side=tk.LEFT, fill=tk.Y, padx=(0, 10))
+        
+        feature_text = tk.Label(feature_frame, bg='#e8f8f5', justify=tk.LEFT,
+                               text="Inputs: PO File + Taxonomy (L1/L2/L3) + Client Supplier Master (optional)\n"
+                                    "Output: Automatically updates GenpactSupplierMaster.csv (adds new, updates existing)")
+        feature_text.pack(side=tk.LEFT, anchor='w')
+        
+        # Tab notebook
+        self.notebook = ttk.Notebook(main_frame)
+        self.notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        
+        # Create tabs
+        self.upload_tab = self.create_upload_tab()
+        self.notebook.add(self.upload_tab, text="📁 Upload Inputs")
+        
+        self.mapping_tab = self.create_mapping_tab()
+        self.notebook.add(self.mapping_tab, text="🔧 Column Mapping")
 
-    # Process ambiguous clusters with LLM
-    if ambiguous_clusters:
-        self.emit_progress(0.4, f"LLM confirming {len(ambiguous_clusters)} ambiguous clusters...")
-        self.emit_log(f"Sending {len(ambiguous_clusters)} ambiguous clusters to LLM for confirmation...", 'info')
+        self.process_tab = self.create_process_tab()
+        self.notebook.add(self.process_tab, text="⚙️ Process")
 
-        system_prompt = """You are a supplier data expert. For each cluster of company names, determine:
-1. Are these names referring to the SAME company? (Yes/No)
-2. If Yes, what is the best canonical name?
+        self.results_tab = self.create_results_tab()
+        self.notebook.add(self.results_tab, text="📊 Results")
 
-Return ONLY valid JSON."""
+        return main_frame
 
-        batch_size = 10
-        for batch_idx in range(0, len(ambiguous_clusters), batch_size):
-            batch = ambiguous_clusters[batch_idx:batch_idx + batch_size]
+    def create_upload_tab(self) -> 'ttk.Frame':
+        """Create the file upload tab"""
+        tab = ttk.Frame(self.notebook, padding=10)
 
-            clusters_for_llm = [{"cluster_id": idx, "names": cluster} for idx, cluster in enumerate(batch)]
+        # Header
+        ttk.Label(tab, text="Upload Input Files", font=('Helvetica', 14, 'bold')).pack(anchor='w', pady=(0, 10))
 
-            user_prompt = f"""Analyze these {len(batch)} clusters:
+        # Files frame (3 columns) - use pack with side=LEFT for horizontal layout
+        files_frame = ttk.Frame(tab)
+        files_frame.pack(fill=tk.X, expand=False, pady=(0, 10))
 
-{json.dumps(clusters_for_llm, indent=2)}
+        # PO File
+        po_frame = ttk.LabelFrame(files_frame, text="1️⃣ PO File", padding=10)
+        po_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 5))
 
-Return JSON:
-{{
-    "results": [
-        {{"cluster_id": 0, "same_company": true, "canonical_name": "Best Name Inc"}},
-        {{"cluster_id": 1, "same_company": false, "reason": "Different companies"}}
-    ]
-}}"""
+        ttk.Label(po_frame, text="Supplier Number, Supplier Name, Item Description",
+                 foreground='gray', font=('Helvetica', 9)).pack(anchor='w')
 
-                rate_limiter.wait_if_needed()
+        ttk.Button(po_frame, text="Browse PO CSV...",
+                  command=lambda: self.load_file('po')).pack(fill=tk.X, pady=(10, 5))
 
-                try:
-                    result = call_gemini_sync(
-                        model=self.model_var.get(),
-                        api_key=self.api_key_var.get(),
-                        system_text=system_prompt,
-                        user_text=user_prompt,
-                        temperature=self.temp_var.get(),
-                        use_grounding=False
-                    )
+        self.po_status_label = ttk.Label(po_frame, text="No file loaded", foreground='gray')
+        self.po_status_label.pack(anchor='w')
 
-                    if result and isinstance(result, dict) and 'results' in result:
-                        for item in result['results']:
-                            if not isinstance(item, dict):
-                                continue
-                            cluster_id = item.get('cluster_id', -1)
-                            if cluster_id < 0 or cluster_id >= len(batch):
-                                continue
+        # PO Preview - fixed height
+        self.po_preview_tree = self.create_preview_tree(po_frame)
 
-                            cluster = batch[cluster_id]
+        # Client SM File
+        csm_frame = ttk.LabelFrame(files_frame, text="2️⃣ Client Supplier Master (Optional)", padding=10)
+        csm_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5)
 
-                            if item.get('same_company', False):
-                                canonical = pick_canonical_name(cluster)
-                                for name in cluster:
-                                    name_map[name] = canonical
-                                self.emit_log(f"LLM confirmed: {cluster} -> {canonical}", 'success')
-                            else:
-                                for name in cluster:
-                                    name_map[name] = name
-                                self.emit_log(f"↔ LLM separated: {cluster}", 'info')
-                    else:
-                        for cluster in batch:
-                            canonical = pick_canonical_name(cluster)
-                            for name in cluster:
-                                name_map[name] = canonical
+        ttk.Label(csm_frame, text="Supplier Number, Country",
+                 foreground='gray', font=('Helvetica', 9)).pack(anchor='w')
 
-                except Exception as e:
-                    self.emit_log(f"LLM confirmation error: {str(e)}", 'warning')
-                    for cluster in batch:
-                        canonical = pick_canonical_name(cluster)
-                        for name in cluster:
-                            name_map[name] = canonical
+        ttk.Button(csm_frame, text="Browse Client SM CSV...",
+                  command=lambda: self.load_file('csm')).pack(fill=tk.X, pady=(10, 5))
 
-                progress = 0.4 + ((batch_idx + batch_size) / len(ambiguous_clusters)) * 0.5
-                self.emit_progress(min(progress, 0.9), f"LLM confirming clusters... ({min(batch_idx + batch_size, len(ambiguous_clusters))}/{len(ambiguous_clusters)})")
+        self.csm_status_label = ttk.Label(csm_frame, text="No file loaded", foreground='gray')
+        self.csm_status_label.pack(anchor='w')
 
-        for name in unique_names:
-            if name not in name_map:
-                name_map[name] = name
+        # CSM Preview - fixed height
+        self.csm_preview_tree = self.create_preview_tree(csm_frame)
 
-        unique_canonical = set(name_map.values())
-        dedup_count = len(unique_names) - len(unique_canonical)
+        # Categories File
+        cat_frame = ttk.LabelFrame(files_frame, text="3️⃣ Taxonomy", padding=10)
+        cat_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(5, 0))
 
-        if dedup_count > 0:
-            self.emit_log(f"Deduplicated {len(unique_names)} names -> {len(unique_canonical)} unique suppliers ({dedup_count} duplicates merged)", 'success')
-        else:
-            self.emit_log(f"All {len(unique_names)} supplier names are unique", 'info')
+        ttk.Label(cat_frame, text="Genpact Level 1, Level 2, Level 3",
+                 foreground='gray', font=('Helvetica', 9)).pack(anchor='w')
 
-        return name_map
+        ttk.Button(cat_frame, text="Browse Categories CSV...",
+                  command=lambda: self.load_file('cat')).pack(fill=tk.X, pady=(10, 5))
 
-    def process_all_data(self, genpact_sm_path: str, api_key: str, model: str,
-                        temperature: float, use_grounding: bool, rpm_limit: int) -> Tuple[pd.DataFrame, dict]:
-        """Main processing orchestrator"""
-        rate_limiter = RateLimiter(max_rpm=rpm_limit)
-        stats = {'new_suppliers': 0, 'updated_suppliers': 0, 'unchanged_suppliers': 0, 'total_in_master': 0}
+        self.cat_status_label = ttk.Label(cat_frame, text="No file loaded", foreground='gray')
+        self.cat_status_label.pack(anchor='w')
 
-        po_supplier_num_col = self.po_columns.get('supplier_number')
-        po_supplier_name_col = self.po_columns.get('supplier_name')
-        po_item_col = self.po_columns.get('item_description')
+        # Taxonomy Preview - fixed height
+        self.cat_preview_tree = self.create_preview_tree(cat_frame)
 
-        csm_supplier_num_col = self.client_sm_columns.get('supplier_number')
-        csm_country_col = self.client_sm_columns.get('country')
+        # Output info box
+        output_frame = tk.Frame(tab, bg='#fef9e7', padx=15, pady=10)
+        output_frame.pack(fill=tk.X, pady=(10, 0), side=tk.BOTTOM)
 
-        # Updated for L1/L2/L3 taxonomy
-        cat_l1_col = self.category_columns.get('l1')
-        cat_l2_col = self.category_columns.get('l2')
-        cat_l3_col = self.category_columns.get('l3')
+        border = tk.Frame(output_frame, bg='#f39c12', width=4)
+        border.pack(side=tk.LEFT, fill=tk.Y, padx=(0, 10))
 
-        # STEP 1: Build Country lookup (optional - only if Client SM provided)
-        self.emit_log("Step 1: Building country lookup from Client Supplier Master...", 'info')
-        self.emit_progress(0.05, "Building country lookup...")
+        self.output_info_label = tk.Label(output_frame, bg='#fef9e7',
+                                         text="Output: Results will be saved to the same directory as the PO file")
+        self.output_info_label.pack(side=tk.LEFT, anchor='w')
 
-        country_lookup = {}
-        if self.client_sm_data is not None and csm_supplier_num_col and csm_country_col:
-            for _, row in self.client_sm_data.iterrows():
-                supplier_num = str(row[csm_supplier_num_col]).strip() if csm_supplier_num_col else None
-                if supplier_num and supplier_num.lower() != 'nan':
-                    country_val = str(row[csm_country_col]) if csm_country_col else ''
-                    if country_val and country_val.lower() != 'nan':
-                        country_lookup[supplier_num] = country_val
-            self.emit_log(f"Built country lookup for {len(country_lookup)} suppliers", 'info')
-        else:
-            self.emit_log("No Client Supplier Master provided - country data will be 'Unknown'", 'info')
+        return tab
 
-        # STEP 2: Extract supplier data from PO file
-        self.emit_log("Step 2: Extracting suppliers from PO file...", 'info')
+    def create_preview_tree(self, parent) -> 'ttk.Treeview':
+        """Create a preview treeview for CSV data - with FIXED height"""
+        tree_frame = ttk.Frame(parent, height=120)
+        tree_frame.pack(fill=tk.X, expand=False, pady=(10, 0))
+        tree_frame.pack_propagate(False)  # Prevent frame from shrinking/expanding
 
-        po_suppliers = defaultdict(lambda: {'items': [], 'countries': set(), 'original_names': set()})
+        # Treeview with fixed height of 4 rows
+        tree = ttk.Treeview(tree_frame, height=4, show='headings')
 
-        for _, row in self.po_data.iterrows():
-            supplier_num = str(row[po_supplier_num_col]).strip() if po_supplier_num_col else ''
-            supplier_name = str(row[po_supplier_name_col]).strip() if po_supplier_name_col else ''
-            item_desc = str(row[po_item_col]) if po_item_col else ''
+        # Horizontal scrollbar
+        x_scroll = ttk.Scrollbar(tree_frame, orient=tk.HORIZONTAL, command=tree.xview)
+        x_scroll.pack(side=tk.BOTTOM, fill=tk.X)
 
-            if not supplier_name or supplier_name.lower() == 'nan':
-                continue
+        # Vertical scrollbar
+        y_scroll = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=tree.yview)
+        y_scroll.pack(side=tk.RIGHT, fill=tk.Y)
 
-            po_suppliers[supplier_name]['original_names'].add(supplier_name)
+        tree.configure(yscrollcommand=y_scroll.set, xscrollcommand=x_scroll.set)
+        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
-            if item_desc and item_desc.lower() != 'nan':
-                po_suppliers[supplier_name]['items'].append(item_desc)
+        return tree
 
-            if supplier_num and supplier_num in country_lookup:
-                po_suppliers[supplier_name]['countries'].add(country_lookup[supplier_num])
+    def create_mapping_tab(self) -> 'ttk.Frame':
+        """Create the column mapping tab"""
+        tab = ttk.Frame(self.notebook, padding=10)
 
-        self.emit_log(f"Found {len(po_suppliers)} unique supplier names in PO file", 'info')
+        ttk.Label(tab, text="Column Mapping", font=('Helvetica', 14, 'bold')).pack(anchor='w', pady=(0, 15))
 
-        # STEP 3: Normalize supplier names
-        self.emit_log("Step 3: Normalizing supplier names...", 'info')
-        self.emit_progress(0.10, "Normalizing supplier names...")
+        # Mapping frames
+        mapping_frame = ttk.Frame(tab)
+        mapping_frame.pack(fill=tk.X)
+        mapping_frame.columnconfigure(0, weight=1)
+        mapping_frame.columnconfigure(1, weight=1)
+        mapping_frame.columnconfigure(2, weight=1)
 
-        all_supplier_names = list(po_suppliers.keys())
-        name_normalization_map = self.normalize_supplier_names(all_supplier_names, rate_limiter)
+        # PO Mapping
+        po_map_frame = ttk.LabelFrame(mapping_frame, text="PO File Columns", padding=10)
+        po_map_frame.grid(row=0, column=0, sticky='nsew', padx=5, pady=5)
 
-        self.emit_log(f"Normalized {len(name_normalization_map)} supplier names", 'success')
+        ttk.Label(po_map_frame, text="Supplier Number:").pack(anchor='w')
+        self.po_num_combo = ttk.Combobox(po_map_frame, state='readonly', width=25)
+        self.po_num_combo.pack(fill=tk.X, pady=(0, 10))
 
-        # Regroup by normalized name
-        normalized_suppliers = defaultdict(lambda: {'items': [], 'countries': set(), 'original_names': set()})
+        ttk.Label(po_map_frame, text="Supplier Name:").pack(anchor='w')
+        self.po_name_combo = ttk.Combobox(po_map_frame, state='readonly', width=25)
+        self.po_name_combo.pack(fill=tk.X, pady=(0, 10))
 
-        for original_name, data in po_suppliers.items():
-            normalized_name = name_normalization_map.get(original_name, original_name)
-            if not normalized_name or not str(normalized_name).strip():
-                normalized_name = original_name
-            if not normalized_name or not str(normalized_name).strip():
-                continue
-            normalized_suppliers[normalized_name]['items'].extend(data['items'])
-            normalized_suppliers[normalized_name]['countries'].update(data['countries'])
-            normalized_suppliers[normalized_name]['original_names'].add(original_name)
+        ttk.Label(po_map_frame, text="Item Description:").pack(anchor='w')
+        self.po_item_combo = ttk.Combobox(po_map_frame, state='readonly', width=25)
+        self.po_item_combo.pack(fill=tk.X)
 
-        self.emit_log(f"After normalization: {len(normalized_suppliers)} unique suppliers", 'info')
+        # CSM Mapping
+        csm_map_frame = ttk.LabelFrame(mapping_frame, text="Client Supplier Master Columns", padding=10)
+        csm_map_frame.grid(row=0, column=1, sticky='nsew', padx=5, pady=5)
 
-        # STEP 4: Load existing Genpact Supplier Master
-        self.emit_log(f"Step 4: Loading Genpact Supplier Master from {genpact_sm_path}...", 'info')
-        self.emit_progress(0.25, "Loading Genpact Supplier Master...")
+        ttk.Label(csm_map_frame, text="Supplier Number:").pack(anchor='w')
+        self.csm_num_combo = ttk.Combobox(csm_map_frame, state='readonly', width=25)
+        self.csm_num_combo.pack(fill=tk.X, pady=(0, 10))
 
-        genpact_sm_df = load_genpact_supplier_master(genpact_sm_path)
+        ttk.Label(csm_map_frame, text="Country:").pack(anchor='w')
+        self.csm_country_combo = ttk.Combobox(csm_map_frame, state='readonly', width=25)
+        self.csm_country_combo.pack(fill=tk.X)
 
-        existing_suppliers = {}
-        if len(genpact_sm_df) > 0:
-            for idx, row in genpact_sm_df.iterrows():
-                norm_name = str(row.get('Normalized_Supplier_Name', '')).strip()
-                if norm_name:
-                    existing_suppliers[norm_name.lower()] = row.to_dict()
-            self.emit_log(f"Loaded {len(existing_suppliers)} existing suppliers", 'info')
-        else:
-            self.emit_log("No existing Genpact Supplier Master - will create new", 'info')
+        # Category Mapping - Updated for L1/L2/L3
+        cat_map_frame = ttk.LabelFrame(mapping_frame, text="Taxonomy Columns", padding=10)
+        cat_map_frame.grid(row=0, column=2, sticky='nsew', padx=5, pady=5)
 
-        # STEP 5: Identify new vs existing
-        self.emit_log("Step 5: Identifying new vs existing suppliers...", 'info')
+        ttk.Label(cat_map_frame, text="Genpact Level 1:").pack(anchor='w')
+        self.cat_l1_combo = ttk.Combobox(cat_map_frame, state='readonly', width=25)
+        self.cat_l1_combo.pack(fill=tk.X, pady=(0, 10))
 
-        new_suppliers = []
-        existing_to_update = []
+        ttk.Label(cat_map_frame, text="Genpact Level 2 (Category Code):").pack(anchor='w')
+        self.cat_l2_combo = ttk.Combobox(cat_map_frame, state='readonly', width=25)
+        self.cat_l2_combo.pack(fill=tk.X, pady=(0, 10))
 
-        for norm_name in normalized_suppliers.keys():
-            if not norm_name or not str(norm_name).strip():
-                continue
-            if str(norm_name).lower() in existing_suppliers:
-                existing_to_update.append(norm_name)
-            else:
-                new_suppliers.append(norm_name)
+        ttk.Label(cat_map_frame, text="Genpact Level 3 (Category Name):").pack(anchor='w')
+        self.cat_l3_combo = ttk.Combobox(cat_map_frame, state='readonly', width=25)
+        self.cat_l3_combo.pack(fill=tk.X)
 
-        self.emit_log(f"New suppliers to add: {len(new_suppliers)}", 'info')
-        self.emit_log(f"Existing suppliers to update: {len(existing_to_update)}", 'update')
+        return tab
 
-        # Build categories list - Updated for L1/L2/L3
-        categories = []
-        for _, row in self.categories_data.iterrows():
-            categories.append({
-                'l1': str(row[cat_l1_col]),
-                'l2': str(row[cat_l2_col]),
-                'l3': str(row[cat_l3_col])
-            })
+    def create_process_tab(self) -> 'ttk.Frame':
+        """Create the processing tab"""
+        tab = ttk.Frame(self.notebook, padding=10)
 
-        # STEP 6: Process NEW suppliers
-        self.emit_log("Step 6: Processing new suppliers...", 'info')
+        ttk.Label(tab, text="Run Processing", font=('Helvetica', 14, 'bold')).pack(anchor='w', pady=(0, 10))
 
-        new_rows = []
-        total_new = len(new_suppliers)
+        # Readiness status
+        self.readiness_label = ttk.Label(tab, text="Checking readiness...", foreground='orange')
+        self.readiness_label.pack(anchor='w', pady=(0, 10))
 
-        # Track flow statistics
-        description_flow_count = 0
-        po_line_flow_count = 0
+        # Process button
+        self.process_btn = ttk.Button(tab, text="▶ Start Processing", command=self.start_processing)
+        self.process_btn.pack(fill=tk.X, pady=(0, 15), ipady=10)
 
-        for idx, norm_name in enumerate(new_suppliers):
-            self.emit_progress(0.30 + (idx / max(total_new, 1)) * 0.35,
-                            f"Processing new supplier {idx+1}/{total_new}: {norm_name[:30]}...")
+        # Progress frame
+        progress_frame = ttk.LabelFrame(tab, text="Progress", padding=10)
+        progress_frame.pack(fill=tk.X, pady=(0, 10))
 
-            supplier_data = normalized_suppliers[norm_name]
+        self.progress_var = tk.DoubleVar(value=0)
+        self.progress_bar = ttk.Progressbar(progress_frame, variable=self.progress_var, maximum=100)
+        self.progress_bar.pack(fill=tk.X, pady=(0, 5))
 
-            # Assess PO line quality for this supplier
-            passing_items, failing_items, pass_rate = assess_supplier_po_quality(supplier_data['items'])
+        self.status_label = ttk.Label(progress_frame, text="Ready")
+        self.status_label.pack(anchor='w')
 
-            # Determine which classification flow to use
-            # If >50% fail quality check, use description-based flow
-            use_description_flow = pass_rate < 0.5
+        # Log frame
+        log_frame = ttk.LabelFrame(tab, text="Processing Log", padding=10)
+        log_frame.pack(fill=tk.BOTH, expand=True)
 
-            if use_description_flow:
-                flow_reason = f"PO quality: {pass_rate:.0%} pass rate ({len(passing_items)}/{len(supplier_data['items'])} good lines)"
-                self.emit_log(f"📝 {norm_name}: Using DESCRIPTION flow - {flow_reason}", 'info')
-                description_flow_count += 1
-            else:
-                flow_reason = f"PO quality: {pass_rate:.0%} pass rate ({len(passing_items)}/{len(supplier_data['items'])} good lines)"
-                self.emit_log(f"📦 {norm_name}: Using PO LINE flow - {flow_reason}", 'info')
-                po_line_flow_count += 1
+        self.log_text = scrolledtext.ScrolledText(log_frame, height=15, wrap=tk.WORD,
+                                                 bg='#2c3e50', fg='#ecf0f1',
+                                                 font=('Consolas', 10))
+        self.log_text.pack(fill=tk.BOTH, expand=True)
 
-            # Enrich supplier (same for both flows)
-            enrichment = enrich_supplier(norm_name, api_key, model, temperature, use_grounding, rate_limiter)
+        # Configure log tags for colors
+        self.log_text.tag_configure('success', foreground='#27ae60')
+        self.log_text.tag_configure('error', foreground='#e74c3c')
+        self.log_text.tag_configure('warning', foreground='#f39c12')
+        self.log_text.tag_configure('grounding', foreground='#3498db')
+        self.log_text.tag_configure('update', foreground='#9b59b6')
+        self.log_text.tag_configure('info', foreground='#ecf0f1')
 
-            if use_grounding and enrichment['description'] != 'Not available':
-                self.emit_log(f"Found {norm_name} via search", 'grounding')
+        return tab
 
-            # Classification - currently both flows use description-based
-            # Phase 3 will implement the PO line flow alternative
-            if use_description_flow:
-                # ORIGINAL FLOW: Classify by supplier name + description
-                classification = classify_supplier(norm_name, enrichment['description'], categories,
-                                                api_key, model, temperature, rate_limiter)
+    def create_results_tab(self) -> 'ttk.Frame':
+        """Create the results tab"""
+        tab = ttk.Frame(self.notebook, padding=10)
 
-                product_tags = generate_supplier_product_tags(norm_name, supplier_data['items'],
-                                                            api_key, model, temperature, rate_limiter)
+        ttk.Label(tab, text="Genpact Supplier Master", font=('Helvetica', 14, 'bold')).pack(anchor='w', pady=(0, 10))
 
-            country_names = []
-            country_codes = []
-            for country in supplier_data['countries']:
-                name, code = normalize_country(country)
-                if name != 'Unknown':
-                    country_names.append(name)
-                    country_codes.append(code)
+        # Stats frame
+        stats_frame = ttk.Frame(tab)
+        stats_frame.pack(fill=tk.X, pady=(0, 15))
 
-            new_rows.append({
-                'Normalized_Supplier_Name': norm_name,
-                'Original_Name_Variants': '; '.join(supplier_data['original_names']),
-                'Supplier_Description': enrichment['description'],
-                'Employee_Count': enrichment['employee_count'],
-                'Revenue': enrichment['revenue'],
-                'Year_Established': enrichment['year_established'],
-                'Overall_Category': classification['l1'],
-                'Category_Code': classification['category_code'],
-                'Category_Name': classification['category_name'],
-                'Category_Confidence': f"{classification['confidence']:.0%}",
-                'L3_Token_Probability': f"{classification.get('l3_token_probability', 0.0):.0%}",
-                'Confidence_Reasoning': classification.get('confidence_reasoning', ''),
-                'Product_Service_Tags': ', '.join(product_tags) if product_tags else '',
-                'Total_PO_Items': len(supplier_data['items']),
-                'Ship_To_Countries': ', '.join(country_names) if country_names else 'Unknown',
-                'Country_Codes': ', '.join(country_codes) if country_codes else 'XX',
-                'Last_Updated': datetime.now().strftime('%Y-%m-%d')
-            })
+        self.stat_labels = {}
+        for i, (key, label) in enumerate([('new', 'New'), ('updated', 'Updated'),
+                                          ('unchanged', 'Unchanged'), ('total', 'Total')]):
+            stat_box = ttk.Frame(stats_frame, relief='solid', borderwidth=1)
+            stat_box.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
 
-            self.emit_log(f"✓ NEW: {norm_name} -> {classification['l1']} / {classification['category_code']}", 'success')
-        else:
-            # PO LINE FLOW: Hybrid approach
-            # Step 1: Classify each PO line individually
-            # Step 2: Consolidate low-confidence items into better-fitting categories
+            value_label = ttk.Label(stat_box, text="0", font=('Helvetica', 24, 'bold'))
+            value_label.pack(pady=(10, 0))
 
-            self.emit_log(f"  Step 1: Classifying {len(passing_items)} PO lines individually for {norm_name}...", 'info')
+            name_label = ttk.Label(stat_box, text=label, foreground='gray')
+            name_label.pack(pady=(0, 10))
 
-            # Step 1: Classify each passing PO line individually
-            classified_lines = classify_po_lines_individually(
-                po_line_descriptions=passing_items,
-                supplier_name=norm_name,
-                categories=categories,
-                api_key=api_key,
-                model=model,
-                temperature=temperature,
-                rate_limiter=rate_limiter,
-                log_callback=lambda msg: self.emit_log(msg, 'info')
-            )
+            self.stat_labels[key] = value_label
 
-            # Count initial categories
-            initial_categories = set([(l['l1'], l['l2'], l['l3']) for l in classified_lines])
-            low_conf_count = sum(1 for l in classified_lines if l['confidence'] < 0.6)
-            self.emit_log(f"    Initial: {len(initial_categories)} categories, {low_conf_count} low-confidence items", 'info')
+        # Results treeview
+        tree_frame = ttk.Frame(tab)
+        tree_frame.pack(fill=tk.BOTH, expand=True)
 
-            # Step 2: Consolidate low-confidence classifications
-            self.emit_log(f"  Step 2: Consolidating low-confidence classifications...", 'info')
+        # Create treeview with scrollbars
+        self.results_tree = ttk.Treeview(tree_frame, show='headings')
 
-            category_groups = consolidate_classifications(
-                classified_lines=classified_lines,
-                supplier_name=norm_name,
-                api_key=api_key,
-                model=model,
-                temperature=temperature,
-                rate_limiter=rate_limiter,
-                confidence_threshold=0.6
-            )
+        y_scroll = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.results_tree.yview)
+        x_scroll = ttk.Scrollbar(tree_frame, orient=tk.HORIZONTAL, command=self.results_tree.xview)
+        self.results_tree.configure(yscrollcommand=y_scroll.set, xscrollcommand=x_scroll.set)
 
-            self.emit_log(f"  Final: {len(category_groups)} category groupings for {norm_name}", 'info')
+        self.results_tree.grid(row=0, column=0, sticky='nsew')
+        y_scroll.grid(row=0, column=1, sticky='ns')
+        x_scroll.grid(row=1, column=0, sticky='ew')
 
-            # Prepare country data (same for all rows of this supplier)
-            country_names = []
-            country_codes = []
-            for country in supplier_data['countries']:
-                name, code = normalize_country(country)
-                if name != 'Unknown':
-                    country_names.append(name)
-                    country_codes.append(code)
+        tree_frame.columnconfigure(0, weight=1)
+        tree_frame.rowconfigure(0, weight=1)
 
-            # Create one row per category group
-            for cat_group in category_groups:
-                l1_category = cat_group['l1']
-                l2_code = cat_group['l2']
-                l3_name = cat_group['l3']
-                confidence = cat_group['confidence']
-                group_po_lines = cat_group['po_lines']
+        # Search and paging (only one page of rows lives in the treeview)
+        self.results_pager = None
+        self.results_search_var = tk.StringVar()
+        self.results_search_var.trace_add('write', lambda *_: self.schedule_results_search())
+        self._results_search_job = None
 
-                # Generate product tags only from this group's PO lines
-                group_tags = generate_supplier_product_tags(
-                    norm_name,
-                    group_po_lines,
-                    api_key, model, temperature, rate_limiter
-                )
+        nav_frame = ttk.Frame(tab)
+        nav_frame.pack(fill=tk.X, pady=(5, 0))
 
-                new_rows.append({
-                    'Normalized_Supplier_Name': norm_name,
-                    'Original_Name_Variants': '; '.join(supplier_data['original_names']),
-                    'Supplier_Description': enrichment['description'],
-                    'Employee_Count': enrichment['employee_count'],
-                    'Revenue': enrichment['revenue'],
-                    'Year_Established': enrichment['year_established'],
-                    'Overall_Category': l1_category,
-                    'Category_Code': l2_code,
-                    'Category_Name': l3_name,
-                    'Category_Confidence': f"{confidence:.0%}",
-                    'L3_Token_Probability': f"{cat_group.get('l3_token_probability', 0.0):.0%}",
-                    'Confidence_Reasoning': cat_group.get('confidence_reasoning', ''),
-                    'Product_Service_Tags': ', '.join(group_tags) if group_tags else '',
-                    'Total_PO_Items': len(group_po_lines),
-                    'Ship_To_Countries': ', '.join(country_names) if country_names else 'Unknown',
-                    'Country_Codes': ', '.join(country_codes) if country_codes else 'XX',
-                    'Last_Updated': datetime.now().strftime('%Y-%m-%d')
-                })
+        ttk.Label(nav_frame, text="Search name / category:").pack(side=tk.LEFT)
+        ttk.Entry(nav_frame, textvariable=self.results_search_var, width=35).pack(side=tk.LEFT, padx=5)
 
-                self.emit_log(f"  ✓ NEW ROW: {norm_name} -> {l1_category} / {l2_code} / {l3_name} ({len(group_po_lines)} items, {confidence:.0%} conf)", 'success')
+        self.results_next_btn = ttk.Button(nav_frame, text="Next ▶", width=8,
+                                           command=lambda: self.show_results_page(1))
+        self.results_next_btn.pack(side=tk.RIGHT)
+        self.results_page_label = ttk.Label(nav_frame, text="")
+        self.results_page_label.pack(side=tk.RIGHT, padx=10)
+        self.results_prev_btn = ttk.Button(nav_frame, text="◀ Prev", width=8,
+                                           command=lambda: self.show_results_page(-1))
+        self.results_prev_btn.pack(side=tk.RIGHT)
 
-            self.emit_log(f"✓ NEW: {norm_name} -> {len(category_groups)} category rows created", 'success')
+        # Export buttons
+        export_frame = ttk.Frame(tab)
+        export_frame.pack(fill=tk.X, pady=(10, 0))
 
-            stats['new_suppliers'] += 1
+        self.export_btn = ttk.Button(export_frame, text="💾 Export CSV", command=self.export_results,
+                                    state='disabled')
+        self.export_btn.pack(side=tk.LEFT)
 
-        # Log flow statistics
-        self.emit_log(f"Flow summary: {description_flow_count} suppliers used DESCRIPTION flow, {po_line_flow_count} would use PO LINE flow", 'info')
+        self.saved_path_label = ttk.Label(export_frame, text="", foreground='green')
+        self.saved_path_label.pack(side=tk.LEFT, padx=10)
 
-        # STEP 7: Update EXISTING suppliers
-        self.emit_log("Step 7: Updating existing suppliers...", 'info')
+        return tab
 
-        updated_rows = {}
-        total_existing = len(existing_to_update)
+    def update_preview_tree(self, tree: 'ttk.Treeview', df: pd.DataFrame):
+        """Update a preview treeview with dataframe data"""
+        # Clear existing
+        tree.delete(*tree.get_children())
+        for col in tree['columns']:
+            tree.heading(col, text='')
 
-        for idx, norm_name in enumerate(existing_to_update):
-            self.emit_progress(0.65 + (idx / max(total_existing, 1)) * 0.20,
-                            f"Updating {idx+1}/{total_existing}: {norm_name[:30]}...")
+        # Set columns
+        columns = list(df.columns)
+        tree['columns'] = columns
 
-            supplier_data = normalized_suppliers[norm_name]
-            existing_row = existing_suppliers[norm_name.lower()].copy()
+        for col in columns:
+            tree.heading(col, text=col)
+            tree.column(col, width=100, minwidth=50)
+
+        # Add rows (first 3)
+        for idx, row in df.head(3).iterrows():
+            values = [str(v)[:50] for v in row.values]
+            tree.insert('', tk.END, values=values)
+
+    def load_file(self, file_type: str):
+        """Load a CSV file"""
+        file_path = filedialog.askopenfilename(
+            title=f"Open {file_type.upper()} CSV",
+            filetypes=[("CSV Files", "*.csv"), ("All Files", "*.*")]
+        )
 
-            new_tags = generate_supplier_product_tags(norm_name, supplier_data['items'],
-                                                    api_key, model, temperature, rate_limiter)
+        if not file_path:
+            return
 
-            existing_tags = existing_row.get('Product_Service_Tags', '')
-            merged_tags = merge_tags(existing_tags, new_tags)
+        try:
+            # Large PO files are streamed in chunks at run time; only a preview is read now
+            stream_po = file_type == 'po' and os.path.getsize(file_path) > PO_STREAM_THRESHOLD_BYTES
+            df = read_csv_header(file_path, nrows=3) if stream_po else read_input_csv(file_path)
+
+            columns = df.columns.tolist()
+            keywords = COLUMN_KEYWORDS[file_type]
+
+            if file_type == 'po':
+                self.po_data = None if stream_po else df
+                self.po_file_path = file_path
+                if stream_po:
+                    size_mb = os.path.getsize(file_path) / (1024 * 1024)
+                    self.po_status_label.configure(text=f"✓ {size_mb:,.0f} MB - streamed during processing",
+                                                   foreground='green')
+                else:
+                    self.po_status_label.configure(text=f"✓ {len(df)} rows loaded", foreground='green')
+                self.update_preview_tree(self.po_preview_tree, df)
+
+                # Update column combos
+                self.po_num_combo['values'] = columns
+                self.po_num_combo.current(find_col_index(columns, keywords['supplier_number']))
+
+                self.po_name_combo['values'] = columns
+                self.po_name_combo.current(find_col_index(columns, keywords['supplier_name']))
+
+                self.po_item_combo['values'] = columns
+                self.po_item_combo.current(find_col_index(columns, keywords['item_description']))
+
+                # Update output path
+                output_dir = os.path.dirname(file_path)
+                output_file = os.path.join(output_dir, "GenpactSupplierMaster.csv")
+                self.output_info_label.configure(text=f"Output: {output_file}")
+                self.update_output_status(output_file)
 
-            new_country_names = []
-            new_country_codes = []
-            for country in supplier_data['countries']:
-                name, code = normalize_country(country)
-                if name != 'Unknown':
-                    new_country_names.append(name)
-                    new_country_codes.append(code)
+            elif file_type == 'csm':
+                self.client_sm_data = df
+                self.csm_status_label.configure(text=f"✓ {len(df)} rows loaded", foreground='green')
+                self.update_preview_tree(self.csm_preview_tree, df)
+
+                self.csm_num_combo['values'] = columns
+                self.csm_num_combo.current(find_col_index(columns, keywords['supplier_number']))
+
+                self.csm_country_combo['values'] = columns
+                self.csm_country_combo.current(find_col_index(columns, keywords['country']))
+
+            elif file_type == 'cat':
+                self.categories_data = df
+                self.cat_status_label.configure(text=f"✓ {len(df)} categories loaded", foreground='green')
+                self.update_preview_tree(self.cat_preview_tree, df)
+
+                # Updated for L1/L2/L3 taxonomy
+                self.cat_l1_combo['values'] = columns
+                self.cat_l1_combo.current(find_col_index(columns, keywords['l1']))
+
+                self.cat_l2_combo['values'] = columns
+                self.cat_l2_combo.current(find_col_index(columns, keywords['l2']))
+
+                self.cat_l3_combo['values'] = columns
+                self.cat_l3_combo.current(find_col_index(columns, keywords['l3']))
+
+                self.update_readiness()
+
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to load file:\n{str(e)}")
+
+    def update_output_status(self, file_path: str):
+        """Update output file status"""
+        journal_path = journal_path_for(file_path)
+        if journal_path.is_file():
+            self.output_status_label.configure(text="⚠ Interrupted run found - tick 'Resume' to continue it",
+                                               foreground='orange')
+            self.delete_btn.configure(state='normal')
+            self.output_path_label.configure(text=file_path)
+        elif os.path.exists(file_path):
+            file_size = os.path.getsize(file_path)
+            self.output_status_label.configure(text=f"✓ File exists ({file_size} bytes)", foreground='green')
+            self.delete_btn.configure(state='normal')
+            self.output_path_label.configure(text=file_path)
+        else:
+            self.output_status_label.configure(text="File will be created", foreground='gray')
+            self.delete_btn.configure(state='disabled')
+            self.output_path_label.configure(text=file_path)
 
-            merged_countries = merge_locations(existing_row.get('Ship_To_Countries', ''), new_country_names)
-            merged_codes = merge_locations(existing_row.get('Country_Codes', ''), new_country_codes)
+    def delete_output_file(self):
+        """Delete the output file"""
+        if not self.po_file_path:
+            return
 
-            existing_row['Product_Service_Tags'] = merged_tags
-            existing_row['Ship_To_Countries'] = merged_countries
-            existing_row['Country_Codes'] = merged_codes
+        output_file = os.path.join(os.path.dirname(self.po_file_path), "GenpactSupplierMaster.csv")
 
-            try:
-                existing_count = int(float(str(existing_row.get('Total_PO_Items', 0) or 0).replace(',', '')))
-            except (ValueError, TypeError):
-                existing_count = 0
-            existing_row['Total_PO_Items'] = existing_count + len(supplier_data['items'])
+        journal_path = journal_path_for(output_file)
+        if os.path.exists(output_file) or journal_path.is_file():
+            if messagebox.askyesno("Confirm Delete", f"Delete {output_file} and any checkpoint journal?"):
+                try:
+                    if os.path.exists(output_file):
+                        os.remove(output_file)
+                    if journal_path.is_file():
+                        journal_path.unlink()
+                    self.update_output_status(output_file)
+                    messagebox.showinfo("Success", "File deleted. Will create new on next run.")
+                except Exception as e:
+                    messagebox.showerror("Error", f"Could not delete: {e}")
+
+    def update_readiness(self):
+        """Update the readiness status"""
+        missing = []
+
+        if not self.api_key_var.get():
+            missing.append("API Key")
+        if not self.po_file_path:
+            missing.append("PO File")
+        # Client SM is optional - only used for country lookup
+        if self.categories_data is None:
+            missing.append("Taxonomy")
+
+        if missing:
+            self.readiness_label.configure(text=f"❌ Missing: {', '.join(missing)}", foreground='red')
+            self.process_btn.configure(state='disabled')
+        else:
+            self.readiness_label.configure(text="✓ Ready to process", foreground='green')
+            self.process_btn.configure(state='normal' if not self.processing else 'disabled')
+
+    def test_api(self):
+        """Test the API connection"""
+        api_key = self.api_key_var.get()
+        if not api_key:
+            messagebox.showwarning("Warning", "Please enter an API key")
+            return
 
-            existing_row['Last_Updated'] = datetime.now().strftime('%Y-%m-%d')
+        self.test_btn.configure(state='disabled', text="Testing...")
+        self.root.update()
 
-            existing_variants = str(existing_row.get('Original_Name_Variants', '')).split('; ')
-            new_variants = supplier_data['original_names'] - set(existing_variants)
-            if new_variants:
-                all_variants = set(existing_variants) | supplier_data['original_names']
-                existing_row['Original_Name_Variants'] = '; '.join([v for v in all_variants if v])
+        try:
+            model = self.model_var.get()
+            result = call_gemini_sync(model, api_key, "Test.", 'Return: {"status": "ok"}', 0.2, False,
+                                      use_cache=False, stage='connection_test')
 
-            updated_rows[norm_name.lower()] = existing_row
+            if result and result.get('status') == 'ok':
+                messagebox.showinfo("Success", "API connection successful!")
+            else:
+                messagebox.showwarning("Warning", f"API responded but unexpected result: {result}")
+        except Exception as e:
+            messagebox.showerror("Error", f"API test failed:\n{str(e)[:200]}")
+        finally:
+            self.test_btn.configure(state='normal', text="Test API Connection")
+            self.update_readiness()
 
-            self.emit_log(f"✓ UPDATED: {norm_name} (+{len(new_tags)} tags)", 'update')
-            stats['updated_suppliers'] += 1
+    def log_message(self, message: str, msg_type: str = 'info'):
+        """Add a log message"""
+        timestamp = datetime.now().strftime('%H:%M:%S')
+        self.append_log([f"[{timestamp}] {message}\n", msg_type])
+
+    def append_log(self, chunks: list):
+        """Insert (text, tag, text, tag, ...) in one call and trim the view to LOG_VIEW_MAX_LINES"""
+        self.log_text.insert(tk.END, *chunks)
+        line_count = int(self.log_text.index('end-1c').split('.')[0])
+        excess = line_count - LOG_VIEW_MAX_LINES
+        if excess > 0:
+            self.log_text.delete('1.0', f'{excess + 1}.0')
+        self.log_text.see(tk.END)
+
+    def process_queue(self):
+        """
+        Process messages from the worker thread in batches: all pending log
+        lines go into the log widget in one insert and only the latest
+        progress update is applied.
+        """
+        log_chunks = []
+        progress = None
+        finished = []
+        try:
+            for _ in range(QUEUE_DRAIN_MAX):
+                msg = self.message_queue.get_nowait()
+                msg_type = msg.get('type')
+
+                if msg_type == 'progress':
+                    progress = msg
+                elif msg_type == 'log':
+                    log_chunks.append(f"[{msg['time']}] {msg['message']}\n")
+                    log_chunks.append(msg['level'])
+                elif msg_type in ('complete', 'error'):
+                    finished.append(msg)
+
+        except queue.Empty:
+            pass
 
-        # STEP 8: Build final DataFrame
-        self.emit_log("Step 8: Building and saving Genpact Supplier Master...", 'info')
-        self.emit_progress(0.90, "Saving Genpact Supplier Master...")
+        if log_chunks:
+            self.append_log(log_chunks)
+        if progress is not None:
+            self.progress_var.set(progress['value'] * 100)
+            self.status_label.configure(text=progress['status'])
+        for msg in finished:
+            if msg['type'] == 'complete':
+                self.on_processing_complete(msg['results'], msg['stats'])
+            else:
+                self.on_processing_error(msg['error'])
 
-        final_rows = []
+        # Schedule next check
+        self.root.after(100, self.process_queue)
 
-        for norm_name_lower, row_data in existing_suppliers.items():
-            if norm_name_lower not in updated_rows:
-                final_rows.append(row_data)
-                stats['unchanged_suppliers'] += 1
+    def open_log_file(self):
+        """Start a full log for this run under logs/ (the on-screen log is capped)"""
+        self.close_log_file()
+        try:
+            LOG_DIR.mkdir(parents=True, exist_ok=True)
+            path = LOG_DIR / f"supplier_master_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
+            with self.log_file_lock:
+                self.log_file = open(path, 'a', encoding='utf-8')
+            self.log_message(f"Full log: {path}")
+        except OSError as e:
+            self.log_message(f"Could not open log file: {e}", 'warning')
+
+    def close_log_file(self):
+        with self.log_file_lock:
+            if self.log_file is not None:
+                self.log_file.close()
+                self.log_file = None
+
+    def start_processing(self):
+        """Start the processing in a background thread"""
+        if self.processing:
+            return
 
-        for row_data in updated_rows.values():
-            final_rows.append(row_data)
+        # Collect column mappings
+        self.po_columns = {
+            'supplier_number': self.po_num_combo.get(),
+            'supplier_name': self.po_name_combo.get(),
+            'item_description': self.po_item_combo.get()
+        }
 
-        final_rows.extend(new_rows)
+        self.client_sm_columns = {
+            'supplier_number': self.csm_num_combo.get(),
+            'country': self.csm_country_combo.get()
+        }
 
-        results_df = pd.DataFrame(final_rows)
+        # Updated for L1/L2/L3 taxonomy
+        self.category_columns = {
+            'l1': self.cat_l1_combo.get(),
+            'l2': self.cat_l2_combo.get(),
+            'l3': self.cat_l3_combo.get()
+        }
 
-        desired_columns = [
-            'Normalized_Supplier_Name', 'Original_Name_Variants',
-            'Supplier_Description', 'Employee_Count', 'Revenue', 'Year_Established',
-            'Overall_Category', 'Category_Code', 'Category_Name', 'Category_Confidence', 'L3_Token_Probability', 'Confidence_Reasoning',
-            'Product_Service_Tags', 'Total_PO_Items',
-            'Ship_To_Countries', 'Country_Codes', 'Last_Updated'
-        ]
+        # Clear log
+        self.log_text.delete(1.0, tk.END)
+        self.open_log_file()
+        self.progress_var.set(0)
+        self.status_label.configure(text="Starting...")
 
-        for col in desired_columns:
-            if col not in results_df.columns:
-                results_df[col] = ''
+        # Start processing thread
+        self.processing = True
+        self.process_btn.configure(state='disabled', text="Processing...")
 
-        results_df = results_df[[c for c in desired_columns if c in results_df.columns]]
-        results_df = results_df.sort_values('Normalized_Supplier_Name', key=lambda x: x.astype(str)).reset_index(drop=True)
+        thread = threading.Thread(target=self.run_processing, daemon=True)
+        thread.start()
 
-        save_genpact_supplier_master(results_df, genpact_sm_path)
-        self.emit_log(f"Saved Genpact Supplier Master to: {genpact_sm_path}", 'success')
+    def run_processing(self):
+        """Run the processing in background thread"""
+        try:
+            output_dir = os.path.dirname(self.po_file_path)
+            genpact_sm_path = os.path.join(output_dir, "GenpactSupplierMaster.csv")
+
+            config = SupplierMasterConfig(
+                api_key=self.api_key_var.get(),
+                model=self.model_var.get(),
+                temperature=self.temp_var.get(),
+                use_grounding=self.grounding_var.get(),
+                rpm_limit=self.rpm_var.get(),
+                max_workers=self.workers_var.get(),
+                use_cache=self.cache_var.get(),
+                resume=self.resume_var.get(),
+                po_columns=self.po_columns,
+                client_sm_columns=self.client_sm_columns,
+                category_columns=self.category_columns,
+            )
+            engine = SupplierMasterEngine(config, self.po_data, self.categories_data, self.client_sm_data,
+                                          on_log=self.emit_log, on_progress=self.emit_progress,
+                                          po_path=self.po_file_path)
+            results_df, stats = engine.process_all_data(genpact_sm_path)
+
+            self.message_queue.put({
+                'type': 'complete',
+                'results': results_df,
+                'stats': stats
+            })
 
-        stats['total_in_master'] = len(results_df)
+        except Exception as e:
+            self.emit_log(f"Processing failed: {e}", 'error')
+            self.message_queue.put({
+                'type': 'error',
+                'error': str(e)
+            })
 
-        self.emit_progress(1.0, "Processing complete!")
-        self.emit_log(f"Complete! New: {stats['new_suppliers']}, Updated: {stats['updated_suppliers']}, "
-                    f"Unchanged: {stats['unchanged_suppliers']}, Total: {stats['total_in_master']}", 'success')
+    def emit_progress(self, progress: float, status: str):
+        """Emit progress update to main thread"""
+        self.message_queue.put({
+            'type': 'progress',
+            'value': progress,
+            'status': status
+        })
 
-        return results_df, stats
+    def emit_log(self, message: str, level: str = 'info'):
+        """Emit log message to main thread (and the run's log file)"""
+        now = datetime.now()
+        with self.log_file_lock:
+            if self.log_file is not None:
+                self.log_file.write(f"{now.strftime('%Y-%m-%d %H:%M:%S')} {level.upper():<9} {message}\n")
+        self.message_queue.put({
+            'type': 'log',
+            'message': message,
+            'level': level,
+            'time': now.strftime('%H:%M:%S')
+        })
 
     def on_processing_complete(self, results_df: pd.DataFrame, stats: dict):
         """Handle processing completion"""
         self.processing = False
+        self.close_log_file()
         self.process_btn.configure(state='normal', text="▶ Start Processing")
 
         self.results_data = results_df
@@ -2638,23 +3664,56 @@ Return JSON:
     def on_processing_error(self, error_msg: str):
         """Handle processing error"""
         self.processing = False
+        self.close_log_file()
         self.process_btn.configure(state='normal', text="▶ Start Processing")
         messagebox.showerror("Error", f"Processing failed:\n{error_msg}")
 
     def update_results_tree(self, df: pd.DataFrame):
-        """Update results treeview"""
-        self.results_tree.delete(*self.results_tree.get_children())
+        """Show results page by page (a large master is never inserted into the treeview at once)"""
+        self.results_pager = ResultsPager(df)
+        self.results_pager.set_query(self.results_search_var.get())
 
-        columns = list(df.columns)
+        columns = self.results_pager.columns
         self.results_tree['columns'] = columns
 
         for col in columns:
             self.results_tree.heading(col, text=col)
             self.results_tree.column(col, width=120, minwidth=80)
 
-        for idx, row in df.iterrows():
-            values = [str(v)[:100] if not pd.isna(v) else '' for v in row.values]
+        self.show_results_page(0)
+
+    def show_results_page(self, step: int = 0):
+        """Render the current page moved by step pages"""
+        pager = self.results_pager
+        if pager is None:
+            return
+        pager.go_to(pager.page + step)
+
+        self.results_tree.delete(*self.results_tree.get_children())
+        for values in pager.page_rows():
             self.results_tree.insert('', tk.END, values=values)
+        self.results_tree.yview_moveto(0)
+
+        total = len(pager.df)
+        shown = len(pager.matches)
+        suffix = f" of {total:,}" if shown != total else ""
+        self.results_page_label.configure(
+            text=f"Page {pager.page + 1:,} / {pager.page_count:,}  ({shown:,} rows{suffix})")
+        self.results_prev_btn.configure(state='normal' if pager.page > 0 else 'disabled')
+        self.results_next_btn.configure(state='normal' if pager.page < pager.page_count - 1 else 'disabled')
+
+    def schedule_results_search(self):
+        """Debounce typing in the search box"""
+        if self._results_search_job is not None:
+            self.root.after_cancel(self._results_search_job)
+        self._results_search_job = self.root.after(250, self.apply_results_search)
+
+    def apply_results_search(self):
+        self._results_search_job = None
+        if self.results_pager is None:
+            return
+        self.results_pager.set_query(self.results_search_var.get())
+        self.show_results_page(0)
 
     def export_results(self):
         """Export results to CSV"""
@@ -2680,6 +3739,10 @@ Return JSON:
 # Main Entry Point
 ###########
 def main():
+    if tk is None:
+        print("tkinter is not available; use run_supplier_master_generator.py on headless hosts",
+              file=sys.stderr)
+        sys.exit(1)
     root = tk.Tk()
 
     # Set theme
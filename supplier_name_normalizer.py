@@ -2,14 +2,29 @@ import csv
 import json
 import re
 import time
-import unicodedata
 import logging
+from difflib import SequenceMatcher
+from array import array
 from collections import defaultdict
 from dataclasses import dataclass, field, asdict
 from pathlib import Path
-from typing import Optional
-
-import requests
+from typing import Iterable, Optional
+
+from etl.column_stream import DEFAULT_CHUNK_ROWS, NO_ENTRY, ColumnChunkReader, RaggedRowsError, RowIndexSpill
+from etl.gemini_transport import generate_content_url, post_json
+from etl.llm_cache import get_default_cache, make_cache_key
+from etl.llm_executor import LLMExecutor, TokenBucket
+from etl.llm_retry import (
+    AIMDController, LLMHTTPError, RetryPolicy, call_with_retry, is_retryable, retry_after_from_response,
+)
+from etl.llm_telemetry import LLMTelemetry, format_summary, get_default_telemetry, set_default_telemetry
+from etl.name_cleaning import GroupingNameCleaner
+
+try:
+    from etl.ngram_similarity import NgramIndex, NGRAM_BACKEND_AVAILABLE
+except ImportError:
+    NgramIndex = None
+    NGRAM_BACKEND_AVAILABLE = False
 
 # ========================================
 # LOGGING
@@ -172,11 +187,14 @@ COMMON_FIRST_WORDS = {
 }
 
 
+# Shared cleaning engine (etl/name_cleaning.py) with this module's vocabularies
+NAME_CLEANER = GroupingNameCleaner(LEGAL_SUFFIXES, STRIP_PREFIX_WORDS)
+
 # ========================================
 # DATA CLASSES
 # ========================================
 
-@dataclass
+@dataclass(slots=True)
 class NormalizationResult:
     """Single supplier name normalization result."""
     original: str
@@ -188,7 +206,7 @@ class NormalizationResult:
     count: int           # number of raw rows this cleaned name represents
 
 
-@dataclass
+@dataclass(slots=True)
 class EntityClassification:
     """Person vs Organization classification result."""
     type: str            # individual | organization | unknown
@@ -196,23 +214,60 @@ class EntityClassification:
     reason: str          # rule that triggered the classification
 
 
-@dataclass
 class UniqueNameEntry:
-    """Internal tracking for a unique cleaned name."""
-    cleaned: str
-    originals: dict      # raw_name -> count
-    indices: list
-    entity_type: str = "unknown"
-    is_individual: bool = False
+    """
+    Internal tracking for a unique cleaned name.
+
+    Row indices live in an array('I') (4 bytes per row instead of a list slot
+    plus an int object), and the raw-form counter is only created once a
+    second spelling shows up; most names only ever have one. Token groups,
+    batches and the auto-merge tier pass these entries around by reference.
+    In streaming mode indices is None and the rows are in the normalizer's
+    RowIndexSpill under this entry's ordinal.
+    """
+    __slots__ = (
+        "cleaned", "first_original", "variants", "indices", "row_count", "ordinal",
+        "entity_type", "is_individual", "_best",
+    )
+
+    def __init__(self, cleaned: str, first_original: str, ordinal: int = 0, track_indices: bool = True):
+        self.cleaned = cleaned
+        self.first_original = first_original
+        self.variants: Optional[dict] = None    # raw_name -> count, once there are 2+ raw forms
+        self.indices = array("I") if track_indices else None
+        self.row_count = 0
+        self.ordinal = ordinal                  # position in the unique map
+        self.entity_type = "unknown"
+        self.is_individual = False
+        self._best: Optional[str] = first_original
+
+    def add(self, index: int, raw: str):
+        """Record one raw row of this cleaned name."""
+        if self.indices is not None:
+            self.indices.append(index)
+        self.row_count += 1
+        if self.variants is None:
+            if raw == self.first_original:
+                return
+            self.variants = {self.first_original: self.row_count - 1}
+        self.variants[raw] = self.variants.get(raw, 0) + 1
+        self._best = None
+
+    @property
+    def originals(self) -> dict:
+        """raw_name -> count."""
+        return self.variants if self.variants is not None else {self.first_original: self.row_count}
 
     @property
     def best_original(self) -> str:
         """Most frequently occurring raw form."""
-        return max(self.originals, key=self.originals.get)
+        if self._best is None:
+            self._best = max(self.variants, key=self.variants.get)
+        return self._best
 
     @property
     def total_count(self) -> int:
-        return len(self.indices)
+        return self.row_count
 
 
 # ========================================
@@ -231,41 +286,12 @@ def clean_name(raw: str) -> str:
     - Remove legal suffixes from end
     - Remove filler prefix words (the, a, an, etc.)
     """
-    if not raw:
-        return ""
-    s = str(raw).strip()
-    # Skip if looks like a number, date, or blank
-    if re.match(r"^\d+$", s) or len(s) < 2:
-        return ""
-    # Normalize unicode
-    s = unicodedata.normalize("NFKD", s)
-    s = re.sub(r"[\u0300-\u036f]", "", s)
-    # Lowercase
-    s = s.lower()
-    # Replace & with and
-    s = s.replace("&", " and ")
-    # Normalize common patterns
-    s = re.sub(r"\bdba\b", "", s)           # "doing business as"
-    s = re.sub(r"\bd/b/a\b", "", s)
-    s = re.sub(r"\baka\b", "", s)
-    s = re.sub(r"\ba/k/a\b", "", s)
-    s = re.sub(r"\bfka\b", "", s)           # "formerly known as"
-    s = re.sub(r"\bc/o\b", "", s)           # "care of"
-    s = re.sub(r"\battn\b", "", s)
-    # Remove common punctuation but keep alphanumeric, spaces, hyphens
-    s = re.sub(r"[^\w\s-]", " ", s)
-    # Remove standalone single digits/short numbers (like account codes)
-    s = re.sub(r"\b\d{1,3}\b", " ", s)
-    # Collapse whitespace
-    s = re.sub(r"\s+", " ", s).strip()
-    # Remove legal suffixes from end
-    tokens = s.split(" ")
-    while len(tokens) > 1 and tokens[-1] in LEGAL_SUFFIXES:
-        tokens.pop()
-    # Remove filler prefix words (the, a, an, etc.)
-    while len(tokens) > 1 and tokens[0] in STRIP_PREFIX_WORDS:
-        tokens.pop(0)
-    return " ".join(tokens).strip()
+    return NAME_CLEANER.clean(raw)
+
+
+def clean_names(raw_names: list[str]) -> list[str]:
+    """clean_name() over a whole column; duplicate names are only cleaned once."""
+    return NAME_CLEANER.clean_many(raw_names)
 
 
 def classify_entity(raw_name: str) -> EntityClassification:
@@ -369,27 +395,249 @@ def get_group_key(cleaned: str) -> str:
     return key
 
 
-def build_groups(names: list[UniqueNameEntry]) -> dict[str, list]:
+def build_groups(names: list[UniqueNameEntry]) -> dict[str, list[UniqueNameEntry]]:
     """
     Build token groups from unique name entries.
-    Returns dict of group_key -> list of {original, cleaned, count, indices}.
+    Returns dict of group_key -> list of UniqueNameEntry (shared, not copied).
     """
     groups: dict[str, list] = defaultdict(list)
     for entry in names:
-        key = get_group_key(entry.cleaned)
-        groups[key].append({
-            "original": entry.best_original,
-            "cleaned": entry.cleaned,
-            "count": entry.total_count,
-            "indices": entry.indices,
-        })
+        groups[get_group_key(entry.cleaned)].append(entry)
     return dict(groups)
 
 
+def merge_similar_groups(
+    groups: dict[str, list],
+    min_similarity: float = 0.85,
+    top_k: int = 5,
+    max_group_size: Optional[int] = None,
+) -> dict[str, list]:
+    """
+    Merge token groups whose members are char-trigram near neighbours.
+
+    Token grouping keys on the first word(s), so "Intl Business Machines" and
+    "International Business Machines" never reach the same LLM batch. This picks
+    candidate pairs with a TF-IDF cosine >= min_similarity (top_k per name) and
+    unions their groups, skipping merges that would exceed max_group_size.
+    The merged group keeps the key of its largest member group.
+    """
+    keys = list(groups)
+    members_flat = []
+    for gi, key in enumerate(keys):
+        for m in groups[key]:
+            members_flat.append((gi, m.cleaned))
+    if len(members_flat) < 2:
+        return groups
+
+    parent = list(range(len(keys)))
+    sizes = [len(groups[key]) for key in keys]
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    index = NgramIndex([cleaned for _, cleaned in members_flat])
+    pairs = index.candidate_pairs(k=top_k, min_similarity=min_similarity)
+    # Strongest links first so size caps keep the best merges
+    pairs.sort(key=lambda p: (-p[2], p[0], p[1]))
+    for i, j, _score in pairs:
+        a, b = find(members_flat[i][0]), find(members_flat[j][0])
+        if a == b:
+            continue
+        if max_group_size is not None and sizes[a] + sizes[b] > max_group_size:
+            continue
+        if (sizes[b], -b) > (sizes[a], -a):
+            a, b = b, a
+        parent[b] = a
+        sizes[a] += sizes[b]
+
+    merged: dict[str, list] = {}
+    roots: dict[int, str] = {}
+    for gi, key in enumerate(keys):
+        root = find(gi)
+        if root not in roots:
+            roots[root] = keys[root]
+            merged[keys[root]] = []
+        merged[roots[root]].extend(groups[key])
+    return merged
+
+
+NON_ALNUM = re.compile(r"[^0-9a-z]+")
+SINGLE_LETTER_RUN = re.compile(r"\b(?:[a-z] ){1,}[a-z]\b")
+DIGITS = re.compile(r"\d+")
+# Tokens ignored by the suffix-insensitive key (clean_name already strips most trailing suffixes)
+AUTO_MERGE_IGNORED_TOKENS = STRONG_LEGAL_SUFFIXES | {"co", "company", "and", "kg", "ohg", "kgaa", "the"}
+
+
+def suffix_insensitive_key(cleaned: str) -> str:
+    """
+    Cleaned name without punctuation, spacing or legal-form tokens anywhere in
+    the name: "acme steel l l c", "acme-steel", "acme steel gmbh and" -> "acmesteel".
+    """
+    text = NON_ALNUM.sub(" ", cleaned.lower())
+    # "l l c" -> "llc" so dotted abbreviations match their legal-form token
+    text = SINGLE_LETTER_RUN.sub(lambda m: m.group(0).replace(" ", ""), text)
+    tokens = [t for t in text.split() if t not in AUTO_MERGE_IGNORED_TOKENS]
+    return "".join(tokens) or NON_ALNUM.sub("", cleaned)
+
+
+def auto_merge_members(
+    members: list[UniqueNameEntry],
+    threshold: float = 0.95,
+    window: int = 4,
+) -> tuple[list[UniqueNameEntry], dict[str, list[UniqueNameEntry]]]:
+    """
+    Deterministic resolution tier run before the LLM.
+
+    Members are merged when their suffix-insensitive keys are equal, or when
+    the keys score >= threshold (difflib ratio) with the same numbers and
+    neither name looks like an individual. Candidate pairs for the score come
+    from a sorted-neighbourhood window plus char-trigram neighbours when
+    numpy/scipy are available.
+
+    Returns (representatives, merged): both hold the members' UniqueNameEntry
+    objects (not copies), and merged maps a representative's best original
+    name to the entries folded into it. The representative is the
+    member with the highest row count (first on ties); only representatives
+    need to go to the LLM.
+    """
+    keys = [suffix_insensitive_key(m.cleaned) for m in members]
+    parent = list(range(len(members)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i: int, j: int):
+        a, b = find(i), find(j)
+        if a != b:
+            parent[max(a, b)] = min(a, b)
+
+    first_with_key: dict[str, int] = {}
+    for i, key in enumerate(keys):
+        if key in first_with_key:
+            union(first_with_key[key], i)
+        else:
+            first_with_key[key] = i
+
+    if threshold < 1.0 and len(first_with_key) > 1:
+        distinct = sorted(first_with_key)
+        candidates = {
+            (distinct[a], distinct[b])
+            for a in range(len(distinct))
+            for b in range(a + 1, min(a + 1 + window, len(distinct)))
+        }
+        if NGRAM_BACKEND_AVAILABLE and len(distinct) > window:
+            for a, b, _score in NgramIndex(distinct).candidate_pairs(k=5, min_similarity=0.8):
+                candidates.add((distinct[a], distinct[b]))
+        individual: dict[str, bool] = {}
+
+        def is_individual(key: str) -> bool:
+            if key not in individual:
+                individual[key] = members[first_with_key[key]].is_individual
+            return individual[key]
+
+        for key_a, key_b in sorted(candidates):
+            if DIGITS.findall(key_a) != DIGITS.findall(key_b):
+                continue
+            matcher = SequenceMatcher(None, key_a, key_b)
+            if matcher.real_quick_ratio() < threshold or matcher.quick_ratio() < threshold:
+                continue
+            if matcher.ratio() >= threshold and not is_individual(key_a) and not is_individual(key_b):
+                union(first_with_key[key_a], first_with_key[key_b])
+
+    components: dict[int, list[UniqueNameEntry]] = {}
+    for i, m in enumerate(members):
+        components.setdefault(find(i), []).append(m)
+    representatives = []
+    merged: dict[str, list[UniqueNameEntry]] = {}
+    for same in components.values():
+        representative = max(same, key=lambda m: m.total_count)
+        representatives.append(representative)
+        if len(same) > 1:
+            merged[representative.best_original] = [m for m in same if m is not representative]
+    return representatives, merged
+
+
+def sub_block_group(
+    members: list[UniqueNameEntry],
+    batch_size: int,
+    min_similarity: float = 0.6,
+    window: int = 4,
+) -> list[list[UniqueNameEntry]]:
+    """
+    Split an oversized token group into LLM batches of likely co-referent names.
+
+    Names are linked when they are char-trigram neighbours (cosine >=
+    min_similarity, needs numpy/scipy) or, without that backend, when they
+    sit within `window` places of each other in sorted order and difflib
+    rates them as similar (sorted-neighbourhood blocking). Links that would
+    grow a component past batch_size are skipped, and components are packed
+    whole into batches first-fit decreasing, so batches stay full. Batches
+    hold the members' UniqueNameEntry objects; each member is in exactly one.
+    """
+    if len(members) <= batch_size:
+        return [members]
+    ordered = sorted(members, key=lambda m: m.cleaned)
+    parent = list(range(len(ordered)))
+    sizes = [1] * len(ordered)
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    if NGRAM_BACKEND_AVAILABLE:
+        pairs = NgramIndex([m.cleaned for m in ordered]).candidate_pairs(k=5, min_similarity=min_similarity)
+        pairs.sort(key=lambda p: (-p[2], p[0], p[1]))
+        links = [(i, j) for i, j, _score in pairs]
+    else:
+        links = [
+            (i, j)
+            for i in range(len(ordered))
+            for j in range(i + 1, min(i + 1 + window, len(ordered)))
+            if SequenceMatcher(None, ordered[i].cleaned, ordered[j].cleaned).ratio() >= min_similarity
+        ]
+    for i, j in links:
+        a, b = find(i), find(j)
+        # Components never grow past one batch, so one popular token cannot chain the whole group
+        if a == b or sizes[a] + sizes[b] > batch_size:
+            continue
+        if b < a:
+            a, b = b, a
+        parent[b] = a
+        sizes[a] += sizes[b]
+
+    components: dict[int, list[UniqueNameEntry]] = {}
+    for i, m in enumerate(ordered):
+        components.setdefault(find(i), []).append(m)
+    # Largest first; ties by first name so the plan is deterministic
+    pieces = sorted(components.values(), key=lambda c: (-len(c), c[0].cleaned))
+    batches: list[list[UniqueNameEntry]] = []
+    for piece in pieces:
+        for batch in batches:
+            if len(batch) + len(piece) <= batch_size:
+                batch.extend(piece)
+                break
+        else:
+            batches.append(list(piece))
+    return batches
+
+
 # ========================================
 # GEMINI API
 # ========================================
 
+# Token estimate per clustering call for the --tpm budget: prompt instructions,
+# plus ~4 chars per name in, plus the JSON cluster entry each name produces
+PROMPT_OVERHEAD_TOKENS = 250
+COMPLETION_TOKENS_PER_NAME = 12
+
 def safe_parse_json(text: str) -> dict:
     """
     Robust JSON parser with 4 fallback strategies to handle
@@ -450,17 +698,24 @@ def call_gemini(
     names: list[str],
     api_key: str,
     model: str = "gemini-2.5-flash",
+    use_cache: bool = True,
+    retry_policy: Optional[RetryPolicy] = None,
+    on_retry: Optional[callable] = None,
+    controller: Optional[AIMDController] = None,
 ) -> dict:
     """
     Send a batch of supplier names to Gemini for clustering.
     
     Returns dict with 'clusters' key containing list of:
     {"canonical": str, "members": [int], "confidence": str}
+
+    Responses are served from / stored in the on-disk LLM cache unless
+    use_cache is False. 429/5xx and connection errors are retried with
+    backoff under retry_policy (etl/llm_retry.py), with in-flight calls
+    limited by controller (an AIMDController) when given; each attempt is
+    recorded as stage "name_clustering" by the installed LLM telemetry.
     """
-    url = (
-        f"https://generativelanguage.googleapis.com/v1beta/models/{model}"
-        f":generateContent?key={api_key}"
-    )
+    url = generate_content_url(model)
     
     # Escape any quotes in names to prevent JSON issues
     safe_names = [re.sub(r'"', " ", n).strip() for n in names]
@@ -495,17 +750,50 @@ confidence: high/medium/low. Singletons get their own cluster."""
         },
     }
     
-    response = requests.post(url, json=payload, timeout=120)
-    
-    if not response.ok:
+    telemetry = get_default_telemetry()
+    cache = get_default_cache() if use_cache else None
+    cache_key = None
+    if cache is not None:
+        cache_key = make_cache_key(
+            model, prompt, payload["generationConfig"]["temperature"], False,
+            generation_config=payload["generationConfig"],
+        )
+        cached = cache.get(cache_key)
+        if cached is not None:
+            if telemetry is not None:
+                telemetry.record("name_clustering", model, cached=True)
+            return cached
+
+    def send(attempt: int) -> dict:
+        status = None
+        usage = None
+        error = None
+        started = time.perf_counter()
         try:
-            err = response.json()
-            msg = err.get("error", {}).get("message", response.reason)
-        except Exception:
-            msg = response.reason
-        raise RuntimeError(f"Gemini API error {response.status_code}: {msg}")
-    
-    data = response.json()
+            response = post_json(url, payload, timeout=120, api_key=api_key)
+            status = response.status_code
+
+            if not response.ok:
+                try:
+                    err = response.json()
+                    msg = err.get("error", {}).get("message", response.reason)
+                except Exception:
+                    msg = response.reason
+                raise LLMHTTPError(response.status_code, f"Gemini API error {response.status_code}: {msg}",
+                                   retry_after_from_response(response))
+
+            data = response.json()
+            usage = data.get("usageMetadata")
+            return data
+        except Exception as err:
+            error = str(err)
+            raise
+        finally:
+            if telemetry is not None:
+                telemetry.record("name_clustering", model, time.perf_counter() - started, status, usage,
+                                 retries=attempt, error=error)
+
+    data = call_with_retry(send, retry_policy, controller=controller, on_retry=on_retry)
     text = (
         data.get("candidates", [{}])[0]
         .get("content", {})
@@ -515,7 +803,10 @@ confidence: high/medium/low. Singletons get their own cluster."""
     if not text:
         raise RuntimeError("Empty response from Gemini")
     
-    return safe_parse_json(text)
+    result = safe_parse_json(text)
+    if cache is not None and result and result.get("clusters"):
+        cache.put(cache_key, result, model)
+    return result
 
 
 # ========================================
@@ -543,6 +834,15 @@ class SupplierNormalizer:
         max_retries: int = 3,
         delay_between_calls: float = 0.5,
         progress_callback: Optional[callable] = None,
+        ngram_merge: bool = False,
+        ngram_min_similarity: float = 0.85,
+        use_cache: bool = True,
+        concurrency: int = 1,
+        rpm_limit: Optional[int] = None,
+        tpm_limit: Optional[int] = None,
+        sub_blocking: bool = True,
+        auto_merge: bool = True,
+        auto_merge_threshold: float = 0.95,
     ):
         self.api_key = api_key
         self.model = model
@@ -551,6 +851,25 @@ class SupplierNormalizer:
         self.max_retries = max_retries
         self.delay_between_calls = delay_between_calls
         self.progress_callback = progress_callback
+        self.ngram_merge = ngram_merge
+        self.ngram_min_similarity = ngram_min_similarity
+        self.use_cache = use_cache
+        # Deterministic merge tier ahead of the LLM (equal / suffix-insensitive / >= threshold names)
+        self.auto_merge = auto_merge
+        self.auto_merge_threshold = auto_merge_threshold
+        # Batch oversized groups by similarity (not arbitrary slices)
+        self.sub_blocking = sub_blocking
+        # Batches in flight at once, and the request / token per-minute budget they share
+        self.concurrency = max(1, int(concurrency))
+        self.rpm_limit = rpm_limit
+        self.tpm_limit = tpm_limit
+        self._rpm_bucket = TokenBucket(rpm_limit) if rpm_limit else None
+        # Up to ~10 s of token budget may be spent in a burst
+        self._tpm_bucket = TokenBucket(tpm_limit, burst=max(1, tpm_limit // 6)) if tpm_limit else None
+        # HTTP-level retries (429/5xx/connection) with backoff and Retry-After
+        self.retry_policy = RetryPolicy(max_attempts=max(1, max_retries))
+        # Row -> unique-name ordinal of the last streaming run (see normalize_chunks)
+        self.row_index: Optional[RowIndexSpill] = None
 
     def _log(self, msg: str, level: str = "info"):
         """Log a message and optionally call progress callback."""
@@ -568,27 +887,62 @@ class SupplierNormalizer:
 
         unique_map: dict[str, UniqueNameEntry] = {}
 
-        for i, raw in enumerate(raw_names):
-            raw = str(raw).strip() if raw else ""
-            if not raw:
-                continue
-            cleaned = clean_name(raw)
+        for i, (raw, cleaned) in enumerate(zip(raw_names, clean_names(raw_names))):
             if not cleaned:
                 continue
+            raw = str(raw).strip()
 
-            if cleaned not in unique_map:
-                unique_map[cleaned] = UniqueNameEntry(
-                    cleaned=cleaned, originals={}, indices=[]
-                )
-            entry = unique_map[cleaned]
-            entry.originals[raw] = entry.originals.get(raw, 0) + 1
-            entry.indices.append(i)
+            entry = unique_map.get(cleaned)
+            if entry is None:
+                entry = unique_map[cleaned] = UniqueNameEntry(cleaned, raw, len(unique_map))
+            entry.add(i, raw)
 
         self._log(
             f"Extracted {len(raw_names):,} rows -> {len(unique_map):,} unique cleaned names",
         )
         return unique_map
 
+    def _extract_and_clean_chunks(
+        self, chunks: Iterable[list[str]], spill: RowIndexSpill,
+    ) -> dict[str, UniqueNameEntry]:
+        """
+        Streaming Stage 1: fold chunks of raw names into the unique map as they
+        arrive. Each distinct raw value is cleaned once; row positions go to
+        the spill instead of the entries.
+        """
+        self._log("Stage 1: Streaming and cleaning supplier names...")
+
+        unique_map: dict[str, UniqueNameEntry] = {}
+        # raw value -> its entry (None for names that clean to nothing)
+        by_raw: dict[str, Optional[UniqueNameEntry]] = {}
+
+        for chunk in chunks:
+            new_values = [v for v in dict.fromkeys(chunk) if v not in by_raw]
+            for raw, cleaned in zip(new_values, clean_names(new_values)):
+                entry = None
+                if cleaned:
+                    entry = unique_map.get(cleaned)
+                    if entry is None:
+                        entry = unique_map[cleaned] = UniqueNameEntry(
+                            cleaned, str(raw).strip(), len(unique_map), track_indices=False
+                        )
+                by_raw[raw] = entry
+
+            ordinals = array("I")
+            for raw in chunk:
+                entry = by_raw[raw]
+                if entry is None:
+                    ordinals.append(NO_ENTRY)
+                else:
+                    entry.add(0, str(raw).strip())
+                    ordinals.append(entry.ordinal)
+            spill.extend(ordinals)
+
+        self._log(
+            f"Extracted {spill.rows:,} rows -> {len(unique_map):,} unique cleaned names",
+        )
+        return unique_map
+
     # ----- Stage 1.5: Entity Classification -----
 
     def _classify_entities(self, unique_map: dict[str, UniqueNameEntry]) -> int:
@@ -616,7 +970,7 @@ class SupplierNormalizer:
 
     def _build_token_groups(
         self, unique_names: list[UniqueNameEntry]
-    ) -> tuple[list[tuple[str, list]], list[tuple[str, list]]]:
+    ) -> tuple[list[tuple[str, list[UniqueNameEntry]]], list[tuple[str, list[UniqueNameEntry]]]]:
         """
         Build token groups, split into LLM groups and singleton groups.
         Returns (llm_groups, singleton_groups) each as list of (key, members).
@@ -625,6 +979,21 @@ class SupplierNormalizer:
 
         groups = build_groups(unique_names)
 
+        if self.ngram_merge:
+            if not NGRAM_BACKEND_AVAILABLE:
+                self._log("N-gram merge requested but numpy/scipy are not installed; skipping", "warning")
+            else:
+                before = len(groups)
+                groups = merge_similar_groups(
+                    groups,
+                    min_similarity=self.ngram_min_similarity,
+                    max_group_size=self.batch_size,
+                )
+                self._log(
+                    f"N-gram merge (cosine >= {self.ngram_min_similarity}): "
+                    f"{before:,} -> {len(groups):,} groups"
+                )
+
         llm_groups = [
             (k, members)
             for k, members in groups.items()
@@ -653,43 +1022,52 @@ class SupplierNormalizer:
 
     # ----- Stage 3: LLM Clustering -----
 
-    def _process_singletons(self, singleton_groups: list[tuple[str, list]]) -> list[NormalizationResult]:
+    def _process_singletons(
+        self, singleton_groups: list[tuple[str, list[UniqueNameEntry]]]
+    ) -> list[NormalizationResult]:
         """Process singleton groups (no API needed)."""
         results = []
         for _key, members in singleton_groups:
             for m in members:
-                entity_class = classify_entity(m["original"])
                 results.append(NormalizationResult(
-                    original=m["original"],
-                    normalized=m["original"],  # Keep as-is
-                    individual=entity_class.type == "individual",
-                    cluster=f"S-{m['cleaned'][:20]}",
+                    original=m.best_original,
+                    normalized=m.best_original,  # Keep as-is
+                    individual=m.is_individual,
+                    cluster=f"S-{m.cleaned[:20]}",
                     confidence="auto",
                     method="singleton",
-                    count=m["count"],
+                    count=m.total_count,
                 ))
         return results
 
     def _process_llm_batch(
         self,
-        batch: list[dict],
+        batch: list[UniqueNameEntry],
         group_key: str,
         batch_idx: int,
         clusters_found: int,
+        controller: Optional[AIMDController] = None,
     ) -> tuple[list[NormalizationResult], int, int]:
         """
-        Send a single batch to Gemini and parse results.
+        Send a single batch (UniqueNameEntry members) to Gemini and parse results.
         Returns (results, new_clusters_found, api_calls_made).
         """
         results = []
-        batch_names = [m["original"] for m in batch]
+        batch_names = [m.best_original for m in batch]
         retries = 0
         api_calls = 0
 
         while retries < self.max_retries:
             try:
                 api_calls += 1
-                result = call_gemini(batch_names, self.api_key, self.model)
+                result = call_gemini(
+                    batch_names, self.api_key, self.model, use_cache=self.use_cache,
+                    retry_policy=self.retry_policy,
+                    controller=controller,
+                    on_retry=lambda attempt, delay, err: self._log(
+                        f"{err}. Waiting {delay:.1f}s... "
+                        f"(retry {attempt}/{self.retry_policy.max_attempts - 1})", "warning"),
+                )
 
                 if result and "clusters" in result:
                     assigned_indices: set[int] = set()
@@ -706,15 +1084,14 @@ class SupplierNormalizer:
                         for idx in member_indices:
                             if 0 <= idx < len(batch) and idx not in assigned_indices:
                                 assigned_indices.add(idx)
-                                entity_class = classify_entity(batch[idx]["original"])
                                 results.append(NormalizationResult(
-                                    original=batch[idx]["original"],
+                                    original=batch[idx].best_original,
                                     normalized=canonical,
-                                    individual=entity_class.type == "individual",
+                                    individual=batch[idx].is_individual,
                                     cluster=f"C-{clusters_found}",
                                     confidence=conf,
                                     method="llm-cluster" if len(member_indices) > 1 else "llm-singleton",
-                                    count=batch[idx]["count"],
+                                    count=batch[idx].total_count,
                                 ))
                 else:
                     assigned_indices = set()
@@ -722,15 +1099,14 @@ class SupplierNormalizer:
                 # Recover any names Gemini forgot to assign
                 for mi in range(len(batch)):
                     if mi not in assigned_indices:
-                        entity_class = classify_entity(batch[mi]["original"])
                         results.append(NormalizationResult(
-                            original=batch[mi]["original"],
-                            normalized=batch[mi]["original"],
-                            individual=entity_class.type == "individual",
-                            cluster=f"S-{batch[mi]['cleaned'][:20]}",
+                            original=batch[mi].best_original,
+                            normalized=batch[mi].best_original,
+                            individual=batch[mi].is_individual,
+                            cluster=f"S-{batch[mi].cleaned[:20]}",
                             confidence="auto",
                             method="llm-missed",
-                            count=batch[mi]["count"],
+                            count=batch[mi].total_count,
                         ))
 
                 return results, clusters_found, api_calls
@@ -739,19 +1115,17 @@ class SupplierNormalizer:
                 retries += 1
                 err_msg = str(err)
 
-                if "429" in err_msg or "quota" in err_msg:
-                    wait = retries * 10
+                # HTTP and connection errors were already retried inside call_gemini
+                if is_retryable(err):
+                    retries = self.max_retries
+
+                if retries < self.max_retries:
+                    wait = self.retry_policy.backoff(retries - 1)
                     self._log(
-                        f"Rate limited. Waiting {wait}s... (retry {retries}/{self.max_retries})",
+                        f'Error on group "{group_key}" batch {batch_idx + 1}: {err_msg}. Retrying in {wait:.1f}s...',
                         "warning",
                     )
                     time.sleep(wait)
-                elif retries < self.max_retries:
-                    self._log(
-                        f'Error on group "{group_key}" batch {batch_idx + 1}: {err_msg}. Retrying...',
-                        "warning",
-                    )
-                    time.sleep(2)
                 else:
                     self._log(
                         f'Failed group "{group_key}" after {self.max_retries} retries: {err_msg}',
@@ -759,26 +1133,57 @@ class SupplierNormalizer:
                     )
                     # Fallback: keep originals
                     for m in batch:
-                        entity_class = classify_entity(m["original"])
                         results.append(NormalizationResult(
-                            original=m["original"],
-                            normalized=m["original"],
-                            individual=entity_class.type == "individual",
+                            original=m.best_original,
+                            normalized=m.best_original,
+                            individual=m.is_individual,
                             cluster="ERR",
                             confidence="error",
                             method="fallback",
-                            count=m["count"],
+                            count=m.total_count,
                         ))
                     return results, clusters_found, api_calls
 
         return results, clusters_found, api_calls
 
+    def _estimate_batch_tokens(self, batch: list[UniqueNameEntry]) -> int:
+        """Rough prompt + completion tokens of one clustering call (~4 chars/token), for the TPM budget."""
+        name_chars = sum(len(m.best_original) + 6 for m in batch)
+        return PROMPT_OVERHEAD_TOKENS + name_chars // 4 + COMPLETION_TOKENS_PER_NAME * len(batch)
+
+    def _dispatch_batch(
+        self, batch: list[UniqueNameEntry], group_key: str, batch_idx: int, auto_merged: bool = False,
+        controller: Optional[AIMDController] = None,
+    ) -> tuple[list[NormalizationResult], int, int]:
+        """
+        One batch under the RPM/TPM budget; cluster numbers are local to the batch (from 0).
+        auto_merged: a lone name is the representative of an auto-merged group.
+        """
+        if len(batch) < 2:
+            # Nothing to compare (e.g. the rest of the group was auto-merged into this name)
+            results = self._process_singletons([(group_key, batch)])
+            if auto_merged:
+                for r in results:
+                    r.cluster = f"A-{batch[0].cleaned[:20]}"
+                    r.confidence = "high"
+                    r.method = "auto-merge"
+            return results, 0, 0
+        if self._rpm_bucket is not None:
+            self._rpm_bucket.acquire()
+        if self._tpm_bucket is not None:
+            self._tpm_bucket.acquire(cost=self._estimate_batch_tokens(batch))
+        return self._process_llm_batch(batch, group_key, batch_idx, 0, controller)
+
     def _process_llm_groups(
-        self, llm_groups: list[tuple[str, list]]
+        self, llm_groups: list[tuple[str, list[UniqueNameEntry]]]
     ) -> tuple[list[NormalizationResult], int, int, int]:
         """
         Process all LLM groups through Gemini.
         Returns (results, clusters_found, total_api_calls, errors).
+
+        With concurrency > 1 up to that many batches are in flight. Results are
+        merged in dispatch order and cluster IDs are renumbered then, so output
+        and IDs are the same as a sequential run whatever order calls finish in.
         """
         self._log("Stage 3: Sending groups to Gemini for entity clustering...")
 
@@ -789,18 +1194,77 @@ class SupplierNormalizer:
         total_names = sum(len(members) for _, members in llm_groups)
         names_processed = 0
 
+        # Split large groups into batches
+        jobs = []
+        merged: dict[str, list[UniqueNameEntry]] = {}
+        sliced_batches = 0
+        resolved_groups = 0
         for gi, (group_key, members) in enumerate(llm_groups):
-            # Split large groups into batches
-            batches = [
-                members[i : i + self.batch_size]
-                for i in range(0, len(members), self.batch_size)
-            ]
-
+            sliced_batches += -(-len(members) // self.batch_size)
+            # Deterministic tier: only representatives of what it could not settle go to Gemini
+            representatives = members
+            if self.auto_merge:
+                representatives, group_merged = auto_merge_members(members, self.auto_merge_threshold)
+                merged.update(group_merged)
+                resolved_groups += len(representatives) == 1
+            if self.sub_blocking:
+                batches = sub_block_group(representatives, self.batch_size)
+            else:
+                batches = [
+                    representatives[i : i + self.batch_size]
+                    for i in range(0, len(representatives), self.batch_size)
+                ]
             for bi, batch in enumerate(batches):
-                batch_results, clusters_found, api_calls = self._process_llm_batch(
-                    batch, group_key, bi, clusters_found
-                )
+                jobs.append((gi, group_key, len(members), bi, len(batches), batch))
+        if self.auto_merge:
+            self._log(
+                f"Auto-merge: {sum(len(m) for m in merged.values()):,} names merged deterministically, "
+                f"{resolved_groups:,} of {len(llm_groups):,} groups fully resolved without the LLM"
+            )
+        llm_jobs = sum(1 for job in jobs if len(job[5]) > 1)
+        self._log(f"{llm_jobs:,} LLM batches (plain slicing: {sliced_batches:,})")
+
+        sequential = self.concurrency <= 1
+        if not sequential:
+            self._log(f"Dispatching {len(jobs):,} batches with concurrency {self.concurrency}"
+                      + (f", {self.rpm_limit} RPM" if self.rpm_limit else "")
+                      + (f", {self.tpm_limit:,} TPM" if self.tpm_limit else ""))
+        # This run's own in-flight limit, passed down to call_gemini (not installed process-wide)
+        controller = AIMDController(self.concurrency)
+        # The workers share the normalizer's own RPM bucket (None: --rpm not set, unlimited)
+        executor = None if sequential else LLMExecutor(
+            max_workers=self.concurrency, rate_per_minute=None, bucket=self._rpm_bucket
+        )
+        try:
+            futures = [] if sequential else [
+                executor.submit(self._dispatch_batch, batch, group_key, bi, batch[0].best_original in merged,
+                                controller)
+                for _, group_key, _, bi, _, batch in jobs
+            ]
+            for ji, (gi, group_key, group_size, bi, n_batches, batch) in enumerate(jobs):
+                if sequential:
+                    batch_results, batch_clusters, api_calls = self._dispatch_batch(
+                        batch, group_key, bi, batch[0].best_original in merged, controller)
+                else:
+                    batch_results, batch_clusters, api_calls = futures[ji].result()
+                for r in batch_results:
+                    if r.cluster.startswith("C-"):
+                        r.cluster = f"C-{clusters_found + int(r.cluster[2:])}"
+                clusters_found += batch_clusters
                 results.extend(batch_results)
+                # Auto-merged names take their representative's outcome
+                for r in batch_results:
+                    for folded in merged.get(r.original, ()):
+                        results.append(NormalizationResult(
+                            original=folded.best_original,
+                            normalized=r.normalized,
+                            individual=folded.is_individual,
+                            cluster=r.cluster,
+                            confidence="high" if r.method == "auto-merge" else r.confidence,
+                            method="auto-merge",
+                            count=folded.total_count,
+                        ))
+                        names_processed += 1
                 total_api_calls += api_calls
 
                 # Check if there were fallback results (errors)
@@ -810,15 +1274,20 @@ class SupplierNormalizer:
                 names_processed += len(batch)
                 pct = names_processed / max(total_names, 1) * 100
 
-                if gi % 3 == 0 or bi == len(batches) - 1:
+                if gi % 3 == 0 or bi == n_batches - 1:
                     self._log(
-                        f'Group "{group_key}" ({len(members)} names) - '
-                        f"batch {bi + 1}/{len(batches)} ✓ [{pct:.0f}%]",
+                        f'Group "{group_key}" ({group_size} names) - '
+                        f"batch {bi + 1}/{n_batches} ✓ [{pct:.0f}%]",
                     )
 
-                # Small delay between calls to respect rate limits
-                if gi < len(llm_groups) - 1 or bi < len(batches) - 1:
+                # Small delay between calls to respect rate limits (the budget does this when concurrent)
+                if sequential and self._rpm_bucket is None and ji < len(jobs) - 1:
                     time.sleep(self.delay_between_calls)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+        if controller.throttles:
+            self._log(controller.summary(), "warning")
 
         return results, clusters_found, total_api_calls, errors
 
@@ -836,7 +1305,32 @@ class SupplierNormalizer:
         """
         # Stage 1: Extract & Clean
         unique_map = self._extract_and_clean(raw_names)
+        return self._normalize_unique(unique_map, len(raw_names))
 
+    def normalize_chunks(self, chunks: Iterable[list[str]], spill_dir: Optional[str] = None) -> list[NormalizationResult]:
+        """
+        Run the pipeline on raw names that arrive in chunks (e.g. streamed from
+        a large CSV) without holding every row in memory.
+
+        Row positions are written to self.row_index (a RowIndexSpill, replaced
+        on the next streaming run); use row_index.rows_for(entry.ordinal) to
+        get the rows of a unique name.
+
+        Args:
+            chunks: Iterable of lists of raw supplier name strings, in row order.
+            spill_dir: Directory for the temporary row index (default: system temp).
+
+        Returns:
+            List of NormalizationResult objects.
+        """
+        if self.row_index is not None:
+            self.row_index.close()
+        self.row_index = RowIndexSpill(spill_dir)
+        unique_map = self._extract_and_clean_chunks(chunks, self.row_index)
+        return self._normalize_unique(unique_map, self.row_index.rows)
+
+    def _normalize_unique(self, unique_map: dict[str, UniqueNameEntry], total_rows: int) -> list[NormalizationResult]:
+        """Stages 1.5-3 on the unique-name map built by Stage 1."""
         # Stage 1.5: Entity Classification
         self._classify_entities(unique_map)
 
@@ -860,12 +1354,15 @@ class SupplierNormalizer:
 
         self._log("=" * 50)
         self._log("NORMALIZATION COMPLETE")
-        self._log(f"Total rows: {len(raw_names):,}")
+        self._log(f"Total rows: {total_rows:,}")
         self._log(f"Unique names: {len(unique_map):,}")
         self._log(f"Clusters found: {clusters_found:,}")
         self._log(f"LLM clustered: {llm_clustered:,}")
         self._log(f"Individuals detected: {individuals:,}")
         self._log(f"API calls made: {api_calls}")
+        cache = get_default_cache() if self.use_cache else None
+        if cache is not None:
+            self._log(cache.summary())
         if errors > 0:
             self._log(f"Errors: {errors}", "error")
         self._log("=" * 50)
@@ -878,6 +1375,8 @@ class SupplierNormalizer:
         supplier_column: Optional[str] = None,
         supplier_column_index: Optional[int] = None,
         encoding: str = "utf-8",
+        streaming: bool = False,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
     ) -> list[NormalizationResult]:
         """
         Read a CSV file and normalize supplier names.
@@ -887,6 +1386,11 @@ class SupplierNormalizer:
             supplier_column: Name of the column containing supplier names.
             supplier_column_index: Index of the column (0-based) if name not provided.
             encoding: File encoding (default: utf-8).
+            streaming: Read the column in chunks (pyarrow when installed) and
+                spill row indices to disk; memory follows unique names, not rows.
+                Rows are read as in the default mode; a file with ragged rows
+                is re-read with the csv reader, which pyarrow cannot match.
+            chunk_rows: Approximate rows per chunk in streaming mode.
 
         Returns:
             List of NormalizationResult objects.
@@ -928,12 +1432,24 @@ class SupplierNormalizer:
             header_label = headers[col_idx].strip() if col_idx < len(headers) else f"index_{col_idx}"
             self._log(f"Using column {col_idx}: '{header_label}'")
 
+            if streaming:
+                reader = ColumnChunkReader(csv_path, col_idx, encoding, chunk_rows)
+                self._log(f"Streaming {reader.chunk_rows:,}-row chunks ({reader.backend} reader)")
+                try:
+                    return self.normalize_chunks(reader)
+                except RaggedRowsError:
+                    # Raised while streaming Stage 1, before any LLM call; csv.reader keeps ragged rows
+                    self._log("Rows with a field count unlike the header; re-reading with the csv reader", "warning")
+                    reader = ColumnChunkReader(csv_path, col_idx, encoding, chunk_rows, use_pyarrow=False)
+                    return self.normalize_chunks(reader)
+
+            # Repeated supplier names share one string object instead of one per row
+            seen: dict[str, str] = {}
             raw_names: list[str] = []
             for row in reader:
-                if col_idx < len(row):
-                    raw_names.append(row[col_idx])
-                else:
-                    raw_names.append("")
+                value = row[col_idx] if col_idx < len(row) else ""
+                raw_names.append(seen.setdefault(value, value))
+            del seen
 
             self._log(f"Loaded {len(raw_names):,} rows from CSV")
             return self.normalize(raw_names)
@@ -1004,9 +1520,31 @@ def main():
                         choices=["gemini-2.5-flash", "gemini-2.5-pro", "gemini-2.0-flash"],
                         help="Gemini model to use")
     parser.add_argument("--batch-size", type=int, default=50, help="Names per API call")
+    parser.add_argument("--no-auto-merge", action="store_true",
+                        help="Send every grouped name to the LLM (skip the deterministic merge tier)")
+    parser.add_argument("--auto-merge-threshold", type=float, default=0.95,
+                        help="Similarity at which the deterministic tier merges names without the LLM")
+    parser.add_argument("--no-sub-blocking", action="store_true",
+                        help="Slice oversized token groups in order instead of batching similar names together")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="LLM batches in flight at once (default: 1, sequential)")
+    parser.add_argument("--rpm", type=int, default=None, help="Max Gemini requests per minute across all batches")
+    parser.add_argument("--tpm", type=int, default=None, help="Max estimated Gemini tokens per minute")
     parser.add_argument("--min-group-size", type=int, default=2, help="Min group size to send to LLM")
     parser.add_argument("--output-dir", "-o", default=".", help="Output directory for CSV files")
     parser.add_argument("--encoding", default="utf-8", help="CSV file encoding")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Read the supplier column in chunks and spill row indices to disk (for very large files)")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS,
+                        help="Rows per chunk with --streaming")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Bypass the on-disk Gemini response cache")
+    parser.add_argument("--ngram-merge", action="store_true",
+                        help="Merge token groups with near-duplicate names (needs numpy/scipy)")
+    parser.add_argument("--ngram-threshold", type=float, default=0.85,
+                        help="Char-trigram cosine needed for --ngram-merge")
+    parser.add_argument("--telemetry", metavar="PATH",
+                        help="Record per-call LLM telemetry to this JSONL and print a per-stage summary")
     parser.add_argument("--verbose", "-v", action="store_true", help="Verbose logging")
 
     args = parser.parse_args()
@@ -1023,13 +1561,28 @@ def main():
         model=args.model,
         batch_size=args.batch_size,
         min_group_size=args.min_group_size,
+        ngram_merge=args.ngram_merge,
+        ngram_min_similarity=args.ngram_threshold,
+        use_cache=not args.no_cache,
+        concurrency=args.concurrency,
+        sub_blocking=not args.no_sub_blocking,
+        auto_merge=not args.no_auto_merge,
+        auto_merge_threshold=args.auto_merge_threshold,
+        rpm_limit=args.rpm,
+        tpm_limit=args.tpm,
     )
 
+    telemetry = LLMTelemetry(args.telemetry) if args.telemetry else None
+    if telemetry is not None:
+        set_default_telemetry(telemetry)
+
     results = normalizer.normalize_csv(
         csv_path=args.input,
         supplier_column=args.column,
         supplier_column_index=args.column_index,
         encoding=args.encoding,
+        streaming=args.streaming,
+        chunk_rows=args.chunk_rows,
     )
 
     # Export all three CSVs
@@ -1050,6 +1603,11 @@ def main():
     print(f" Individuals detected: {individuals:,}")
     print(f" Output directory: {out_dir.resolve()}")
     print(f"{'-'*50}")
+    if telemetry is not None:
+        set_default_telemetry(None)
+        telemetry.close()
+        print(f"\nLLM calls by stage ({telemetry.path}):")
+        print(format_summary(telemetry.summary()))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,136 @@
+"""Deterministic auto-merge tier and similarity sub-blocking of the supplier normalizer."""
+import random
+from collections import Counter
+
+import pytest
+
+import supplier_name_normalizer as sn
+from supplier_name_normalizer import (
+    DIGITS,
+    SupplierNormalizer,
+    UniqueNameEntry,
+    auto_merge_members,
+    sub_block_group,
+    suffix_insensitive_key,
+)
+
+WORDS = ["acme", "steel", "global", "supply", "north", "star", "foods", "logistics", "tech", "data",
+         "systems", "pacific", "river", "stone", "harbor"]
+SUFFIXES = ["", " llc", " inc", " l l c", " co", " gmbh", " company"]
+
+
+def entry(cleaned, count=1, ordinal=0, individual=False):
+    m = UniqueNameEntry(cleaned, cleaned.title(), ordinal)
+    for i in range(count):
+        m.add(i, cleaned.title())
+    m.is_individual = individual
+    return m
+
+
+def random_members(count, seed):
+    rng = random.Random(seed)
+    members = []
+    for i in range(count):
+        name = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 3)))
+        if rng.random() < 0.3:
+            name += f" {rng.randint(1000, 1003)}"
+        members.append(entry(name + rng.choice(SUFFIXES), rng.randint(1, 9), i, individual=rng.random() < 0.1))
+    return members
+
+
+def partition(representatives, merged):
+    return [[r] + merged.get(r.best_original, []) for r in representatives]
+
+
+@pytest.mark.parametrize("cleaned", ["acme steel l l c", "acme-steel", "acme steel gmbh and", "the acme steel co"])
+def test_suffix_insensitive_key(cleaned):
+    assert suffix_insensitive_key(cleaned) == "acmesteel"
+
+
+def test_equal_keys_merge_into_the_most_frequent_member():
+    members = [entry("acme steel", 2, 0), entry("acme steel llc", 5, 1), entry("acme-steel", 5, 2)]
+    representatives, merged = auto_merge_members(members)
+    assert representatives == [members[1]]
+    assert merged == {members[1].best_original: [members[0], members[2]]}
+
+
+def test_different_numbers_and_individuals_are_not_fuzzy_merged():
+    members = [
+        entry("acme steel 1001"), entry("acme steel 1002"),
+        entry("john smithson", individual=True), entry("john smithsen", individual=True),
+    ]
+    representatives, merged = auto_merge_members(members, threshold=0.8)
+    assert representatives == members
+    assert merged == {}
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_every_member_is_kept_once_and_merges_are_sound(seed):
+    members = random_members(300, seed)
+    representatives, merged = auto_merge_members(members, threshold=0.95)
+    groups = partition(representatives, merged)
+    assert Counter(id(m) for g in groups for m in g) == Counter(id(m) for m in members)
+    for group in groups:
+        rep = group[0]
+        assert rep.total_count == max(m.total_count for m in group)
+        # Digits are compared for every fuzzy pair, so a component never mixes numbers
+        assert len({tuple(DIGITS.findall(suffix_insensitive_key(m.cleaned))) for m in group}) == 1
+        for m in group:
+            # Individuals only ever join on an identical key
+            if m.is_individual and len(group) > 1:
+                assert sum(suffix_insensitive_key(o.cleaned) == suffix_insensitive_key(m.cleaned) for o in group) > 1
+
+
+def test_threshold_one_merges_only_equal_keys():
+    members = random_members(300, seed=11)
+    representatives, merged = auto_merge_members(members, threshold=1.0)
+    for group in partition(representatives, merged):
+        assert len({suffix_insensitive_key(m.cleaned) for m in group}) == 1
+    assert len(representatives) == len({suffix_insensitive_key(m.cleaned) for m in members})
+
+
+@pytest.mark.parametrize("ngram_backend", [True, False])
+def test_sub_block_group_caps_batches_and_keeps_every_member(monkeypatch, ngram_backend):
+    if ngram_backend and not sn.NGRAM_BACKEND_AVAILABLE:
+        pytest.skip("numpy/scipy not installed")
+    monkeypatch.setattr(sn, "NGRAM_BACKEND_AVAILABLE", ngram_backend)
+    members = random_members(230, seed=3)
+    batches = sub_block_group(members, batch_size=25)
+    assert all(1 <= len(b) <= 25 for b in batches)
+    assert Counter(id(m) for b in batches for m in b) == Counter(id(m) for m in members)
+    assert batches == sub_block_group(members, batch_size=25)
+
+
+def test_small_group_is_one_batch():
+    members = random_members(10, seed=4)
+    assert sub_block_group(members, batch_size=25) == [members]
+
+
+def run_normalizer(monkeypatch, raw_names, auto_merge):
+    sent = []
+
+    def fake_call_gemini(names, *args, **kwargs):
+        sent.append(list(names))
+        return {"clusters": [{"canonical": n, "members": [i], "confidence": "high"} for i, n in enumerate(names)]}
+
+    monkeypatch.setattr(sn, "call_gemini", fake_call_gemini)
+    normalizer = SupplierNormalizer(api_key="test", delay_between_calls=0, use_cache=False, auto_merge=auto_merge)
+    return normalizer.normalize(raw_names), sent
+
+
+def test_auto_merged_names_follow_their_representative(monkeypatch):
+    # One token group ("acme"): "steelwork" is a near-duplicate, "steelworx" and "stone" are not
+    raw = ["Acme Steelworks Inc"] * 3 + ["Acme Steelwork", "Acme Steelworx", "Acme Stone", "Acme Steelworks, LLC"]
+    results, sent = run_normalizer(monkeypatch, raw, auto_merge=True)
+    _, sent_plain = run_normalizer(monkeypatch, raw, auto_merge=False)
+    assert sum(map(len, sent)) < sum(map(len, sent_plain))
+
+    by_original = {r.original: r for r in results}
+    assert sum(r.count for r in results) == len(raw)
+    folded = [r for r in results if r.method == "auto-merge"]
+    assert [r.original for r in folded] == ["Acme Steelwork"]
+    assert "Acme Steelwork" not in {n for batch in sent for n in batch}
+    for r in folded:
+        rep = by_original[r.normalized]
+        assert rep.method != "auto-merge"
+        assert r.cluster == rep.cluster
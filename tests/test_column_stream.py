@@ -0,0 +1,147 @@
+"""Streaming column reads (pyarrow and csv backends) against the in-memory path of normalize_csv."""
+import csv
+import random
+
+import pytest
+
+import supplier_name_normalizer as sn
+from etl import column_stream
+from etl.column_stream import ColumnChunkReader, RaggedRowsError, RowIndexSpill
+from supplier_name_normalizer import SupplierNormalizer
+
+BACKENDS = ["pyarrow", "csv"]
+NAMES = ["Acme Steel LLC", "ACME STEEL, L.L.C.", "Globex Corp", "Globex Corporation", "Initech", "Müller GmbH",
+         "O'Brien & Sons", "North Star Foods", "North Star Food Co", "", "   ", "123"]
+
+
+def write_edge_csv(path, rows=400, seed=0, ragged=True):
+    rng = random.Random(seed)
+    lines = ["po_id,supplier_name,amount\r\n"]
+    for i in range(rows):
+        name = rng.choice(NAMES)
+        kind = rng.random() if ragged else 1.0
+        if kind < 0.05:
+            lines.append(f"{i},\"{name}\"\r\n")                                # short trailing column
+        elif kind < 0.07:
+            lines.append(f"{i}\r\n")                                          # no supplier field: ""
+        elif kind < 0.10:
+            lines.append(f"{i},\"{name}\",1,extra\r\n")                       # extra fields
+        elif kind < 0.12:
+            lines.append("\r\n")                                              # blank line: ""
+        elif kind < 0.17:
+            lines.append(f"{i},\"{name}\nline two\",{i}\r\n")                 # newline in a quoted value
+        else:
+            lines.append(f"{i},\"{name.replace(chr(34), chr(34) * 2)}\",{i * 3}\r\n")
+    path.write_text("".join(lines), encoding="utf-8", newline="")
+    return path
+
+
+def expected_column(path):
+    """The column as the in-memory path of normalize_csv reads it."""
+    with open(path, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        next(reader)
+        return [row[1] if len(row) > 1 else "" for row in reader]
+
+
+def make_reader(path, backend, chunk_rows=37):
+    if backend == "pyarrow" and column_stream.pa_csv is None:
+        pytest.skip("pyarrow not installed")
+    reader = ColumnChunkReader(str(path), 1, chunk_rows=chunk_rows, use_pyarrow=backend == "pyarrow")
+    assert reader.backend == backend
+    return reader
+
+
+@pytest.fixture
+def edge_csv(tmp_path):
+    return write_edge_csv(tmp_path / "po.csv")
+
+
+@pytest.fixture
+def clean_csv(tmp_path):
+    return write_edge_csv(tmp_path / "clean.csv", ragged=False)
+
+
+@pytest.fixture
+def fake_gemini(monkeypatch):
+    def call(names, *args, **kwargs):
+        return {"clusters": [{"canonical": names[0], "members": list(range(len(names))), "confidence": "high"}]}
+
+    monkeypatch.setattr(sn, "call_gemini", call)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_backends_read_a_regular_file_alike(clean_csv, backend):
+    assert [v for c in make_reader(clean_csv, backend) for v in c] == expected_column(clean_csv)
+
+
+def test_csv_reader_keeps_ragged_rows(edge_csv):
+    values = [v for c in make_reader(edge_csv, "csv") for v in c]
+    assert values == expected_column(edge_csv)
+    with open(edge_csv, encoding="utf-8", newline="") as f:
+        assert len(values) == sum(1 for _ in csv.reader(f)) - 1
+
+
+def test_pyarrow_reader_refuses_ragged_rows(edge_csv):
+    with pytest.raises(RaggedRowsError):
+        list(make_reader(edge_csv, "pyarrow"))
+
+
+def test_csv_chunks_hold_chunk_rows(edge_csv):
+    sizes = [len(c) for c in make_reader(edge_csv, "csv")]
+    assert all(size == 37 for size in sizes[:-1]) and 0 < sizes[-1] <= 37
+
+
+@pytest.mark.parametrize("backend,ragged", [("pyarrow", False), ("csv", False), ("csv", True)])
+def test_spilled_rows_match_in_memory_indices(tmp_path, backend, ragged):
+    path = write_edge_csv(tmp_path / "po.csv", ragged=ragged)
+    normalizer = SupplierNormalizer(api_key="test")
+    in_memory = normalizer._extract_and_clean(expected_column(path))
+    with RowIndexSpill(str(tmp_path)) as spill:
+        streamed = normalizer._extract_and_clean_chunks(make_reader(path, backend), spill)
+        assert list(streamed) == list(in_memory)
+        for cleaned, entry in in_memory.items():
+            other = streamed[cleaned]
+            assert other.ordinal == entry.ordinal
+            assert other.originals == entry.originals
+            assert spill.rows_for(other.ordinal) == entry.indices
+        assert sum(len(c) for c in spill.iter_chunks(50)) == len(spill) == len(expected_column(path))
+
+
+def test_rows_for_without_numpy(tmp_path, monkeypatch):
+    monkeypatch.setattr(column_stream, "np", None)
+    rng = random.Random(5)
+    values = [rng.choice([0, 1, 2, column_stream.NO_ENTRY]) for _ in range(1000)]
+    with RowIndexSpill(str(tmp_path)) as spill:
+        for start in range(0, len(values), 128):
+            spill.extend(column_stream.array("I", values[start:start + 128]))
+        assert list(spill.rows_for(2)) == [i for i, v in enumerate(values) if v == 2]
+
+
+def results_key(results):
+    return sorted((r.original, r.normalized, r.method, r.count, r.cluster) for r in results)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("ragged", [False, True])
+def test_normalize_csv_streaming_matches_in_memory(tmp_path, backend, ragged, monkeypatch, fake_gemini):
+    if backend == "pyarrow" and column_stream.pa_csv is None:
+        pytest.skip("pyarrow not installed")
+    if backend == "csv":
+        monkeypatch.setattr(column_stream, "pa_csv", None)
+    path = write_edge_csv(tmp_path / "po.csv", ragged=ragged)
+    logs = []
+
+    def run(streaming):
+        normalizer = SupplierNormalizer(api_key="test", delay_between_calls=0, use_cache=False,
+                                        progress_callback=lambda msg, level: logs.append((level, msg)))
+        results = normalizer.normalize_csv(str(path), "supplier_name", streaming=streaming, chunk_rows=50)
+        if streaming:
+            assert len(normalizer.row_index) == len(expected_column(path))
+        return results
+
+    in_memory = run(False)
+    assert sum(r.count for r in in_memory) == sum(1 for v in expected_column(path) if sn.clean_name(v))
+    assert results_key(run(True)) == results_key(in_memory)
+    re_read = any("re-reading with the csv reader" in msg for _, msg in logs)
+    assert re_read == (ragged and backend == "pyarrow")
@@ -0,0 +1,50 @@
+"""SupplierMasterEngine passes its own use_cache setting down instead of changing module state."""
+import pandas as pd
+import pytest
+
+import supplier_master_generator_latest as generator
+
+CATEGORIES = [{"l1": "Industrial", "l2": "FAST", "l3": "Fasteners"}, {"l1": "IT", "l2": "SW", "l3": "Software"}]
+ITEMS = ["Stainless steel hex bolts M8 x 40mm box of 100", "Zinc plated flat washers M8 pack of 500",
+         "Annual maintenance for ERP software licence", "Hex nuts M10 grade 8 zinc plated bag of 200"]
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    seen = []
+
+    def fake_call(*args, use_cache=None, stage="other", **kwargs):
+        seen.append((stage, use_cache))
+        return {}
+
+    monkeypatch.setattr(generator, "call_gemini_sync", fake_call)
+    return seen
+
+
+def run_supplier(use_cache, items):
+    config = generator.SupplierMasterConfig(api_key="test", use_cache=use_cache, use_grounding=False)
+    engine = generator.SupplierMasterEngine(config, pd.DataFrame(), pd.DataFrame())
+    supplier = {"items": items, "countries": ["US"], "original_names": {"Acme Fasteners Inc"}}
+    engine.process_new_supplier("Acme Fasteners", supplier, CATEGORIES, "test", config.model,
+                                config.temperature, False, generator.RateLimiter(max_rpm=10_000))
+    engine.update_existing_supplier("Acme Fasteners", supplier, {"Original_Name_Variants": ""}, "test",
+                                    config.model, config.temperature, generator.RateLimiter(max_rpm=10_000))
+
+
+def refuse_memo():
+    raise AssertionError("classification memo opened with the cache off")
+
+
+@pytest.mark.parametrize("items", [ITEMS, ["x", "y", "z"]], ids=["po-line-flow", "description-flow"])
+def test_engines_keep_their_own_cache_setting(calls, monkeypatch, items):
+    monkeypatch.setattr(generator, "get_default_classification_memo", refuse_memo)
+    run_supplier(False, items)
+    assert {stage for stage, _ in calls} >= {"enrichment", "product_tags"}
+    assert all(use_cache is False for _, use_cache in calls)
+
+    # A second engine in the same process is not affected by the first one's setting
+    calls.clear()
+    monkeypatch.setattr(generator, "get_default_classification_memo", lambda: None)
+    run_supplier(True, items)
+    assert calls and all(use_cache is True for _, use_cache in calls)
+    assert generator.LLM_CACHE_ENABLED is True
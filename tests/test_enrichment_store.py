@@ -0,0 +1,139 @@
+"""Enrichment store lookups, freshness, thread safety, and use by enrich_supplier."""
+import threading
+
+import pytest
+
+import supplier_master_generator_latest as generator
+from etl import enrichment_store
+from etl.enrichment_store import LocalEnrichmentStore, PostgresEnrichmentStore
+
+ACME = {"description": "Widgets", "employee_count": "50", "revenue": "$1M", "year_established": "1990",
+        "confidence": 0.8}
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = LocalEnrichmentStore(str(tmp_path / "enrich.sqlite"), max_age_days=180)
+    yield s
+    s.close()
+
+
+def test_lookup_by_canonical_name_and_genpact_id(store):
+    store.put("ACME  Widgets", ACME, genpact_id="G1")
+    assert store.get("acme widgets") == ACME
+    assert store.get("Some other spelling", genpact_id="G1") == ACME
+    assert store.get("Globex") is None
+    assert (store.hits, store.misses) == (2, 1)
+
+
+def test_stale_entries_are_misses(tmp_path, monkeypatch):
+    now = [1_000_000_000.0]
+    monkeypatch.setattr(enrichment_store.time, "time", lambda: now[0])
+    fresh = LocalEnrichmentStore(str(tmp_path / "age.sqlite"), max_age_days=30)
+    forever = LocalEnrichmentStore(str(tmp_path / "age.sqlite"), max_age_days=0)
+    fresh.put("Acme", ACME)
+    now[0] += 29 * 86400
+    assert fresh.get("Acme") == ACME
+    now[0] += 2 * 86400
+    assert fresh.get("Acme") is None
+    assert forever.get("Acme") == ACME
+    fresh.close()
+    forever.close()
+
+
+def test_counters_under_concurrent_lookups(store):
+    store.put("Acme", ACME)
+
+    def worker():
+        for i in range(100):
+            store.get("Acme" if i % 2 else f"missing {i}")
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert (store.hits, store.misses) == (400, 400)
+
+
+class FakeCursor:
+    def __init__(self, log, row):
+        self.log, self.row = log, row
+
+    def execute(self, sql, params=None):
+        self.log.append(" ".join(sql.split()))
+
+    def fetchone(self):
+        return self.row
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class FakeConn:
+    autocommit = False
+
+    def __init__(self, row=None):
+        self.log, self.row = [], row
+
+    def cursor(self):
+        return FakeCursor(self.log, self.row)
+
+
+def test_postgres_store_runs_no_ddl_and_falls_back_to_local(store):
+    conn = FakeConn(row=None)
+    pg = PostgresEnrichmentStore(conn, store)
+    assert conn.log == []
+    store.put("Acme", ACME)
+    assert pg.get("Acme") == ACME
+    assert pg.get("Globex") is None
+    assert (pg.hits, pg.misses) == (1, 1)
+    assert not any(sql.startswith(("ALTER", "CREATE")) for sql in conn.log)
+
+
+def test_ref_ddl_indexes_the_store_name_lookup(store):
+    from etl.supplier_master_etl import ensure_ref_tables
+
+    conn = FakeConn(row=None)
+    PostgresEnrichmentStore(conn, store).get("Acme")
+    assert "WHERE lower(normalized_supplier_name) = %s" in conn.log[0]
+    log = []
+    ensure_ref_tables(FakeCursor(log, None))
+    assert any("ON ref.supplier_master (lower(normalized_supplier_name))" in sql for sql in log)
+    assert any("ADD COLUMN IF NOT EXISTS enriched_at" in sql for sql in log)
+
+
+def test_enrich_supplier_uses_the_store(store, monkeypatch):
+    calls = []
+
+    def fake_call(**kwargs):
+        calls.append(kwargs["stage"])
+        return dict(ACME)
+
+    monkeypatch.setattr(generator, "call_gemini_sync", fake_call)
+    first = generator.enrich_supplier("Acme", "key", "m", 0.1, False, None, store=store)
+    second = generator.enrich_supplier("ACME", "key", "m", 0.1, False, None, store=store)
+    assert first == second == ACME
+    assert calls == ["enrichment"]
+
+
+def test_failed_enrichment_is_not_stored(store, monkeypatch):
+    monkeypatch.setattr(generator, "call_gemini_sync", lambda **kwargs: {"error": "429"})
+    result = generator.enrich_supplier("Acme", "key", "m", 0.1, False, None, store=store)
+    assert result["description"] == "Not available"
+    assert store.count() == 0
+
+
+def test_failed_store_write_keeps_the_answer(store, monkeypatch):
+    def locked(name, enrichment, genpact_id=None):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(generator, "call_gemini_sync", lambda **kwargs: dict(ACME))
+    monkeypatch.setattr(store, "put", locked)
+    logged = []
+    result = generator.enrich_supplier("Acme", "key", "m", 0.1, False, None, store=store, log_callback=logged.append)
+    assert result == ACME
+    assert len(logged) == 1 and "database is locked" in logged[0]
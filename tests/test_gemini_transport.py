@@ -0,0 +1,71 @@
+"""The Gemini API key travels in a header and never reaches telemetry."""
+import pytest
+
+requests = pytest.importorskip("requests")
+
+import supplier_master_generator_latest as generator  # noqa: E402
+import supplier_name_normalizer as sn  # noqa: E402
+from etl import gemini_transport  # noqa: E402
+from etl.llm_retry import RetryPolicy  # noqa: E402
+from etl.llm_telemetry import LLMTelemetry, read_telemetry, redact_api_key, set_default_telemetry  # noqa: E402
+
+API_KEY = "AIzaSyTEST-secret_key_0123456789"
+
+
+class DownSession:
+    """Fails every POST the way requests does, quoting the full request URL."""
+
+    def __init__(self):
+        self.calls = []
+
+    def post(self, url, data=None, headers=None, timeout=None):
+        self.calls.append((url, headers))
+        raise requests.ConnectionError(
+            f"HTTPSConnectionPool(host='generativelanguage.googleapis.com', port=443): "
+            f"Max retries exceeded with url: {url} (Caused by NewConnectionError('connection refused'))"
+        )
+
+
+@pytest.fixture
+def session(monkeypatch):
+    down = DownSession()
+    monkeypatch.setattr(gemini_transport, "get_session", lambda: down)
+    return down
+
+
+@pytest.fixture
+def telemetry(tmp_path):
+    t = LLMTelemetry(str(tmp_path / "llm_calls.jsonl"))
+    set_default_telemetry(t)
+    yield t
+    set_default_telemetry(None)
+    t.close()
+
+
+def assert_key_not_logged(session, telemetry):
+    url, headers = session.calls[0]
+    assert API_KEY not in url
+    assert headers["x-goog-api-key"] == API_KEY
+    records = read_telemetry(str(telemetry.path))
+    assert records and all(r.get("error") for r in records)
+    assert API_KEY not in telemetry.path.read_text(encoding="utf-8")
+
+
+def test_generator_call_keeps_the_key_out_of_telemetry(session, telemetry):
+    with pytest.raises(Exception) as exc_info:
+        generator.call_gemini_sync("gemini-2.5-flash", API_KEY, "system", "user", use_cache=False,
+                                   retry_policy=RetryPolicy(max_attempts=1))
+    assert API_KEY not in str(exc_info.value)
+    assert_key_not_logged(session, telemetry)
+
+
+def test_normalizer_call_keeps_the_key_out_of_telemetry(session, telemetry):
+    with pytest.raises(requests.ConnectionError):
+        sn.call_gemini(["Acme", "Acme Inc"], API_KEY, use_cache=False, retry_policy=RetryPolicy(max_attempts=1))
+    assert_key_not_logged(session, telemetry)
+
+
+def test_recorded_errors_are_redacted(telemetry):
+    telemetry.record("other", "m", error=f"Max retries exceeded with url: /m:generateContent?alt=json&key={API_KEY}")
+    assert API_KEY not in telemetry.path.read_text(encoding="utf-8")
+    assert redact_api_key(f"?key={API_KEY}&x=1") == "?key=REDACTED&x=1"
@@ -0,0 +1,107 @@
+"""LLM response cache: keys, expiry, LRU cap, thread safety, and stable prompts for cached stages."""
+import random
+import threading
+
+import pytest
+
+import supplier_master_generator_latest as generator
+from etl import llm_cache
+from etl.llm_cache import ClassificationMemo, LLMResponseCache, make_cache_key
+
+
+@pytest.fixture
+def cache(tmp_path):
+    c = LLMResponseCache(str(tmp_path / "cache.sqlite"))
+    yield c
+    c.close()
+
+
+def test_key_covers_every_input():
+    base = make_cache_key("gemini-2.5-flash", "prompt", 0.1)
+    assert base == make_cache_key("gemini-2.5-flash", "prompt", 0.1)
+    assert len({
+        base,
+        make_cache_key("gemini-2.5-pro", "prompt", 0.1),
+        make_cache_key("gemini-2.5-flash", "prompt ", 0.1),
+        make_cache_key("gemini-2.5-flash", "prompt", 0.2),
+        make_cache_key("gemini-2.5-flash", "prompt", 0.1, use_grounding=True),
+        make_cache_key("gemini-2.5-flash", "prompt", 0.1, maxOutputTokens=100),
+    }) == 6
+
+
+def test_round_trip_and_counters(cache):
+    assert cache.get("k") is None
+    cache.put("k", {"clusters": [1, 2]}, model="m")
+    assert cache.get("k") == {"clusters": [1, 2]}
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["writes"], stats["entries"]) == (1, 1, 1, 1)
+
+
+def test_expired_entries_are_misses(tmp_path, monkeypatch):
+    cache = LLMResponseCache(str(tmp_path / "ttl.sqlite"), ttl_seconds=10)
+    now = [1000.0]
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now[0])
+    cache.put("k", "v")
+    now[0] += 5
+    assert cache.get("k") == "v"
+    now[0] += 10
+    assert cache.get("k") is None
+    assert cache.stats()["entries"] == 0
+    cache.close()
+
+
+def test_size_cap_evicts_least_recently_used(tmp_path, monkeypatch):
+    cache = LLMResponseCache(str(tmp_path / "lru.sqlite"), ttl_seconds=None, max_entries=3)
+    now = [1000.0]
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now[0])
+    for key in "abcd":
+        now[0] += 1
+        cache.put(key, key)
+    now[0] += 1
+    cache.get("a")
+    cache.evict()
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in "acd"] == ["a", "c", "d"]
+    cache.close()
+
+
+def test_shared_between_threads(cache):
+    def worker(n):
+        for i in range(50):
+            cache.put(f"{n}-{i}", i)
+            assert cache.get(f"{n}-{i}") == i
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    stats = cache.stats()
+    assert (stats["hits"], stats["writes"], stats["entries"]) == (400, 400, 400)
+
+
+def test_classification_memo_is_digit_and_case_insensitive(tmp_path):
+    memo = ClassificationMemo(str(tmp_path / "memo.sqlite"))
+    key = memo.normalize_description("PO 4501  Freight.")
+    assert key == memo.normalize_description("po 9 freight")
+    memo.put_many("v1", {key: {"category_id": 7}})
+    assert memo.get_many("v1", [key, "other"]) == {key: {"category_id": 7}}
+    assert memo.get_many("v2", [key]) == {}
+    memo.close()
+
+
+@pytest.mark.parametrize("count", [20, 250])
+def test_product_tag_prompt_is_stable(monkeypatch, count):
+    prompts = []
+
+    def fake_call(**kwargs):
+        prompts.append(kwargs["user_text"])
+        return {"product_service_tags": ["x"]}
+
+    monkeypatch.setattr(generator, "call_gemini_sync", fake_call)
+    descriptions = [f"item {i:03d}" for i in range(count)] * 2
+    for seed in range(3):
+        shuffled = descriptions[:]
+        random.Random(seed).shuffle(shuffled)
+        generator.generate_supplier_product_tags("Acme", shuffled, "key", "gemini-2.5-flash", 0.1, None)
+    assert len(prompts) == 3 and len(set(prompts)) == 1
@@ -0,0 +1,115 @@
+"""TokenBucket admission arithmetic and LLMExecutor ordering / concurrency."""
+import threading
+import time
+
+import pytest
+
+from etl import llm_executor
+from etl.llm_executor import LLMExecutor, TokenBucket
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(llm_executor.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_burst_then_steady_rate(clock):
+    bucket = TokenBucket(60, burst=3)
+    assert [bucket.try_acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.try_acquire() == pytest.approx(1.0)
+    clock[0] += 1.0
+    assert bucket.try_acquire() == 0.0
+    # Idle time never banks more than the burst
+    clock[0] += 60
+    assert [bucket.try_acquire() for _ in range(4)][-1] == pytest.approx(1.0)
+
+
+def test_cost_and_capped_cost(clock):
+    bucket = TokenBucket(600, burst=100)
+    assert bucket.try_acquire(cost=60) == 0.0
+    assert bucket.try_acquire(cost=60) == pytest.approx(2.0)
+    # A cost above capacity takes a full bucket instead of waiting forever
+    clock[0] += 10
+    assert bucket.try_acquire(cost=10_000) == 0.0
+    assert bucket.tokens == pytest.approx(0.0)
+
+
+def test_acquire_times_out():
+    bucket = TokenBucket(1, burst=1)
+    assert bucket.acquire(timeout=0.1)
+    started = time.monotonic()
+    assert not bucket.acquire(timeout=0.1)
+    assert time.monotonic() - started < 1.0
+
+
+def test_waiting_thread_does_not_block_others():
+    bucket = TokenBucket(60, burst=2)
+    bucket.try_acquire(cost=2)
+    waiter = threading.Thread(target=bucket.acquire, kwargs={"timeout": 0.5})
+    waiter.start()
+    time.sleep(0.05)
+    started = time.monotonic()
+    bucket.try_acquire()
+    assert time.monotonic() - started < 0.05
+    waiter.join()
+
+
+def test_concurrent_admissions_respect_the_rate():
+    bucket = TokenBucket(600, burst=5)  # 10 per second
+    admitted = []
+    lock = threading.Lock()
+    started = time.monotonic()
+
+    def worker():
+        while time.monotonic() - started < 0.5:
+            if bucket.acquire(timeout=0.05):
+                with lock:
+                    admitted.append(time.monotonic())
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = max(admitted) - started
+    assert len(admitted) <= 5 + 10 * elapsed + 1
+
+
+def test_map_ordered_keeps_input_order_and_worker_limit():
+    in_flight = [0, 0]
+    lock = threading.Lock()
+
+    def task(i):
+        with lock:
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight[1], in_flight[0])
+        time.sleep(0.01 * (i % 3))
+        with lock:
+            in_flight[0] -= 1
+        return i * i
+
+    with LLMExecutor(max_workers=3, rate_per_minute=6000) as executor:
+        assert executor.map_ordered(task, range(20)) == [i * i for i in range(20)]
+    assert in_flight[1] == 3
+
+
+def test_map_ordered_reraises_and_shares_a_given_bucket():
+    bucket = TokenBucket(60)
+
+    def task(i):
+        if i == 2:
+            raise ValueError("boom")
+        return i
+
+    with LLMExecutor(max_workers=2, bucket=bucket) as executor:
+        assert executor.bucket is bucket
+        with pytest.raises(ValueError):
+            executor.map_ordered(task, range(4))
+
+
+def test_executor_without_rate_has_no_bucket():
+    with LLMExecutor(max_workers=2, rate_per_minute=None) as ex:
+        assert ex.bucket is None
+        assert ex.map_ordered(lambda x: x + 1, [1, 2, 3]) == [2, 3, 4]
@@ -0,0 +1,180 @@
+"""Retry policy, server retry hints and the AIMD concurrency controller."""
+import email.utils
+import threading
+import time
+
+import pytest
+
+from etl import llm_retry
+from etl.llm_retry import (
+    AIMDController, LLMHTTPError, RetryPolicy, call_with_retry, is_retryable, parse_retry_after,
+    retry_after_from_response,
+)
+
+
+class FakeResponse:
+    def __init__(self, headers=None, body=None):
+        self.headers = headers or {}
+        self._body = body
+
+    def json(self):
+        if self._body is None:
+            raise ValueError("no body")
+        return self._body
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    log = []
+    monkeypatch.setattr(llm_retry.time, "sleep", log.append)
+    return log
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after("-3") == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+    when = email.utils.formatdate(time.time() + 30, usegmt=True)
+    assert 25 <= parse_retry_after(when) <= 31
+
+
+def test_retry_hint_from_header_or_gemini_body():
+    assert retry_after_from_response(FakeResponse({"Retry-After": "4"})) == 4.0
+    body = {"error": {"details": [{"@type": "type.googleapis.com/google.rpc.RetryInfo", "retryDelay": "17s"}]}}
+    assert retry_after_from_response(FakeResponse(body=body)) == 17.0
+    assert retry_after_from_response(FakeResponse(body={"error": {}})) is None
+    assert retry_after_from_response(FakeResponse()) is None
+
+
+def test_retryable_errors():
+    assert is_retryable(LLMHTTPError(429, "quota"))
+    assert is_retryable(LLMHTTPError(503, "unavailable"))
+    assert not is_retryable(LLMHTTPError(400, "bad request"))
+    assert not is_retryable(ValueError("parse"))
+
+
+def test_backoff_is_bounded_and_prefers_the_server_hint():
+    policy = RetryPolicy(base_delay=1.0, max_delay=8.0)
+    assert all(0 <= policy.backoff(attempt) <= min(8.0, 2 ** attempt) for attempt in range(10))
+    assert 5.0 <= policy.backoff(0, retry_after=5.0) <= 6.0
+    assert policy.backoff(0, retry_after=10_000) <= policy.max_retry_after + policy.base_delay
+
+
+def test_retries_until_success_honouring_retry_after(sleeps):
+    attempts = []
+
+    def send(attempt):
+        attempts.append(attempt)
+        if attempt < 2:
+            raise LLMHTTPError(429, "quota", retry_after=3.0)
+        return "ok"
+
+    retried = []
+    result = call_with_retry(send, RetryPolicy(max_attempts=5, base_delay=0.5),
+                             on_retry=lambda n, delay, exc: retried.append(n))
+    assert result == "ok"
+    assert attempts == [0, 1, 2] and retried == [1, 2]
+    assert all(3.0 <= s <= 3.5 for s in sleeps)
+
+
+def test_non_retryable_and_exhausted_errors_are_raised(sleeps):
+    def bad_request(attempt):
+        raise LLMHTTPError(400, "bad")
+
+    with pytest.raises(LLMHTTPError):
+        call_with_retry(bad_request, RetryPolicy(max_attempts=5))
+    assert sleeps == []
+
+    calls = []
+
+    def always_503(attempt):
+        calls.append(attempt)
+        raise LLMHTTPError(503, "down")
+
+    with pytest.raises(LLMHTTPError):
+        call_with_retry(always_503, RetryPolicy(max_attempts=3))
+    assert calls == [0, 1, 2] and len(sleeps) == 2
+
+
+def test_aimd_halves_once_per_cooldown_and_recovers():
+    controller = AIMDController(8, cooldown=60)
+    controller.on_throttle(0)
+    controller.on_throttle(0)
+    assert controller.limit == 4 and controller.throttles == 1
+    for _ in range(100):
+        controller.on_success()
+    assert controller.limit == 8
+
+
+def test_aimd_caps_calls_in_flight():
+    controller = AIMDController(3)
+    in_flight = [0, 0]
+    lock = threading.Lock()
+
+    def send(attempt):
+        with lock:
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight[1], in_flight[0])
+        time.sleep(0.01)
+        with lock:
+            in_flight[0] -= 1
+        return attempt
+
+    threads = [threading.Thread(target=call_with_retry, args=(send,), kwargs={"controller": controller})
+               for _ in range(12)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert in_flight[1] <= 3 and controller.in_flight == 0
+
+
+def test_throttle_pauses_every_worker():
+    controller = AIMDController(4, cooldown=0)
+    controller.on_throttle(0.2)
+    started = time.monotonic()
+    controller.acquire()
+    controller.release()
+    assert time.monotonic() - started >= 0.18
+
+
+class GeminiResponse:
+    def __init__(self, status, body):
+        self.status_code, self.ok, self.reason, self.headers, self._body = status, status < 400, "", {}, body
+
+    def json(self):
+        return self._body
+
+
+def test_normalizer_passes_its_own_controller(monkeypatch, sleeps):
+    import supplier_name_normalizer as sn
+
+    seen = []
+    responses = [GeminiResponse(503, {"error": {"message": "overloaded"}})]
+
+    def fake_post(url, payload, timeout=None, api_key=None):
+        seen.append(llm_retry.get_default_controller())
+        if responses:
+            return responses.pop()
+        text = '{"clusters": [{"canonical": "Acme", "members": [0, 1], "confidence": "high"}]}'
+        return GeminiResponse(200, {"candidates": [{"content": {"parts": [{"text": text}]}}]})
+
+    def fake_retry(send, policy=None, controller=None, on_retry=None):
+        seen.append(controller)
+        return real_retry(send, policy, controller, on_retry)
+
+    real_retry = sn.call_with_retry
+    monkeypatch.setattr(sn, "post_json", fake_post)
+    monkeypatch.setattr(sn, "call_with_retry", fake_retry)
+    logs = []
+    normalizer = sn.SupplierNormalizer(api_key="test", use_cache=False, max_retries=5, delay_between_calls=0,
+                                       progress_callback=lambda msg, level: logs.append(msg))
+    normalizer.retry_policy = RetryPolicy(max_attempts=3, base_delay=0)
+    results = normalizer.normalize(["Acme Steelworks Inc", "Acme Stone"])
+
+    assert {r.normalized for r in results} == {"Acme"}
+    controllers = [c for c in seen if c is not None]
+    assert len(controllers) == 1 and isinstance(controllers[0], AIMDController)
+    assert llm_retry.get_default_controller() is None
+    assert any("(retry 1/2)" in msg for msg in logs)
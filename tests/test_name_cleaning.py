@@ -0,0 +1,91 @@
+"""The shared cleaners must reproduce the per-script functions they replaced."""
+import random
+import re
+import unicodedata
+
+import supplier_master_generator_latest as generator
+import supplier_name_normalizer as normalizer
+
+
+def reference_clean_name(raw):
+    """supplier_name_normalizer.clean_name before etl/name_cleaning.py."""
+    if not raw:
+        return ""
+    s = str(raw).strip()
+    if re.match(r"^\d+$", s) or len(s) < 2:
+        return ""
+    s = unicodedata.normalize("NFKD", s)
+    s = re.sub("[\u0300-\u036f]", "", s)
+    s = s.lower()
+    s = s.replace("&", " and ")
+    for marker in (r"\bdba\b", r"\bd/b/a\b", r"\baka\b", r"\ba/k/a\b", r"\bfka\b", r"\bc/o\b", r"\battn\b"):
+        s = re.sub(marker, "", s)
+    s = re.sub(r"[^\w\s-]", " ", s)
+    s = re.sub(r"\b\d{1,3}\b", " ", s)
+    s = re.sub(r"\s+", " ", s).strip()
+    tokens = s.split(" ")
+    while len(tokens) > 1 and tokens[-1] in normalizer.LEGAL_SUFFIXES:
+        tokens.pop()
+    while len(tokens) > 1 and tokens[0] in normalizer.STRIP_PREFIX_WORDS:
+        tokens.pop(0)
+    return " ".join(tokens).strip()
+
+
+def reference_clean_company_name(name):
+    """supplier_master_generator_latest.clean_company_name before etl/name_cleaning.py."""
+    if not name:
+        return ""
+    name = str(name).lower().strip()
+    name = re.sub(r"\([^)]*\)", "", name)
+    name = re.sub(r"[^\w\s&]", " ", name)
+    name = re.sub(r"\s+&\s+", " and ", name)
+    tokens = name.split()
+    filtered = [
+        t for t in tokens
+        if t not in generator.LEGAL_SUFFIXES and t not in generator.LOCATION_WORDS and (len(t) > 1 or t == "&")
+    ]
+    if not filtered:
+        filtered = [t for t in tokens if t not in generator.LEGAL_SUFFIXES]
+    if not filtered:
+        filtered = tokens
+    return " ".join(filtered)
+
+
+PIECES = [
+    "acme", "Widgets", "the", "The", "inc", "Inc.", "LLC", "gmbh", "co", "dba", "DBA", "d/b/a", "aka", "a/k/a",
+    "fka", "c/o", "attn", "12", "1234", "7", "&", "and", "(usa)", "Café", "Müller", "naïve", "-", "/", ".", ",",
+    "usa", "north", "x", "A", "st", "#", "'s", "o'brien", "  ", "\t",
+]
+JOINERS = [" ", " ", " ", "-", "", "/", ", "]
+
+
+def fuzz_names(count, seed):
+    rng = random.Random(seed)
+    for _ in range(count):
+        parts = [rng.choice(PIECES) for _ in range(rng.randint(1, 6))]
+        name = parts[0]
+        for part in parts[1:]:
+            name += rng.choice(JOINERS) + part
+        yield name
+
+
+def test_hyphen_joined_markers_are_deleted_without_a_spacer():
+    assert normalizer.clean_name("x-aka-y") == "x--y"
+    assert normalizer.clean_name("Acme-DBA-Widgets Inc") == reference_clean_name("Acme-DBA-Widgets Inc")
+
+
+def test_clean_name_matches_reference():
+    names = list(fuzz_names(30000, seed=4))
+    mismatches = [(n, normalizer.clean_name(n), reference_clean_name(n))
+                  for n in names if normalizer.clean_name(n) != reference_clean_name(n)]
+    assert not mismatches[:10]
+
+
+def test_clean_names_matches_clean_name():
+    names = list(fuzz_names(5000, seed=5)) * 2
+    assert normalizer.clean_names(names) == [normalizer.clean_name(n) for n in names]
+
+
+def test_clean_company_name_matches_reference():
+    for name in fuzz_names(30000, seed=6):
+        assert generator.clean_company_name(name) == reference_clean_company_name(name), name
@@ -0,0 +1,68 @@
+"""NgramIndex neighbours against a dense brute-force cosine, and the normalizer's n-gram group merge."""
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("scipy")
+
+from etl.ngram_similarity import NgramIndex  # noqa: E402
+from supplier_name_normalizer import UniqueNameEntry, build_groups, merge_similar_groups  # noqa: E402
+
+WORDS = ["acme", "widgets", "international", "intl", "business", "machines", "global", "supply", "north", "star",
+         "foods", "logistics", "tech", "data", "systems"]
+
+
+def random_names(count, seed):
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 3))) for _ in range(count)]
+
+
+def dense_cosine(index):
+    matrix = index.matrix.toarray()
+    return matrix @ matrix.T
+
+
+def test_rows_are_unit_length():
+    index = NgramIndex(random_names(200, seed=1))
+    norms = np.sqrt(index.matrix.multiply(index.matrix).sum(axis=1))
+    assert np.allclose(norms, 1.0)
+
+
+def test_top_k_neighbors_match_brute_force():
+    names = random_names(300, seed=2)
+    index = NgramIndex(names, chunk_size=64)
+    cosine = dense_cosine(index)
+    for row, neighbours in index.top_k_neighbors(k=5, min_similarity=0.4):
+        scores = [(float(cosine[row, j]), j) for j in range(len(names)) if j != row and cosine[row, j] >= 0.4]
+        best = sorted(scores, key=lambda s: (-s[0], s[1]))[:5]
+        assert np.allclose([s for _, s in neighbours], [s for s, _ in best])
+        # Equal scores come back in row order
+        for (j1, s1), (j2, s2) in zip(neighbours, neighbours[1:]):
+            assert s1 > s2 or j1 < j2
+
+
+def test_ties_at_the_cutoff_keep_the_lowest_rows():
+    index = NgramIndex(["acme widgets"] * 8)
+    for row, neighbours in index.top_k_neighbors(k=3, min_similarity=0.5):
+        assert [j for j, _ in neighbours] == [j for j in range(8) if j != row][:3]
+
+
+def test_candidate_pairs_are_symmetric_and_exclude_self():
+    index = NgramIndex(random_names(150, seed=3))
+    pairs = index.candidate_pairs(k=3, min_similarity=0.3)
+    assert pairs
+    assert all(i < j for i, j, _ in pairs)
+    assert len({(i, j) for i, j, _ in pairs}) == len(pairs)
+
+
+def test_merge_similar_groups_joins_near_duplicates_within_the_cap():
+    names = ["international business machines", "intl business machines", "acme widgets", "acme widget",
+             "north star foods"]
+    groups = build_groups([UniqueNameEntry(name, name) for name in names])
+    merged = merge_similar_groups(groups, min_similarity=0.6, max_group_size=2)
+    assert all(len(members) <= 2 for members in merged.values())
+    together = [sorted(m.cleaned for m in members) for members in merged.values()]
+    assert ["international business machines", "intl business machines"] in together
+    # Every entry survives the merge exactly once
+    assert sorted(m.cleaned for members in merged.values() for m in members) == sorted(names)
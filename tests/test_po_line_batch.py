@@ -0,0 +1,57 @@
+"""Batched PO-line classification only accepts a line's own candidate categories."""
+import json
+import re
+
+import pytest
+
+import supplier_master_generator_latest as generator
+
+CATEGORIES = [{"l1": f"Group{i // 10}", "l2": f"Family{i}", "l3": f"Commodity{i} item{i}"} for i in range(60)]
+DESCRIPTIONS = ["commodity3 item3 order", "commodity41 item41 delivery"]
+
+
+def parse_prompt(user_text):
+    lines = [json.loads(line) for line in user_text.splitlines() if line.startswith('{"line_id"')]
+    return {line["line_id"]: line["candidates"] for line in lines}
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    log = []
+
+    def fake_call(**kwargs):
+        candidates = parse_prompt(kwargs["user_text"])
+        log.append(candidates)
+        # First call: line 0 gets an id that was only offered to line 1
+        if len(log) == 1:
+            foreign = next(c for c in candidates[1] if c not in candidates[0])
+            chosen = {0: foreign, 1: candidates[1][0]}
+        else:
+            chosen = {line_id: ids[0] for line_id, ids in candidates.items()}
+        return {"results": [{"line_id": i, "category_id": c, "confidence": 0.9} for i, c in chosen.items()]}
+
+    monkeypatch.setattr(generator, "call_gemini_sync", fake_call)
+    return log
+
+
+def test_candidate_lists_differ():
+    offered = [{c["l3"] for c in generator.prefilter_categories(d, CATEGORIES)} for d in DESCRIPTIONS]
+    assert offered[0] != offered[1]
+
+
+def test_foreign_category_is_rejected(calls):
+    result = generator.classify_po_line_batch(DESCRIPTIONS, "Acme", CATEGORIES, "key", "m", 0.1, None)
+    assert result[0] is None
+    assert result[1]["l3"] == "Commodity41 item41"
+
+
+def test_rejected_line_is_re_asked(calls, monkeypatch):
+    def single(po_line_description, **kwargs):
+        top = generator.prefilter_categories(po_line_description, CATEGORIES)[0]
+        return {"l1": top["l1"], "l2": top["l2"], "l3": top["l3"], "confidence": 0.8}
+
+    monkeypatch.setattr(generator, "classify_po_line", single)
+    result = generator._classify_po_line_batches(DESCRIPTIONS, "Acme", CATEGORIES, "key", "m", 0.1, None)
+    offered = [{c["l3"] for c in generator.prefilter_categories(d, CATEGORIES)} for d in DESCRIPTIONS]
+    assert all(r["l3"] in ids for r, ids in zip(result, offered))
+    assert re.search(r"\d+", result[0]["l3"]).group() == "3"
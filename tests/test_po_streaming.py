@@ -0,0 +1,55 @@
+"""Streaming PO aggregation equals the in-memory aggregation, order included."""
+import random
+
+import pandas as pd
+import pytest
+
+import supplier_master_generator_latest as generator
+
+COUNTRIES = {"1042": "US", "2001": "DE", "3300": "IN"}
+
+
+@pytest.fixture
+def po_file(tmp_path):
+    rng = random.Random(14)
+    rows = []
+    for i in range(400):
+        number = rng.choice(["1042", "2001", "3300", "9999", ""])
+        name = rng.choice(["Acme Inc", " Acme Inc ", "Globex", "Initech LLC", "", "nan", "Müller GmbH"])
+        item = rng.choice(["Freight", "Laptops", "", f"Part {i % 7}", "nan"])
+        rows.append({"Supplier Number": number, "Supplier Name": name, "Item": item, "Amount": i})
+    path = tmp_path / "po.csv"
+    pd.DataFrame(rows).to_csv(path, index=False)
+    return path
+
+
+def normalised(suppliers):
+    return [(name, data["items"], sorted(data["countries"]), sorted(data["original_names"]))
+            for name, data in suppliers.items()]
+
+
+def test_stream_matches_in_memory(po_file):
+    in_memory = generator.extract_po_suppliers(
+        pd.read_csv(po_file), "Supplier Number", "Supplier Name", "Item", COUNTRIES)
+    seen = []
+    streamed, rows = generator.stream_po_suppliers(
+        str(po_file), "Supplier Number", "Supplier Name", "Item", COUNTRIES, chunksize=37, on_chunk=seen.append)
+    assert rows == 400
+    assert seen[-1] == 400 and len(seen) == 11
+    assert normalised(streamed) == normalised(in_memory)
+
+
+def test_numeric_supplier_numbers_match_the_country_lookup(po_file):
+    # Blank supplier numbers make pandas read the column as float ("1042.0")
+    frame = pd.read_csv(po_file)
+    assert frame["Supplier Number"].dtype == float
+    suppliers = generator.extract_po_suppliers(frame, "Supplier Number", "Supplier Name", None, COUNTRIES)
+    assert set().union(*(s["countries"] for s in suppliers.values())) == {"US", "DE", "IN"}
+
+
+def test_latin1_fallback(tmp_path):
+    path = tmp_path / "latin1.csv"
+    path.write_bytes("Supplier Name,Item\nCafé Ltd,Crème\n".encode("latin-1"))
+    suppliers, rows = generator.stream_po_suppliers(str(path), None, "Supplier Name", "Item", {})
+    assert rows == 1
+    assert suppliers == {"Café Ltd": {"items": ["Crème"], "countries": set(), "original_names": {"Café Ltd"}}}
@@ -0,0 +1,53 @@
+"""Checkpoint journal: resume, and earlier journals kept instead of truncated."""
+from etl.run_journal import SupplierJournal, backup_path_for, journal_path_for, read_journal
+
+
+def crashed_run(path, run_key="tax:model", suppliers=("Acme", "Globex")):
+    journal = SupplierJournal(str(path), run_key)
+    for name in suppliers:
+        journal.record("new", name, rows=[{"Normalized_Supplier_Name": name}])
+    journal.close()
+
+
+def test_resume_replays_the_journal(tmp_path):
+    path = journal_path_for(str(tmp_path / "master.csv"))
+    crashed_run(path)
+    journal = SupplierJournal(str(path), "tax:model", resume=True)
+    assert len(journal) == 2 and journal.completed("new", "Acme")["rows"]
+    assert journal.backup_path is None and not backup_path_for(path).exists()
+    journal.finish()
+    assert not path.exists()
+
+
+def test_rerun_without_resume_keeps_the_old_journal(tmp_path):
+    path = journal_path_for(str(tmp_path / "master.csv"))
+    crashed_run(path)
+    journal = SupplierJournal(str(path), "tax:model")
+    assert len(journal) == 0 and journal.discarded == 2
+    assert journal.backup_path == backup_path_for(path)
+    journal.close()
+    assert [r["supplier"] for r in read_journal(str(journal.backup_path))[1]] == ["Acme", "Globex"]
+    assert read_journal(str(path))[1] == []
+
+    # Renamed back, the backup resumes as usual
+    journal.backup_path.replace(path)
+    resumed = SupplierJournal(str(path), "tax:model", resume=True)
+    resumed.close()
+    assert len(resumed) == 2
+
+
+def test_journal_for_another_run_key_is_kept(tmp_path):
+    path = journal_path_for(str(tmp_path / "master.csv"))
+    crashed_run(path, run_key="old-taxonomy:model")
+    journal = SupplierJournal(str(path), "tax:model", resume=True)
+    journal.close()
+    assert len(journal) == 0 and journal.discarded == 2
+    assert read_journal(str(backup_path_for(path)))[0]["run_key"] == "old-taxonomy:model"
+
+
+def test_empty_journal_is_simply_replaced(tmp_path):
+    path = journal_path_for(str(tmp_path / "master.csv"))
+    crashed_run(path, suppliers=())
+    journal = SupplierJournal(str(path), "tax:model")
+    journal.close()
+    assert journal.backup_path is None and not backup_path_for(path).exists()